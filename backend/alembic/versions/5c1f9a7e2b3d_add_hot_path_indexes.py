@@ -0,0 +1,98 @@
+"""add_hot_path_indexes
+
+Revision ID: 5c1f9a7e2b3d
+Revises: 1eb1d812d134
+Create Date: 2026-10-17 10:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f9a7e2b3d'
+down_revision: Union[str, None] = '1eb1d812d134'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _assert_unique(table: str, columns: str) -> None:
+    """Stop with a readable message if existing rows would violate a new unique constraint"""
+    if context.is_offline_mode():
+        return
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} GROUP BY {columns} HAVING COUNT(*) > 1) d"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} duplicate ({columns}) groups in {table} - resolve them before running this migration"
+        )
+
+
+def upgrade() -> None:
+    # Merge duplicate carts into each user's oldest cart (one cart per user)
+    op.execute("""
+        UPDATE cart_items ci SET cart_id = keep.keep_id
+        FROM carts c
+        JOIN (SELECT user_id, MIN(id) AS keep_id FROM carts GROUP BY user_id HAVING COUNT(*) > 1) keep
+            ON c.user_id = keep.user_id
+        WHERE ci.cart_id = c.id AND c.id <> keep.keep_id
+    """)
+    op.execute("DELETE FROM carts c USING carts keep WHERE c.user_id = keep.user_id AND c.id > keep.id")
+
+    # Merge duplicate cart lines, summing their quantities (add_to_cart would have done the same)
+    op.execute("""
+        UPDATE cart_items ci SET quantity = d.total
+        FROM (
+            SELECT MIN(id) AS keep_id, SUM(quantity) AS total FROM cart_items
+            GROUP BY cart_id, product_id, product_size_id HAVING COUNT(*) > 1
+        ) d
+        WHERE ci.id = d.keep_id
+    """)
+    op.execute("""
+        DELETE FROM cart_items ci USING cart_items keep
+        WHERE ci.cart_id = keep.cart_id AND ci.product_id = keep.product_id
+            AND ci.product_size_id = keep.product_size_id AND ci.id > keep.id
+    """)
+
+    # No safe automatic merge for these - referenced by carts/orders or written by users
+    _assert_unique('products', 'slug')
+    _assert_unique('product_sizes', 'product_id, size')
+    _assert_unique('reviews', 'product_id, user_id')
+
+    # Product detail / review / update / delete lookups by slug
+    op.create_unique_constraint('uq_products_slug', 'products', ['slug'])
+    # add_to_cart and stock deduction look sizes up by (product_id, size)
+    op.create_unique_constraint('uq_product_sizes_product_id_size', 'product_sizes', ['product_id', 'size'])
+
+    op.create_unique_constraint('uq_carts_user_id', 'carts', ['user_id'])
+    op.create_unique_constraint(
+        'uq_cart_items_cart_product_size', 'cart_items', ['cart_id', 'product_id', 'product_size_id']
+    )
+
+    # Order history (user) and admin list (status filter), both newest first
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'])
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'])
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+
+    # Product reviews newest first; one review per user and product
+    op.create_index('ix_reviews_product_id_created_at', 'reviews', ['product_id', 'created_at'])
+    op.create_unique_constraint('uq_reviews_product_id_user_id', 'reviews', ['product_id', 'user_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_reviews_product_id_user_id', 'reviews', type_='unique')
+    op.drop_index('ix_reviews_product_id_created_at', table_name='reviews')
+
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
+
+    op.drop_constraint('uq_cart_items_cart_product_size', 'cart_items', type_='unique')
+    op.drop_constraint('uq_carts_user_id', 'carts', type_='unique')
+
+    op.drop_constraint('uq_product_sizes_product_id_size', 'product_sizes', type_='unique')
+    op.drop_constraint('uq_products_slug', 'products', type_='unique')
+    # Merged carts / cart lines are not split again
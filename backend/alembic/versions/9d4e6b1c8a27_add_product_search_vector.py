@@ -0,0 +1,60 @@
+"""add_product_search_vector
+
+Revision ID: 9d4e6b1c8a27
+Revises: 5c1f9a7e2b3d
+Create Date: 2026-10-17 14:03:27.905112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e6b1c8a27'
+down_revision: Union[str, None] = '5c1f9a7e2b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA public')
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public')
+
+    # unaccent() is only STABLE (its dictionary can change), so wrap it with a fixed
+    # dictionary to use it in a generated column and in index expressions.
+    # The unaccent rules fold Vietnamese diacritics, including đ/Đ -> d/D.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION search_normalize(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS
+        $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, value)) $$
+    """)
+
+    # Maintained by Postgres on every insert/update - no trigger or app code needed
+    op.execute("""
+        ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple'::regconfig, search_normalize(coalesce(product_name, ''))), 'A') ||
+            setweight(to_tsvector('simple'::regconfig, search_normalize(coalesce(product_type, ''))), 'B') ||
+            setweight(to_tsvector('simple'::regconfig, search_normalize(coalesce(blurb, ''))), 'C') ||
+            setweight(to_tsvector('simple'::regconfig, search_normalize(coalesce(description, ''))), 'D')
+        ) STORED
+    """)
+    op.execute('CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)')
+
+    # Partial words and typos in product names (word_similarity / <%)
+    op.execute(
+        'CREATE INDEX ix_products_product_name_trgm ON products '
+        'USING gin (search_normalize(product_name) gin_trgm_ops)'
+    )
+    # The product_type ILIKE '%...%' filter of both search paths (category: see c5d7e9f1a2b4)
+    op.execute('CREATE INDEX ix_products_product_type_trgm ON products USING gin (product_type gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_product_type_trgm', table_name='products')
+    op.drop_index('ix_products_product_name_trgm', table_name='products')
+    op.drop_index('ix_products_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
+    op.execute('DROP FUNCTION IF EXISTS search_normalize(text)')
+    # Extensions are left installed - other objects may depend on them
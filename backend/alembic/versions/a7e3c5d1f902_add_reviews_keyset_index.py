@@ -0,0 +1,30 @@
+"""add_reviews_keyset_index
+
+Revision ID: a7e3c5d1f902
+Revises: f4c9a2d7b318
+Create Date: 2026-10-17 22:41:37.118254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c5d1f902'
+down_revision: Union[str, None] = 'f4c9a2d7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Review pages: WHERE product_id = :id AND (created_at, id) < (:key, :id) ORDER BY created_at DESC, id DESC
+    # - the id tiebreaker makes the old (product_id, created_at) index redundant
+    op.create_index('ix_reviews_product_id_created_at_id', 'reviews', ['product_id', 'created_at', 'id'])
+    op.drop_index('ix_reviews_product_id_created_at', table_name='reviews')
+
+
+def downgrade() -> None:
+    op.create_index('ix_reviews_product_id_created_at', 'reviews', ['product_id', 'created_at'])
+    op.drop_index('ix_reviews_product_id_created_at_id', table_name='reviews')
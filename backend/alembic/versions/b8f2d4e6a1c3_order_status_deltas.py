@@ -0,0 +1,53 @@
+"""order_status_deltas
+
+Revision ID: b8f2d4e6a1c3
+Revises: a7e3c5d1f902
+Create Date: 2026-10-17 21:40:12.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f2d4e6a1c3'
+down_revision: Union[str, None] = 'a7e3c5d1f902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One counter row per status made every checkout UPDATE the 'pending' row inside its
+    # transaction, so concurrent checkouts queued on that row lock until commit.
+    # Insert-only +1/-1 rows instead; scripts/compact_order_status_deltas.py folds them
+    # back into one row per status (run it from cron, e.g. hourly).
+    op.create_table(
+        'order_status_deltas',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('delta', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_status_deltas_status', 'order_status_deltas', ['status'])
+    op.execute("""
+        INSERT INTO order_status_deltas (status, delta)
+        SELECT status, count FROM order_status_counts WHERE count <> 0
+    """)
+    op.drop_table('order_status_counts')
+
+
+def downgrade() -> None:
+    op.create_table(
+        'order_status_counts',
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('status')
+    )
+    op.execute("""
+        INSERT INTO order_status_counts (status, count)
+        SELECT status, SUM(delta) FROM order_status_deltas GROUP BY status
+    """)
+    op.drop_index('ix_order_status_deltas_status', table_name='order_status_deltas')
+    op.drop_table('order_status_deltas')
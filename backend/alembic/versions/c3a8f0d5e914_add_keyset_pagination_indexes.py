@@ -0,0 +1,31 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: c3a8f0d5e914
+Revises: 9d4e6b1c8a27
+Create Date: 2026-10-17 16:48:09.337650
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8f0d5e914'
+down_revision: Union[str, None] = '9d4e6b1c8a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (sort key, id) for cursor pages: WHERE (key, id) > (:key, :id) ORDER BY key, id LIMIT n
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'])
+    op.create_index('ix_products_price_id', 'products', ['price', 'id'])
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_index('ix_products_price_id', table_name='products')
+    op.drop_index('ix_products_created_at_id', table_name='products')
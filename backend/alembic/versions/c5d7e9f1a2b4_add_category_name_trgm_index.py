@@ -0,0 +1,28 @@
+"""add_category_name_trgm_index
+
+Revision ID: c5d7e9f1a2b4
+Revises: b8f2d4e6a1c3
+Create Date: 2026-10-17 22:05:41.287630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d7e9f1a2b4'
+down_revision: Union[str, None] = 'b8f2d4e6a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The category filter runs Category.name ILIKE '%...%' - index the column as queried
+    # (pg_trgm comes with 9d4e6b1c8a27, like ix_products_product_type_trgm)
+    op.execute('CREATE INDEX ix_categories_name_trgm ON categories USING gin (name gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_categories_name_trgm', table_name='categories')
@@ -0,0 +1,38 @@
+"""add_order_status_counts
+
+Revision ID: e71b2d9c4f60
+Revises: c3a8f0d5e914
+Create Date: 2026-10-17 19:22:54.160384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e71b2d9c4f60'
+down_revision: Union[str, None] = 'c3a8f0d5e914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-status order totals for the admin order list, maintained by the Order mapper events
+    op.create_table(
+        'order_status_counts',
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('status')
+    )
+    # Backfill - app instances still running the previous release don't update the counters,
+    # so run this together with the deploy (or re-run the backfill afterwards)
+    op.execute("""
+        INSERT INTO order_status_counts (status, count)
+        SELECT COALESCE(status, 'pending'), COUNT(*) FROM orders GROUP BY COALESCE(status, 'pending')
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('order_status_counts')
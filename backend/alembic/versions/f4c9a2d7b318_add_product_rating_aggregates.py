@@ -0,0 +1,48 @@
+"""add_product_rating_aggregates
+
+Revision ID: f4c9a2d7b318
+Revises: e71b2d9c4f60
+Create Date: 2026-10-17 21:08:12.503917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c9a2d7b318'
+down_revision: Union[str, None] = 'e71b2d9c4f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAR_COLUMNS = ['stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5']
+
+
+def upgrade() -> None:
+    # Review aggregates per product, maintained by the Review mapper events
+    op.add_column('products', sa.Column('rating_avg', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('products', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+    for column in STAR_COLUMNS:
+        op.add_column('products', sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+    # Backfill - app instances still running the previous release don't update the aggregates,
+    # so run this together with the deploy (or scripts/backfill_product_ratings.py afterwards)
+    stars = ", ".join(
+        f"{column} = (SELECT COUNT(*) FROM reviews WHERE reviews.product_id = products.id AND reviews.rating = {n})"
+        for n, column in enumerate(STAR_COLUMNS, start=1)
+    )
+    op.execute(f"""
+        UPDATE products SET
+            rating_count = (SELECT COUNT(*) FROM reviews WHERE reviews.product_id = products.id),
+            rating_avg = COALESCE((SELECT AVG(rating) FROM reviews WHERE reviews.product_id = products.id), 0),
+            {stars}
+        WHERE EXISTS (SELECT 1 FROM reviews WHERE reviews.product_id = products.id)
+    """)
+
+
+def downgrade() -> None:
+    for column in reversed(STAR_COLUMNS):
+        op.drop_column('products', column)
+    op.drop_column('products', 'rating_count')
+    op.drop_column('products', 'rating_avg')
@@ -1,9 +1,12 @@
-from fastapi import FastAPI, Request
+import os
+from fastapi import FastAPI, Request, Depends
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from contextlib import asynccontextmanager
+from functools import partial
 
-from app.routers.product_router import product_router
+from app.routers.product_router import product_router, catalog_warmup_jobs
 from app.routers.cart_router import cart_router
 from app.routers.support_router import support_router
 from app.routers.auth_router import router as auth_router
@@ -11,15 +14,23 @@ from app.routers.order_router import order_router
 from app.routers.chat_router import chat_router
 from app.routers.payment_router import payment_router
 from app.routers.webhook_router import webhook_router
-from app.routers.search_router import router as search_router
+from app.routers.search_router import router as search_router, search_warmup_jobs
 
-from app.db import create_tables
+from app.db import create_tables, run_in_read_session, get_replica_engines, db_stats
+from app.db.middleware import ReplicaStickinessMiddleware, DbMetricsMiddleware
 from app.models.sqlalchemy import *
-from app.cache import init_redis, close_redis
+from app.cache import (
+    init_redis, close_redis, start_invalidation_listener, cache_stats, init_known_slugs, cache_warmer,
+)
+from app.services.product_service import Product_Service
+from app.services.user_service import require_admin
 from app.search.product_index import ensure_product_index
+from app.loop_monitor import enable_loop_block_detection
 
 from fastapi_pagination import Page, add_pagination, paginate
 
+LOOP_BLOCK_WARN_MS = float(os.getenv('LOOP_BLOCK_WARN_MS', '0'))
+
 
 # =====================
 # Security Headers Middleware
@@ -74,8 +85,15 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
+    if LOOP_BLOCK_WARN_MS:
+        # Development aid: log every event loop step slower than this (sync I/O in async routes)
+        enable_loop_block_detection(LOOP_BLOCK_WARN_MS / 1000)
     await init_redis()
+    await start_invalidation_listener()  # Keep per-worker local cache tier coherent
+    await init_known_slugs(partial(run_in_read_session, Product_Service.get_all_slugs))  # Optional slug Bloom filter (PRODUCT_SLUG_BLOOM)
     ensure_product_index()  # Create ES index if not exists
+    # Fill hot catalog keys in the background - /ready reports 503 until this finishes or times out
+    cache_warmer.start()
     yield
     # Shutdown
     await close_redis()
@@ -108,6 +126,13 @@ app = FastAPI(
 # Security Headers Middleware (Helmet equivalent)
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Read-your-writes for read replicas (no-op without DATABASE_REPLICA_URLS)
+if get_replica_engines():
+    app.add_middleware(ReplicaStickinessMiddleware)
+
+# Per-request statement count / DB time, N+1 warnings
+app.add_middleware(DbMetricsMiddleware)
+
 # CORS Middleware - Tightened security
 app.add_middleware(
     CORSMiddleware,
@@ -121,7 +146,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["Content-Range", "X-Total-Count"],
+    expose_headers=["Content-Range", "X-Total-Count", "X-Next-Cursor"],
 )
 
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
@@ -135,8 +160,33 @@ app.include_router(support_router)
 app.include_router(search_router, tags=["Search"])  # Elasticsearch search
 add_pagination(app)
 
+# Hot keys reloaded on startup and after product invalidation
+cache_warmer.register(catalog_warmup_jobs)
+cache_warmer.register(search_warmup_jobs)
+
 create_tables()
 
 @app.get("/")
 async def root():
     return {"message": "Hello, world!"}
+
+
+@app.get("/cache/stats", tags=["Monitoring"])
+async def read_cache_stats(current_user = Depends(require_admin)):
+    """Per-tier cache hit/miss counters for this worker (admin only)"""
+    return cache_stats()
+
+
+@app.get("/db/stats", tags=["Monitoring"])
+async def read_db_stats(current_user = Depends(require_admin)):
+    """Statement totals and connection pool gauges (size, checked out, overflow) for this worker (admin only)"""
+    return db_stats()
+
+
+@app.get("/ready", tags=["Monitoring"])
+async def readiness():
+    """Readiness probe - 503 until the startup cache warm-up has finished or timed out"""
+    warmup = cache_warmer.stats()
+    if not cache_warmer.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": warmup})
+    return {"status": "ready", "warmup": warmup}
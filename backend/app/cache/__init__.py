@@ -1,115 +1,724 @@
 import os
 import json
+import time
+import uuid
 import asyncio
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Callable, Awaitable, NamedTuple
 from dotenv import load_dotenv
 
+from app.cache.bloom import KnownKeysFilter
+from app.cache.breaker import CircuitBreaker
+from app.cache.codec import CacheCodec, fingerprint
+from app.cache.local import LocalCache
+from app.cache.singleflight import SingleFlight
+from app.cache.warmup import CacheWarmer
+
 load_dotenv()
 
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
 # Redis client singleton
 redis: Optional[Any] = None
-_redis_available: bool = True
+
+# Circuit breaker: after REDIS_BREAKER_FAILURES consecutive errors Redis is skipped
+# (no socket timeouts on the request path) and probed in the background until it recovers
+breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv('REDIS_BREAKER_FAILURES', '3')),
+    base_backoff=float(os.getenv('REDIS_BREAKER_BACKOFF', '1')),
+    max_backoff=float(os.getenv('REDIS_BREAKER_MAX_BACKOFF', '60')),
+)
+_probe_task: Optional[asyncio.Task] = None
 
 # Default TTL: 300 seconds (5 minutes)
 DEFAULT_TTL = 300
 
+# Payload encoding - see app/cache/codec.py (orjson/msgpack/zstd/lz4 are optional installs)
+codec = CacheCodec(
+    codec=os.getenv('CACHE_CODEC', 'json'),
+    compression=os.getenv('CACHE_COMPRESSION', 'none'),
+    compression_threshold=int(os.getenv('CACHE_COMPRESSION_THRESHOLD', '1024')),
+)
+
+# In-process tier in front of Redis (hot product details etc.)
+LOCAL_CACHE_MAXSIZE = int(os.getenv('LOCAL_CACHE_MAXSIZE', '500'))
+LOCAL_CACHE_TTL = float(os.getenv('LOCAL_CACHE_TTL', '30'))
+local_cache = LocalCache(maxsize=LOCAL_CACHE_MAXSIZE, ttl=LOCAL_CACHE_TTL)
+
+# Every worker subscribes to this channel and drops the published keys from its local tier
+CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate')
+_invalidation_task: Optional[asyncio.Task] = None
+
+_redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+# Stampede protection: one loader per key per worker, plus a short Redis lock across workers
+CACHE_LOCK_TTL = float(os.getenv('CACHE_LOCK_TTL', '5'))
+CACHE_LOCK_POLL_INTERVAL = float(os.getenv('CACHE_LOCK_POLL_INTERVAL', '0.05'))
+_single_flight = SingleFlight()
+
+# Stale-while-revalidate: entries written with stale_ttl carry their soft expiry in the payload
+SWR_MARKER = "__swr_fresh_until__"
+_swr_stats = {"stale_served": 0, "refreshes": 0}
+_background_tasks = set()
+
+# Negative caching: slugs that 404 are remembered briefly so crawlers don't hit Postgres
+NEGATIVE_CACHE_TTL = int(os.getenv('NEGATIVE_CACHE_TTL', '60'))
+# Optional Bloom filter of existing slugs - lets unknown slugs 404 without any network call
+known_product_slugs = KnownKeysFilter(enabled=os.getenv('PRODUCT_SLUG_BLOOM', 'false').lower() == 'true')
+_known_slugs_loader: Optional[Callable[[], Awaitable[List[str]]]] = None
+
+# Invalidations that could not reach Redis (breaker open / error) - replayed when it recovers,
+# otherwise entries written before the outage outlive the changes made during it
+MAX_MISSED_INVALIDATIONS = 10000
+_missed_invalidations = {"keys": set(), "patterns": set(), "namespaces": set()}
+
+# Hit/miss per logical cache (e.g. "products_list") for cache_get_or_load callers
+_metric_stats = {}
+
+# Hot keys reloaded on startup and after invalidation - routers register the jobs (see app/cache/warmup.py)
+cache_warmer = CacheWarmer(
+    concurrency=int(os.getenv('CACHE_WARMUP_CONCURRENCY', '4')),
+    timeout=float(os.getenv('CACHE_WARMUP_TIMEOUT', '30')),
+    debounce=float(os.getenv('CACHE_WARMUP_DEBOUNCE', '2')),
+    enabled=os.getenv('CACHE_WARMUP', 'true').lower() == 'true',
+    available=lambda: _redis_ready(),
+)
+
 
 async def init_redis():
-    """Initialize Redis connection - call this on app startup"""
-    global redis, _redis_available
+    """Initialize Redis connection - call this on app startup
+
+    If Redis is down the breaker opens and a background probe reconnects
+    later, so the app starts without cache and picks it up on recovery.
+    """
+    global redis
     try:
         import redis.asyncio as aioredis
         redis = await aioredis.from_url(
             REDIS_URL,
             encoding="utf-8",
-            decode_responses=True,
+            decode_responses=False,  # payloads are binary (see codec)
             socket_connect_timeout=3,
             socket_timeout=3,
         )
+    except Exception as e:
+        print(f"Redis client unavailable, running without cache: {e}")
+        redis = None
+        return
+    try:
         # Test connection
         await redis.ping()
+        breaker.record_success()
         print(f"Redis connected successfully to {REDIS_URL[:30]}...")
-        _redis_available = True
     except Exception as e:
-        print(f"Redis unavailable, running without cache: {e}")
-        _redis_available = False
-        redis = None
+        print(f"Redis unavailable, running without cache until it recovers: {e}")
+        breaker.trip()
+        _start_probe()
 
 
 async def close_redis():
     """Close Redis connection - call this on app shutdown"""
-    global redis
+    global redis, _probe_task
+    await cache_warmer.stop()
+    await stop_invalidation_listener()
+    if _probe_task is not None:
+        _probe_task.cancel()
+        try:
+            await _probe_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _probe_task = None
+    local_cache.clear()
     if redis:
         await redis.close()
         redis = None
 
 
-async def cache_get(key: str) -> Optional[Any]:
-    """Get value from cache - returns None if cache unavailable"""
-    global redis, _redis_available
-    if not _redis_available or not redis:
+# =====================
+# Circuit Breaker
+# =====================
+
+def _redis_ready() -> bool:
+    """True if there is a client and the breaker lets calls through"""
+    return redis is not None and breaker.allow_request()
+
+
+def _redis_ok():
+    breaker.record_success()
+
+
+def _redis_failed(operation: str, e: Exception):
+    """Log a failed Redis call and count it towards opening the breaker"""
+    _redis_stats["errors"] += 1
+    print(f"Cache {operation} error: {e}")
+    if breaker.record_failure():
+        print(f"Redis circuit breaker opened after {breaker.failure_threshold} failures")
+        _start_probe()
+
+
+def _start_probe():
+    global _probe_task
+    if _probe_task is None or _probe_task.done():
+        _probe_task = asyncio.ensure_future(_probe_redis())
+
+
+async def _probe_redis():
+    """PING Redis with exponential backoff until it answers, then close the breaker"""
+    while not breaker.allow_request():
+        await asyncio.sleep(breaker.retry_in())
+        try:
+            await redis.ping()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            breaker.record_probe(False)
+            print(f"Redis probe failed, retrying in {breaker.retry_in():.0f}s: {e}")
+            continue
+        # Invalidations published while we were away were missed - start from empty
+        local_cache.clear()
+        known_product_slugs.reset()
+        breaker.record_probe(True)
+        print("Redis recovered, circuit breaker closed")
+        await _replay_missed_invalidations()
+        await start_invalidation_listener()
+
+
+def _missed_invalidation(keys=(), pattern: Optional[str] = None, namespace: Optional[str] = None):
+    """Remember an invalidation Redis didn't get (see _replay_missed_invalidations)"""
+    missed = _missed_invalidations
+    missed["keys"].update(keys)
+    if len(missed["keys"]) > MAX_MISSED_INVALIDATIONS:
+        # Too many to replay one by one - drop every product detail / review entry instead
+        missed["keys"].clear()
+        missed["patterns"].update(("product:*", "reviews:*"))
+    if pattern:
+        missed["patterns"].add(pattern)
+    if namespace:
+        missed["namespaces"].add(namespace)
+
+
+async def _replay_missed_invalidations():
+    """Apply the invalidations skipped during an outage once Redis is back
+
+    The products namespace is bumped on every recovery: list pages cached
+    before the outage must not survive product changes made during it.
+    """
+    missed = _missed_invalidations
+    keys, patterns = list(missed["keys"]), list(missed["patterns"])
+    namespaces = missed["namespaces"] | {PRODUCTS_NAMESPACE}
+    missed["keys"], missed["patterns"], missed["namespaces"] = set(), set(), set()
+    for start in range(0, len(keys), 500):
+        try:
+            await redis.unlink(*keys[start:start + 500])
+        except Exception as e:
+            _redis_failed("replay delete", e)
+            _missed_invalidation(keys[start:])
+            return
+    for pattern in patterns:
+        await cache_delete_pattern(pattern)
+    for namespace in namespaces:
+        await cache_bump_namespace(namespace)
+
+
+async def _cache_get_raw(key: str, local: bool = True) -> Optional[Any]:
+    """Get the decoded stored payload (SWR entries still wrapped)"""
+    if not _redis_ready():
         return None
+    if local:
+        value = local_cache.get(key)
+        if value is not None:
+            return value
     try:
         data = await redis.get(key)
-        if data:
-            return json.loads(data)
+    except Exception as e:
+        _redis_failed("get", e)
         return None
+    _redis_ok()
+    if not data:
+        _redis_stats["misses"] += 1
+        return None
+    try:
+        value = codec.decode(data)
     except Exception as e:
-        print(f"Cache get error: {e}")
+        # A corrupt entry is not a Redis outage - don't count it towards the breaker
+        print(f"Cache decode error for {key}: {e}")
+        _redis_stats["misses"] += 1
+        return None
+    _redis_stats["hits"] += 1
+    if local:
+        local_cache.set(key, value)
+    return value
+
+
+class CacheEntry(NamedTuple):
+    """A cached value with its soft expiry (SWR) and ETag, when stored with them"""
+    value: Any
+    fresh_until: Optional[float] = None
+    etag: Optional[str] = None
+
+
+def _unwrap_entry(raw: Any) -> CacheEntry:
+    """Split a stored payload into a CacheEntry; plain entries have no fresh_until/etag"""
+    if isinstance(raw, dict) and SWR_MARKER in raw:
+        return CacheEntry(raw["value"], raw[SWR_MARKER], raw.get("etag"))
+    return CacheEntry(raw)
+
+
+async def cache_get_entry(key: str, local: bool = True) -> Optional[CacheEntry]:
+    """Get CacheEntry(value, fresh_until, etag) from cache - None on miss"""
+    raw = await _cache_get_raw(key, local)
+    if raw is None:
         return None
+    return _unwrap_entry(raw)
+
 
+async def cache_get(key: str, local: bool = True, allow_stale: bool = True) -> Optional[Any]:
+    """Get value from cache - returns None if cache unavailable
 
-async def cache_set(key: str, value: Any, ttl: int = DEFAULT_TTL) -> bool:
-    """Set value in cache with expiration (TTL in seconds)"""
-    global redis, _redis_available
-    if not _redis_available or not redis:
+    Checks the in-process tier first (no network), then Redis.
+    Returned values may be shared with other requests - do not mutate them.
+    With allow_stale=False, SWR entries past their soft TTL count as misses.
+    """
+    entry = await cache_get_entry(key, local)
+    if entry is None:
+        return None
+    if not allow_stale and entry.fresh_until is not None and entry.fresh_until <= time.time():
+        return None
+    return entry.value
+
+
+async def cache_set(key: str, value: Any, ttl: int = DEFAULT_TTL, local: bool = True, stale_ttl: int = 0,
+                    etag: Optional[str] = None) -> bool:
+    """Set value in cache with expiration (TTL in seconds)
+
+    With stale_ttl, the entry is fresh for ttl seconds and then kept for
+    stale_ttl more, during which cache_get_or_load serves it while a
+    background task refreshes it (stale-while-revalidate).
+    etag is stored alongside the value so conditional GETs can be answered
+    without re-encoding it.
+    """
+    if not _redis_ready():
         return False
+    payload = value
+    if stale_ttl or etag:
+        payload = {SWR_MARKER: time.time() + ttl, "value": value, "etag": etag}
     try:
-        await redis.setex(key, ttl, json.dumps(value))
-        return True
+        data = codec.encode(payload)
     except Exception as e:
-        print(f"Cache set error: {e}")
+        print(f"Cache encode error for {key}: {e}")
         return False
+    try:
+        await redis.setex(key, ttl + stale_ttl, data)
+    except Exception as e:
+        _redis_failed("set", e)
+        return False
+    _redis_ok()
+    if local:
+        local_cache.set(key, payload, ttl + stale_ttl)
+    return True
 
 
 async def cache_delete(key: str) -> bool:
-    """Delete key from cache"""
-    global redis, _redis_available
-    if not _redis_available or not redis:
+    """Delete key from cache (Redis + local tier of every worker)"""
+    local_cache.delete(key)
+    if not _redis_ready():
+        _missed_invalidation([key])
         return False
     try:
         await redis.delete(key)
+        await publish_invalidation(key)
         return True
     except Exception as e:
-        print(f"Cache delete error: {e}")
+        _redis_failed("delete", e)
+        _missed_invalidation([key])
         return False
 
 
-async def cache_delete_pattern(pattern: str) -> bool:
-    """Delete all keys matching pattern"""
-    global redis, _redis_available
-    if not _redis_available or not redis:
+async def cache_delete_pattern(pattern: str, batch_size: int = 500) -> bool:
+    """Delete all keys matching pattern.
+
+    Uses incremental SCAN + UNLINK so Redis is never blocked by a KEYS call.
+    This is O(keyspace) - hot invalidation paths should bump a namespace
+    version instead (see cache_bump_namespace).
+    """
+    if not _redis_ready():
+        _missed_invalidation(pattern=pattern)
         return False
     try:
-        keys = await redis.keys(pattern)
-        if keys:
-            await asyncio.gather(*[redis.delete(k) for k in keys])
+        batch = []
+        async for key in redis.scan_iter(match=pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                await redis.unlink(*batch)
+                batch = []
+        if batch:
+            await redis.unlink(*batch)
+        local_cache.delete_matching(pattern)
+        await publish_invalidation(pattern)
+        cache_warmer.schedule()
         return True
     except Exception as e:
-        print(f"Cache delete pattern error: {e}")
+        _redis_failed("delete pattern", e)
+        _missed_invalidation(pattern=pattern)
         return False
 
 
+# =====================
+# Local Tier Invalidation
+# =====================
+
+async def publish_invalidation(*keys: str) -> bool:
+    """Tell every worker to drop keys (or glob patterns) from its local tier"""
+    if not _redis_ready() or not keys:
+        return False
+    try:
+        await redis.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(list(keys)))
+        return True
+    except Exception as e:
+        _redis_failed("publish invalidation", e)
+        return False
+
+
+def _apply_invalidation(data: str):
+    """Handle one message from the invalidation channel"""
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    try:
+        keys = json.loads(data)
+    except (TypeError, ValueError):
+        keys = [data]
+    for key in keys:
+        if "*" in key:
+            local_cache.delete_matching(key)
+        else:
+            local_cache.delete(key)
+            if key.startswith(MISSING_PRODUCT_PREFIX):
+                # The slug exists now (product created on another worker)
+                known_product_slugs.add(key[len(MISSING_PRODUCT_PREFIX):])
+
+
+async def _listen_for_invalidations():
+    """Subscribe to the invalidation channel until cancelled, reconnecting on errors
+
+    Pauses while the breaker is open; the probe clears the local tier before
+    closing it, so nothing published during the outage is served stale.
+    """
+    while True:
+        if not breaker.allow_request():
+            await asyncio.sleep(1)
+            continue
+        pubsub = None
+        try:
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            if known_product_slugs.enabled and not known_product_slugs.ready:
+                await rebuild_known_slugs()
+            while breaker.allow_request():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    _apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Messages may have been missed while disconnected - drop everything
+            print(f"Cache invalidation listener error: {e}")
+            local_cache.clear()
+            known_product_slugs.reset()
+            await asyncio.sleep(1)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+async def start_invalidation_listener():
+    """Start the pub/sub listener for this worker - call after init_redis on startup"""
+    global _invalidation_task
+    if redis is None or _invalidation_task is not None:
+        return
+    _invalidation_task = asyncio.create_task(_listen_for_invalidations())
+
+
+async def stop_invalidation_listener():
+    global _invalidation_task
+    if _invalidation_task is None:
+        return
+    _invalidation_task.cancel()
+    try:
+        await _invalidation_task
+    except (asyncio.CancelledError, Exception):
+        pass
+    _invalidation_task = None
+
+
+def cache_stats() -> dict:
+    """Per-tier hit/miss counters plus hit ratio per named cache"""
+    return {
+        "local": local_cache.stats(),
+        "redis": dict(_redis_stats, available=_redis_ready()),
+        "breaker": breaker.stats(),
+        "singleflight": _single_flight.stats(),
+        "swr": dict(_swr_stats),
+        "known_slugs": known_product_slugs.stats(),
+        "warmup": cache_warmer.stats(),
+        "caches": {
+            name: dict(counts, hit_ratio=_hit_ratio(counts["hits"], counts["misses"]))
+            for name, counts in _metric_stats.items()
+        },
+    }
+
+
+def _hit_ratio(hits: int, misses: int) -> float:
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+def _record(metric: Optional[str], hit: bool):
+    if metric is None:
+        return
+    counts = _metric_stats.setdefault(metric, {"hits": 0, "misses": 0})
+    counts["hits" if hit else "misses"] += 1
+
+
+# =====================
+# Single-flight Loading
+# =====================
+
+def lock_cache_key(key: str) -> str:
+    """Redis key of the cross-worker load lock for a cache key"""
+    return f"lock:{key}"
+
+
+async def cache_get_or_load(key: str, loader: Callable[[], Awaitable[Any]], ttl: int = DEFAULT_TTL,
+                            stale_ttl: int = 0, metric: Optional[str] = None) -> Any:
+    """Get value from cache, or run loader once and cache its result.
+
+    Concurrent misses for the same key in this worker await a single loader
+    call. Across workers a short Redis lock elects one loader while the
+    others poll the key until it is filled (or the lock disappears).
+    Exceptions raised by the loader (e.g. 404) propagate to every waiter.
+
+    With stale_ttl, an entry past its soft TTL is returned immediately and
+    refreshed in the background through the same single-flight path.
+    metric names the hit/miss counter reported by cache_stats().
+    """
+    entry = await cache_get_or_load_entry(key, loader, ttl, stale_ttl, metric)
+    return entry.value
+
+
+async def cache_get_or_load_entry(key: str, loader: Callable[[], Awaitable[Any]], ttl: int = DEFAULT_TTL,
+                                  stale_ttl: int = 0, metric: Optional[str] = None,
+                                  etag: bool = False) -> CacheEntry:
+    """Like cache_get_or_load, but returns the CacheEntry.
+
+    With etag=True the entry's ETag is computed once when the value is
+    loaded and stored with it, so cache hits carry it for free.
+    """
+    entry = await cache_get_entry(key)
+    _record(metric, hit=entry is not None)
+    if entry is not None:
+        if entry.fresh_until is not None and entry.fresh_until <= time.time():
+            _swr_stats["stale_served"] += 1
+            _refresh_in_background(key, loader, ttl, stale_ttl, etag)
+        if etag and entry.etag is None:
+            # Entry written without an ETag (e.g. before rollout)
+            entry = entry._replace(etag=fingerprint(entry.value))
+        return entry
+    return await _single_flight.do(key, lambda: _load_with_lock(key, loader, ttl, stale_ttl, etag))
+
+
+def _refresh_in_background(key: str, loader: Callable[[], Awaitable[Any]], ttl: int, stale_ttl: int,
+                           etag: bool = False):
+    """Schedule one refresh of a stale key (joins an in-flight load if there is one)"""
+    async def refresh():
+        try:
+            await _single_flight.do(key, lambda: _load_with_lock(key, loader, ttl, stale_ttl, etag, refresh=True))
+        except Exception as e:
+            print(f"Cache background refresh error for {key}: {e}")
+
+    task = asyncio.ensure_future(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _load_with_lock(key: str, loader: Callable[[], Awaitable[Any]], ttl: int, stale_ttl: int = 0,
+                          etag: bool = False, refresh: bool = False) -> CacheEntry:
+    if not _redis_ready():
+        value = await loader()
+        return CacheEntry(value, etag=fingerprint(value) if etag else None)
+
+    lock_key = lock_cache_key(key)
+    token = uuid.uuid4().hex
+    try:
+        acquired = bool(await redis.set(lock_key, token, px=int(CACHE_LOCK_TTL * 1000), nx=True))
+        contended = not acquired
+    except Exception as e:
+        _redis_failed("lock", e)
+        acquired = contended = False
+
+    if contended:
+        if refresh:
+            # Another worker is already refreshing this key - serve what Redis has (it may
+            # already be fresh), not this worker's local copy that triggered the refresh
+            entry = await _redis_entry(key, stale_ttl)
+            if entry is not None:
+                return entry
+        # Another worker is loading - wait for it to fill the key
+        entry = await _wait_for_key(key, lock_key)
+        if entry is not None:
+            return entry
+
+    try:
+        if acquired:
+            # The previous lock holder may have filled the key just before we got the lock
+            entry = await _redis_entry(key, stale_ttl)
+            if entry is not None:
+                if not refresh or entry.fresh_until is None or entry.fresh_until > time.time():
+                    return entry
+        if refresh:
+            _swr_stats["refreshes"] += 1
+        value = await loader()
+        tag = fingerprint(value) if etag else None
+        await cache_set(key, value, ttl, stale_ttl=stale_ttl, etag=tag)
+        return CacheEntry(value, time.time() + ttl, tag)
+    finally:
+        if acquired:
+            await _release_lock(lock_key, token)
+
+
+async def _redis_entry(key: str, stale_ttl: int = 0) -> Optional[CacheEntry]:
+    """Read key from Redis, bypassing the local tier, and put a fresh entry into the local tier
+
+    Without this a worker whose local copy went stale would keep serving it
+    (and refreshing in the background) after another worker refreshed Redis.
+    """
+    raw = await _cache_get_raw(key, local=False)
+    if raw is None:
+        return None
+    entry = _unwrap_entry(raw)
+    if entry.fresh_until is None:
+        local_cache.set(key, raw)
+    elif entry.fresh_until > time.time():
+        # Redis keeps the entry ttl + stale_ttl from when it was written
+        local_cache.set(key, raw, entry.fresh_until + stale_ttl - time.time())
+    return entry
+
+
+async def _wait_for_key(key: str, lock_key: str) -> Optional[CacheEntry]:
+    """Poll key while another worker holds its lock; None if the lock expires or is released empty"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + CACHE_LOCK_TTL
+    while loop.time() < deadline:
+        await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+        entry = await cache_get_entry(key)
+        if entry is not None:
+            return entry
+        try:
+            if not await redis.exists(lock_key):
+                return await cache_get_entry(key)
+        except Exception as e:
+            _redis_failed("lock poll", e)
+            return None
+    return None
+
+
+async def _release_lock(lock_key: str, token: str):
+    """Release the lock only if we still own it"""
+    try:
+        owner = await redis.get(lock_key)
+        if isinstance(owner, bytes):
+            owner = owner.decode("utf-8")
+        if owner == token:
+            await redis.delete(lock_key)
+    except Exception as e:
+        _redis_failed("lock release", e)
+
+
+# =====================
+# Namespace Versions
+# =====================
+# Keys in a namespace embed the namespace's current generation number.
+# Invalidating the whole namespace is a single O(1) INCR: readers start
+# building keys with the new number and old entries age out on their TTL.
+
+PRODUCTS_NAMESPACE = "products"
+
+
+def namespace_version_key(namespace: str) -> str:
+    """Redis key holding the generation counter of a namespace"""
+    return f"cache:ns:{namespace}:version"
+
+
+async def cache_namespace_version(namespace: str) -> int:
+    """Get the current generation of a namespace (0 if never bumped or cache unavailable)"""
+    if not _redis_ready():
+        return 0
+    try:
+        version = await redis.get(namespace_version_key(namespace))
+        return int(version) if version else 0
+    except Exception as e:
+        _redis_failed("namespace version", e)
+        return 0
+
+
+async def cache_bump_namespace(namespace: str) -> Optional[int]:
+    """Invalidate every key of a namespace by bumping its generation counter"""
+    if not _redis_ready():
+        _missed_invalidation(namespace=namespace)
+        return None
+    try:
+        return await redis.incr(namespace_version_key(namespace))
+    except Exception as e:
+        _redis_failed("bump namespace", e)
+        _missed_invalidation(namespace=namespace)
+        return None
+
+
 # =====================
 # Cache Key Builders
 # =====================
 
-def products_cache_key(page: int = 1, size: int = 20, **filters) -> str:
-    """Generate cache key for product list"""
-    filter_str = ":".join(f"{k}={v}" for k, v in sorted(filters.items()) if v is not None)
-    return f"products:page={page}:size={size}:{filter_str}" if filter_str else f"products:page={page}:size={size}"
+def canonical_cache_param(value: Any) -> Optional[str]:
+    """Canonical string form of a query param for cache keys - None means 'omit'
+
+    Strings are trimmed and lower-cased, floats use the shortest exact form
+    (10 == 10.0), and empty strings / False count as unset.
+    """
+    if value is None or value is False:
+        return None
+    if value is True:
+        return "1"
+    if isinstance(value, float):
+        return format(value, ".15g")
+    if isinstance(value, str):
+        value = value.strip().lower()
+        return value or None
+    return str(value)
+
+
+def products_cache_key(page: int = 1, size: int = 20, version: int = 0, **filters) -> str:
+    """Generate cache key for product list (version = products namespace generation)
+
+    Filters are canonicalized and unset ones omitted, so equivalent URLs share one entry.
+    """
+    prefix = f"{PRODUCTS_NAMESPACE}:v{version}:page={page}:size={size}"
+    canonical = ((k, canonical_cache_param(v)) for k, v in sorted(filters.items()))
+    filter_str = ":".join(f"{k}={v}" for k, v in canonical if v is not None)
+    return f"{prefix}:{filter_str}" if filter_str else prefix
+
+
+def normalize_search_query(q: Optional[str]) -> str:
+    """Trim, collapse whitespace and casefold a search query ("  Whey  PROTEIN" -> "whey protein")"""
+    return " ".join((q or "").split()).casefold()
+
+
+def search_aggregations_cache_key(q: Optional[str] = None, version: int = 0) -> str:
+    """Generate cache key for search facets (lives in the products namespace)
+
+    q is normalized so case and spacing variants of a query share one entry.
+    """
+    return f"{PRODUCTS_NAMESPACE}:v{version}:aggs:q={normalize_search_query(q)}"
 
 
 def product_cache_key(product_id: int) -> str:
@@ -122,6 +731,29 @@ def product_slug_cache_key(slug: str) -> str:
     return f"product:slug:{slug}"
 
 
+MISSING_PRODUCT_PREFIX = "product:missing:"
+
+
+def product_missing_cache_key(slug: str) -> str:
+    """Generate negative cache key for a slug that does not exist"""
+    return f"{MISSING_PRODUCT_PREFIX}{slug}"
+
+
+def review_summary_cache_key(slug: str) -> str:
+    """Generate cache key for a product's rating summary"""
+    return f"reviews:summary:{slug}"
+
+
+def review_first_page_cache_key(slug: str) -> str:
+    """Generate cache key for the first (default-size) page of a product's reviews"""
+    return f"reviews:first:{slug}"
+
+
+def top_products_cache_key(limit: int) -> str:
+    """Generate cache key for the warm-up best-seller slugs (outside the products namespace)"""
+    return f"warmup:top_products:{limit}"
+
+
 # =====================
 # Cache Invalidation
 # =====================
@@ -133,6 +765,80 @@ async def invalidate_product_cache(product_id: int = None, slug: str = None):
         await cache_delete(product_cache_key(product_id))
     if slug:
         await cache_delete(product_slug_cache_key(slug))
+        # A created (or renamed) product must not keep answering 404
+        known_product_slugs.add(slug)
+        await cache_delete(product_missing_cache_key(slug))
     
-    # Delete all product list caches
-    await cache_delete_pattern("products:*")
+    # Drop all product list caches in O(1) - stale pages expire on their TTL
+    await cache_bump_namespace(PRODUCTS_NAMESPACE)
+    # Refill the hot pages under the new generation before visitors ask for them
+    cache_warmer.schedule()
+
+
+async def invalidate_review_cache(slug: str):
+    """Invalidate what a review write changes: the product's rating summary, first review page and detail
+
+    List pages also show the rating but are left to their TTL - a review is
+    not worth dropping every cached page of the catalog.
+    """
+    keys = [review_summary_cache_key(slug), review_first_page_cache_key(slug), product_slug_cache_key(slug)]
+    for key in keys:
+        local_cache.delete(key)
+    if not _redis_ready():
+        _missed_invalidation(keys)
+        return
+    try:
+        await redis.unlink(*keys)
+        await publish_invalidation(*keys)
+    except Exception as e:
+        _redis_failed("delete review", e)
+        _missed_invalidation(keys)
+
+
+async def invalidate_imported_products(slugs: List[str], batch_size: int = 500):
+    """Invalidate once after a bulk import instead of once per product
+
+    Detail and negative entries of the imported slugs go in UNLINK / publish
+    batches, then the list namespace is bumped and re-warmed a single time.
+    """
+    for start in range(0, len(slugs), batch_size):
+        chunk = slugs[start:start + batch_size]
+        keys = [product_slug_cache_key(slug) for slug in chunk] + [product_missing_cache_key(slug) for slug in chunk]
+        for key in keys:
+            local_cache.delete(key)
+        for slug in chunk:
+            known_product_slugs.add(slug)
+        if not _redis_ready():
+            _missed_invalidation(keys)
+            continue
+        try:
+            await redis.unlink(*keys)
+            await publish_invalidation(*keys)
+        except Exception as e:
+            _redis_failed("delete imported", e)
+            _missed_invalidation(keys)
+    await cache_bump_namespace(PRODUCTS_NAMESPACE)
+    cache_warmer.schedule()
+
+
+# =====================
+# Known Slugs Filter
+# =====================
+
+async def init_known_slugs(loader: Callable[[], Awaitable[List[str]]]):
+    """Build the product slug Bloom filter on startup (loader must not block the event loop)"""
+    global _known_slugs_loader
+    _known_slugs_loader = loader
+    await rebuild_known_slugs()
+
+
+async def rebuild_known_slugs():
+    """Rebuild the slug Bloom filter from the database (no-op if disabled)"""
+    if not known_product_slugs.enabled or _known_slugs_loader is None:
+        return
+    try:
+        slugs = await _known_slugs_loader()
+        known_product_slugs.rebuild(slugs)
+    except Exception as e:
+        print(f"Known slugs rebuild error: {e}")
+        known_product_slugs.reset()
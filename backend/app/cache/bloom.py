@@ -0,0 +1,80 @@
+import math
+import hashlib
+from threading import Lock
+from typing import Iterable, Optional
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives, tunable false positives)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class KnownKeysFilter:
+    """Bloom filter of keys known to exist (e.g. product slugs).
+
+    Only answers "definitely missing" once it has been built from the full
+    key set; until then (or after reset) every key might exist. Keys are
+    added as they are created; removals are not tracked - a deleted key
+    just costs a normal lookup until the next rebuild.
+    """
+
+    def __init__(self, enabled: bool = False, error_rate: float = 0.01):
+        self.enabled = enabled
+        self.error_rate = error_rate
+        self._filter: Optional[BloomFilter] = None
+        self._lock = Lock()
+        self.rejected = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.enabled and self._filter is not None
+
+    def rebuild(self, keys: Iterable[str]):
+        keys = [k for k in keys if k]
+        # Leave headroom for keys created before the next rebuild
+        bloom = BloomFilter(capacity=max(len(keys) * 2, 1000), error_rate=self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            self._filter = bloom
+
+    def add(self, key: str):
+        with self._lock:
+            if self._filter is not None and key:
+                self._filter.add(key)
+
+    def reset(self):
+        """Forget everything - lookups fall through until the next rebuild"""
+        with self._lock:
+            self._filter = None
+
+    def might_contain(self, key: str) -> bool:
+        if not self.ready:
+            return True
+        if key in self._filter:
+            return True
+        self.rejected += 1
+        return False
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "ready": self.ready, "rejected": self.rejected}
@@ -0,0 +1,72 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitBreaker:
+    """Trips after consecutive failures so callers skip a dead dependency immediately.
+
+    While open, allow_request() is False and a background prober (owned by
+    the caller) retries after retry_in() seconds; the delay doubles after
+    every failed probe up to max_backoff. A successful probe closes it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.failures = 0
+        self.backoff = base_backoff
+        self.opened_at = 0.0
+        self.transitions = {"opened": 0, "closed": 0}
+        self.probes = {"ok": 0, "failed": 0}
+
+    def allow_request(self) -> bool:
+        return self.state == CLOSED
+
+    def record_success(self):
+        self.failures = 0
+        if self.state == OPEN:
+            self.state = CLOSED
+            self.backoff = self.base_backoff
+            self.transitions["closed"] += 1
+
+    def record_failure(self) -> bool:
+        """Count a failed call; returns True if this failure opened the breaker"""
+        self.failures += 1
+        if self.state == CLOSED and self.failures >= self.failure_threshold:
+            self.trip()
+            return True
+        return False
+
+    def trip(self):
+        """Open immediately (e.g. the dependency is down at startup)"""
+        if self.state == OPEN:
+            return
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.backoff = self.base_backoff
+        self.transitions["opened"] += 1
+
+    def record_probe(self, ok: bool):
+        if ok:
+            self.probes["ok"] += 1
+            self.record_success()
+        else:
+            self.probes["failed"] += 1
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+
+    def retry_in(self) -> float:
+        return self.backoff
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "backoff_seconds": self.backoff if self.state == OPEN else 0,
+            "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.state == OPEN else 0,
+            "transitions": dict(self.transitions),
+            "probes": dict(self.probes),
+        }
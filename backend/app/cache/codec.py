@@ -0,0 +1,148 @@
+"""
+Pluggable serialization + compression for cached payloads
+
+Encoded entries start with a 3-byte header: MAGIC, codec id, compression id.
+Entries written before the header existed are plain JSON text, which never
+starts with MAGIC, so they are still decoded during rollout.
+
+orjson, msgpack, zstandard and lz4 are optional - if a configured library is
+missing we fall back to stdlib json / no compression.
+"""
+import json
+import uuid
+import hashlib
+from datetime import date, datetime
+from typing import Any
+
+MAGIC = 0x00
+
+# Codec ids (stored in the header - never renumber)
+CODEC_JSON = 1
+CODEC_ORJSON = 2
+CODEC_MSGPACK = 3
+
+# Compression ids (stored in the header - never renumber)
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+COMPRESSION_LZ4 = 2
+
+CODEC_NAMES = {"json": CODEC_JSON, "orjson": CODEC_ORJSON, "msgpack": CODEC_MSGPACK}
+COMPRESSION_NAMES = {"none": COMPRESSION_NONE, "zstd": COMPRESSION_ZSTD, "lz4": COMPRESSION_LZ4}
+
+
+def _default(obj: Any) -> Any:
+    """Serialize values json/msgpack can't handle natively (response models carry datetimes and UUIDs)"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _load_orjson():
+    try:
+        import orjson
+        return orjson
+    except ImportError:
+        return None
+
+
+def _load_msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+def _load_zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _load_lz4():
+    try:
+        import lz4.frame
+        return lz4.frame
+    except ImportError:
+        return None
+
+
+def _serialize(codec: int, value: Any) -> bytes:
+    if codec == CODEC_ORJSON:
+        return _load_orjson().dumps(value, default=_default)
+    if codec == CODEC_MSGPACK:
+        return _load_msgpack().packb(value, default=_default, use_bin_type=True)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def _deserialize(codec: int, data: bytes) -> Any:
+    if codec == CODEC_ORJSON:
+        return _load_orjson().loads(data)
+    if codec == CODEC_MSGPACK:
+        return _load_msgpack().unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def _compress(compression: int, data: bytes) -> bytes:
+    if compression == COMPRESSION_ZSTD:
+        return _load_zstd().ZstdCompressor(level=3).compress(data)
+    if compression == COMPRESSION_LZ4:
+        return _load_lz4().compress(data)
+    return data
+
+
+def _decompress(compression: int, data: bytes) -> bytes:
+    if compression == COMPRESSION_ZSTD:
+        return _load_zstd().ZstdDecompressor().decompress(data)
+    if compression == COMPRESSION_LZ4:
+        return _load_lz4().decompress(data)
+    return data
+
+
+class CacheCodec:
+    """Encode/decode cache payloads with the configured codec and compression"""
+
+    def __init__(self, codec: str = "json", compression: str = "none", compression_threshold: int = 1024):
+        self.codec = CODEC_NAMES.get(codec, CODEC_JSON)
+        if self.codec == CODEC_ORJSON and _load_orjson() is None:
+            print("orjson not installed - cache falls back to json")
+            self.codec = CODEC_JSON
+        if self.codec == CODEC_MSGPACK and _load_msgpack() is None:
+            print("msgpack not installed - cache falls back to json")
+            self.codec = CODEC_JSON
+
+        self.compression = COMPRESSION_NAMES.get(compression, COMPRESSION_NONE)
+        if self.compression == COMPRESSION_ZSTD and _load_zstd() is None:
+            print("zstandard not installed - cache compression disabled")
+            self.compression = COMPRESSION_NONE
+        if self.compression == COMPRESSION_LZ4 and _load_lz4() is None:
+            print("lz4 not installed - cache compression disabled")
+            self.compression = COMPRESSION_NONE
+        self.compression_threshold = compression_threshold
+
+    def encode(self, value: Any) -> bytes:
+        data = _serialize(self.codec, value)
+        compression = COMPRESSION_NONE
+        if self.compression != COMPRESSION_NONE and len(data) >= self.compression_threshold:
+            data = _compress(self.compression, data)
+            compression = self.compression
+        return bytes((MAGIC, self.codec, compression)) + data
+
+    def decode(self, data: Any) -> Any:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data or data[0] != MAGIC:
+            # Legacy entry: plain JSON text
+            return json.loads(data)
+        codec, compression = data[1], data[2]
+        return _deserialize(codec, _decompress(compression, data[3:]))
+
+
+def fingerprint(value: Any) -> str:
+    """Stable content hash of a value (used as a strong ETag)"""
+    data = json.dumps(value, default=_default, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
@@ -0,0 +1,37 @@
+from typing import Optional
+from fastapi import Request, Response
+
+# Public catalog responses: browsers and nginx may reuse them briefly, then revalidate with If-None-Match
+CATALOG_CACHE_CONTROL = "public, max-age=60"
+CATALOG_VARY = "Accept-Encoding"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_response(request: Request, response: Response, fingerprint: Optional[str],
+                         cache_control: str = CATALOG_CACHE_CONTROL) -> Optional[Response]:
+    """Set ETag/Cache-Control/Vary on response; return a 304 if the client already has this version.
+
+    Callers return the 304 as-is, so the body is never serialized for it.
+    """
+    if not fingerprint:
+        return None
+    etag = f'"{fingerprint}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": CATALOG_VARY}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
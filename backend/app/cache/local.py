@@ -0,0 +1,74 @@
+import time
+from fnmatch import fnmatchcase
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional
+
+
+class LocalCache:
+    """Bounded, TTL-aware in-process LRU cache.
+
+    Sits in front of Redis so the hottest keys are served without a network
+    round trip. Values are stored as-is (already decoded), so callers must
+    treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value for key, or None if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, pattern: str):
+        """Delete every key matching a glob pattern (Redis MATCH syntax)"""
+        with self._lock:
+            for key in [k for k in self._data if fnmatchcase(k, pattern)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,129 @@
+"""
+Cache warm-up: fill hot keys before the first visitors pay for them
+
+Routers register job sources - async callables returning a list of async
+jobs - so warm-up goes through the same loaders and cache keys as real
+requests. Jobs run with bounded concurrency and an overall timeout, on
+startup and (debounced) after invalidation.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+WarmupJob = Callable[[], Awaitable[Any]]
+JobSource = Callable[[], Awaitable[List[WarmupJob]]]
+
+
+class CacheWarmer:
+    """Run registered warm-up jobs; ready once the first run finishes or times out"""
+
+    def __init__(self, concurrency: int = 4, timeout: float = 30.0, debounce: float = 2.0, enabled: bool = True,
+                 available: Optional[Callable[[], bool]] = None):
+        self.available = available  # e.g. "is Redis up" - warming without a cache only costs DB time
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.debounce = debounce
+        self.enabled = enabled
+        self.ready = False
+        self._sources: List[JobSource] = []
+        self._lock: Optional[asyncio.Lock] = None
+        self._startup_task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.coalesced = 0
+        self.last_run: dict = {}
+
+    def register(self, source: JobSource):
+        self._sources.append(source)
+
+    async def _jobs(self) -> List[WarmupJob]:
+        jobs = []
+        for source in self._sources:
+            try:
+                jobs.extend(await source())
+            except Exception as e:
+                print(f"Cache warm-up source error: {e}")
+        return jobs
+
+    async def run(self) -> dict:
+        """Run every job once; jobs still running at the timeout are cancelled"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.available is not None and not self.available():
+                self.last_run = {"jobs": 0, "ok": 0, "failed": 0, "timed_out": False, "skipped": True}
+                return self.last_run
+            started = time.monotonic()
+            jobs = await self._jobs()
+            semaphore = asyncio.Semaphore(self.concurrency)
+            summary = {"jobs": len(jobs), "ok": 0, "failed": 0, "timed_out": False}
+
+            async def run_job(job: WarmupJob):
+                async with semaphore:
+                    try:
+                        await job()
+                        summary["ok"] += 1
+                    except Exception as e:
+                        # A 404 or a dead dependency must not stop the rest of the warm-up
+                        summary["failed"] += 1
+                        print(f"Cache warm-up job error: {e}")
+
+            try:
+                await asyncio.wait_for(asyncio.gather(*(run_job(job) for job in jobs)), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                summary["timed_out"] = True
+                print(f"Cache warm-up timed out after {self.timeout}s")
+            summary["duration_ms"] = round((time.monotonic() - started) * 1000)
+            self.runs += 1
+            self.last_run = summary
+            return summary
+
+    def start(self):
+        """Warm up in the background on startup; readiness flips when it finishes or times out"""
+        if not self.enabled or not self._sources:
+            self.ready = True
+            return
+        self._startup_task = asyncio.ensure_future(self._startup())
+
+    async def _startup(self):
+        try:
+            await self.run()
+        except Exception as e:
+            print(f"Cache warm-up error: {e}")
+        finally:
+            self.ready = True
+
+    def schedule(self):
+        """Re-warm after an invalidation; bursts of writes within debounce seconds share one run"""
+        if not self.enabled or not self._sources:
+            return
+        if self._pending is not None and not self._pending.done():
+            self.coalesced += 1
+            return
+        self._pending = asyncio.ensure_future(self._rewarm())
+
+    async def _rewarm(self):
+        await asyncio.sleep(self.debounce)
+        try:
+            await self.run()
+        except Exception as e:
+            print(f"Cache re-warm error: {e}")
+
+    async def stop(self):
+        for task in (self._startup_task, self._pending):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._startup_task = self._pending = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "runs": self.runs,
+            "coalesced": self.coalesced,
+            "last_run": dict(self.last_run),
+        }
@@ -1,9 +1,18 @@
 import os
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from contextlib import contextmanager
+from threading import Lock
+from typing import Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
 from colorama import Fore
+from app.db.metrics import TimedQueuePool, QUERY_CACHE_SIZE, instrument_engine, pool_stats, totals
 
 load_dotenv()
 
@@ -14,35 +23,191 @@ Base = declarative_base()
 # Create engine ONCE with connection pool
 _engine = None
 
+def _create_pooled_engine(url: str):
+    # Connection pool settings for performance
+    engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,  # records checkout wait (see app/db/metrics.py)
+        echo=False,  # Disable SQL logging for performance
+        pool_size=10,  # Number of connections to keep in pool
+        max_overflow=20,  # Extra connections allowed beyond pool_size
+        pool_pre_ping=True,  # Check connection health before use
+        pool_recycle=3600,  # Recycle connections after 1 hour
+        query_cache_size=QUERY_CACHE_SIZE,  # Compiled statement cache (hit rate in db_stats())
+    )
+    return instrument_engine(engine)
+
 def get_db_engine():
     global _engine
     if _engine is None:
         try:
-            # Connection pool settings for performance
-            _engine = create_engine(
-                DATABASE_URL,
-                echo=False,  # Disable SQL logging for performance
-                pool_size=10,  # Number of connections to keep in pool
-                max_overflow=20,  # Extra connections allowed beyond pool_size
-                pool_pre_ping=True,  # Check connection health before use
-                pool_recycle=3600,  # Recycle connections after 1 hour
-            )
+            _engine = _create_pooled_engine(DATABASE_URL)
             print(f"{Fore.GREEN}Database engine created with connection pool{Fore.WHITE}")
         except Exception as e:
             print(f"{Fore.RED}Error creating database engine: {e}{Fore.WHITE}")
             return None
     return _engine
 
+
+# =====================
+# Read Replicas
+# =====================
+# Optional comma-separated replica URLs. Only sessions opened with read_only=True
+# go to a replica (round-robin); everything else, and every read that must see
+# the client's own recent write, uses the primary.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+# How long a client's reads stay on the primary after it wrote (covers replication lag)
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
+_replica_engines = None
+_replica_cycle = None
+_replica_lock = Lock()
+
+def get_replica_engines() -> list:
+    global _replica_engines, _replica_cycle
+    if _replica_engines is None:
+        engines = []
+        for url in DATABASE_REPLICA_URLS:
+            try:
+                engines.append(_create_pooled_engine(url))
+            except Exception as e:
+                print(f"{Fore.RED}Error creating replica engine: {e}{Fore.WHITE}")
+        _replica_engines = engines
+        _replica_cycle = itertools.cycle(engines) if engines else None
+    return _replica_engines
+
+
+class DbRouting:
+    """Per-request routing state (shared with executor threads through a context variable)"""
+
+    def __init__(self, sticky: bool = False):
+        self.sticky = sticky  # client wrote within REPLICA_STICKY_SECONDS
+        self.wrote = False  # this request flushed changes to the primary
+
+    @property
+    def use_primary(self) -> bool:
+        return self.sticky or self.wrote
+
+
+_routing: contextvars.ContextVar[Optional[DbRouting]] = contextvars.ContextVar("db_routing", default=None)
+
+def begin_db_routing(sticky: bool = False) -> DbRouting:
+    """Start routing state for the current request - see ReplicaStickinessMiddleware"""
+    state = DbRouting(sticky=sticky)
+    _routing.set(state)
+    return state
+
+def _read_engine():
+    """Replica engine for a read-only session, or None to use the primary"""
+    state = _routing.get()
+    if state is not None and state.use_primary:
+        return None
+    if not get_replica_engines():
+        return None
+    with _replica_lock:
+        return next(_replica_cycle)
+
+@event.listens_for(Session, "after_flush")
+def _mark_write(session, flush_context):
+    state = _routing.get()
+    if state is not None:
+        state.wrote = True
+
+
 # Create SessionLocal ONCE
 _SessionLocal = None
 
-def get_db_session():
+def get_db_session(read_only: bool = False):
+    """New session on the primary - or on a replica with read_only=True (when configured)"""
     global _SessionLocal
     if _SessionLocal is None:
         engine = get_db_engine()
         _SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    if read_only:
+        engine = _read_engine()
+        if engine is not None:
+            return _SessionLocal(bind=engine)
     return _SessionLocal()
 
+@contextmanager
+def session_scope(read_only: bool = False):
+    """One unit of work on its own pooled connection: rolled back on error, always closed"""
+    db = get_db_session(read_only)
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def commit_keeping_state(db: Session):
+    """Commit without expiring the session's objects
+
+    For writes whose in-memory state is exactly what was written (building the
+    response afterwards then needs no refresh SELECTs).
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+def get_db():
+    """FastAPI dependency: a session per request (closed when the response is sent)"""
+    with session_scope() as db:
+        yield db
+
+def get_read_db():
+    """FastAPI dependency: a read-only session per request (replica when configured)"""
+    with session_scope(read_only=True) as db:
+        yield db
+
+def db_stats() -> dict:
+    """Statement totals for this worker plus pool gauges of every engine"""
+    engine = get_db_engine()
+    return {
+        "queries": totals(),
+        "pools": {
+            "primary": pool_stats(engine) if engine is not None else None,
+            "replicas": [pool_stats(replica) for replica in get_replica_engines()],
+        },
+    }
+
 def create_tables():
     engine = get_db_engine()
     Base.metadata.create_all(bind=engine)
+
+
+# Bounded executor for blocking DB work called from async routes - keeps the event loop free.
+# Each offloaded call opens its own session_scope(), so workers run in parallel on the pool;
+# the default matches pool_size so threads don't queue for connections.
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', '10'))
+_db_executor = None
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+    return _db_executor
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking DB call (and anything touching lazy relationships) off the event loop"""
+    loop = asyncio.get_running_loop()
+    # Carry the request's context (replica routing) into the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_db_executor(), partial(context.run, fn, *args, **kwargs))
+
+def _call_in_session(read_only: bool, fn, *args, **kwargs):
+    with session_scope(read_only) as db:
+        return fn(db, *args, **kwargs)
+
+async def run_in_session(fn, *args, **kwargs):
+    """run_db with a fresh session_scope() passed as fn's first argument"""
+    return await run_db(_call_in_session, False, fn, *args, **kwargs)
+
+async def run_in_read_session(fn, *args, **kwargs):
+    """run_in_session on a read-only session (replica when configured)"""
+    return await run_db(_call_in_session, True, fn, *args, **kwargs)
+
@@ -0,0 +1,203 @@
+"""
+SQL instrumentation: per-request statement stats, slow-query log, pool gauges
+
+Engines created by app.db are instrumented with cursor execute hooks and a
+QueuePool that times connection checkout. Statements run while a request's
+RequestDbStats is active (see DbMetricsMiddleware) are counted against that
+request - including those run in DB executor threads, since run_db carries
+the request context over.
+"""
+import os
+import re
+import time
+import logging
+import contextvars
+from collections import Counter
+from threading import Lock
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their normalized SQL
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+# Requests running more statements than this are logged with their most repeated one (N+1 hint)
+REQUEST_QUERY_WARN = int(os.getenv('DB_REQUEST_QUERY_WARN', '20'))
+# Add a Server-Timing header with the request's DB time and statement count
+SERVER_TIMING = os.getenv('DB_SERVER_TIMING', 'false').lower() == 'true'
+# Compiled statement cache entries per engine (SQLAlchemy's default is 500)
+QUERY_CACHE_SIZE = int(os.getenv('DB_QUERY_CACHE_SIZE', '500'))
+
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\?|:\w+")
+_IN_LIST = re.compile(r"\(\s*\?(\s*,\s*\?)*\s*\)")
+_POSTCOMPILE = re.compile(r"\(__\[POSTCOMPILE_\w+\]\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement shape without literals, so repeats of the same query group together"""
+    sql = _STRING.sub("?", statement)
+    sql = _POSTCOMPILE.sub("(?)", sql)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class RequestDbStats:
+    """Statements, DB time and pool wait for one request (updated from several threads)"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql: Optional[str] = None
+        self._shapes = Counter()
+
+    def record_statement(self, sql: str, elapsed: float):
+        with self._lock:
+            self.statements += 1
+            self.db_time += elapsed
+            self._shapes[sql] += 1
+            if elapsed >= self.slowest_time:
+                self.slowest_time = elapsed
+                self.slowest_sql = sql
+
+    def record_pool_wait(self, elapsed: float):
+        with self._lock:
+            self.pool_wait += elapsed
+
+    def most_repeated(self) -> Optional[tuple]:
+        """(normalized SQL, count) of the most frequent statement - N+1s show up here"""
+        with self._lock:
+            common = self._shapes.most_common(1)
+        return common[0] if common else None
+
+    def summary(self) -> dict:
+        repeated = self.most_repeated()
+        return {
+            "statements": self.statements,
+            "db_time_ms": round(self.db_time * 1000, 2),
+            "pool_wait_ms": round(self.pool_wait * 1000, 2),
+            "slowest_ms": round(self.slowest_time * 1000, 2),
+            "slowest_sql": self.slowest_sql,
+            "most_repeated_sql": repeated[0] if repeated else None,
+            "most_repeated_count": repeated[1] if repeated else 0,
+        }
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestDbStats]] = contextvars.ContextVar(
+    "request_db_stats", default=None
+)
+
+# Process-wide totals (this worker)
+_totals = {
+    "statements": 0, "slow_statements": 0, "db_time": 0.0, "pool_checkouts": 0, "pool_wait": 0.0,
+    # Compiled cache outcome of each statement; "uncached" covers raw SQL and uncacheable constructs
+    "cache_hits": 0, "cache_misses": 0, "uncached": 0,
+}
+_totals_lock = Lock()
+
+
+def begin_request_stats() -> RequestDbStats:
+    """Start counting statements for the current request"""
+    stats = RequestDbStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestDbStats]:
+    return _request_stats.get()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (queueing + connect)"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            with _totals_lock:
+                _totals["pool_checkouts"] += 1
+                _totals["pool_wait"] += elapsed
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.record_pool_wait(elapsed)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    sql = normalize_sql(statement)
+    slow = elapsed * 1000 >= SLOW_QUERY_MS
+    cache_hit = getattr(context, "cache_hit", None)
+    cache = "cache_hits" if cache_hit is CACHE_HIT else "cache_misses" if cache_hit is CACHE_MISS else "uncached"
+    with _totals_lock:
+        _totals["statements"] += 1
+        _totals[cache] += 1
+        _totals["db_time"] += elapsed
+        if slow:
+            _totals["slow_statements"] += 1
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record_statement(sql, elapsed)
+    if slow:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {sql}")
+
+
+def _handle_error(exception_context):
+    # Keep the timing stack balanced when a statement fails
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument_engine(engine):
+    """Attach statement timing hooks to an engine (pool timing comes from TimedQueuePool)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+def pool_stats(engine) -> dict:
+    """Size / checked-out / overflow gauges of an engine's pool"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def totals() -> dict:
+    with _totals_lock:
+        data = dict(_totals)
+    cached = data["cache_hits"] + data["cache_misses"]
+    return {
+        "statements": data["statements"],
+        "slow_statements": data["slow_statements"],
+        "db_time_ms": round(data["db_time"] * 1000, 2),
+        "pool_checkouts": data["pool_checkouts"],
+        "pool_wait_ms": round(data["pool_wait"] * 1000, 2),
+        "compiled_cache": {
+            "hits": data["cache_hits"],
+            "misses": data["cache_misses"],
+            "uncached": data["uncached"],
+            "hit_rate": round(data["cache_hits"] / cached, 4) if cached else None,
+        },
+    }
@@ -0,0 +1,65 @@
+import time
+import logging
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.db import begin_db_routing, REPLICA_STICKY_SECONDS
+from app.db.metrics import begin_request_stats, REQUEST_QUERY_WARN, SERVER_TIMING
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "db_primary_until"
+
+
+class ReplicaStickinessMiddleware(BaseHTTPMiddleware):
+    """Read-your-writes for replica routing.
+
+    A request that wrote to the primary gets a short-lived cookie; while it
+    is valid, that client's read-only sessions also use the primary, so it
+    never reads a replica that has not caught up with its own write.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            sticky = float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+        except ValueError:
+            sticky = False
+        routing = begin_db_routing(sticky=sticky)
+
+        response = await call_next(request)
+
+        if routing.wrote:
+            response.set_cookie(
+                PRIMARY_COOKIE, str(int(time.time() + REPLICA_STICKY_SECONDS) + 1),
+                max_age=int(REPLICA_STICKY_SECONDS) + 1, httponly=True, samesite="lax",
+            )
+        return response
+
+
+class DbMetricsMiddleware(BaseHTTPMiddleware):
+    """Per-request SQL stats (see app/db/metrics.py).
+
+    Requests that run more than DB_REQUEST_QUERY_WARN statements are logged
+    with their most repeated statement - the usual signature of a lazy load
+    inside a loop. With DB_SERVER_TIMING=true the numbers are also returned
+    in a Server-Timing header.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        stats = begin_request_stats()
+
+        response = await call_next(request)
+
+        if stats.statements > REQUEST_QUERY_WARN:
+            summary = stats.summary()
+            logger.warning(
+                f"{request.method} {request.url.path} ran {summary['statements']} statements "
+                f"({summary['db_time_ms']} ms, pool wait {summary['pool_wait_ms']} ms); "
+                f"{summary['most_repeated_count']}x {summary['most_repeated_sql']}"
+            )
+        if SERVER_TIMING:
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries", '
+                f'db-pool;dur={stats.pool_wait * 1000:.1f}'
+            )
+        return response
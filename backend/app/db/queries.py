@@ -0,0 +1,48 @@
+"""
+Cached statements for hot ORM lookups
+
+Each function returns a lambda statement: SQLAlchemy analyzes the lambda
+once, then reuses the built statement and its cache key on every call,
+only pulling the closure values (slug, user id, order id) out as bound
+parameters. The compiled SQL is then a hit in the engine's compiled cache,
+so a request skips rebuilding the select, its loader options and its cache
+key - the bulk of the Python-side cost of these queries.
+
+Run with db.execute(...).scalars().first() (.unique() before .scalars()
+for statements with a joinedload collection).
+"""
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql import StatementLambdaElement
+from app.models.sqlalchemy.cart import Cart, Cart_Item
+from app.models.sqlalchemy.order import Order
+from app.models.sqlalchemy.product import Product, ProductSize
+from app.models.sqlalchemy.user import User
+
+
+def product_by_slug(slug: str, for_response: bool = False) -> StatementLambdaElement:
+    """Product by slug; for_response also selectin-loads what map_product_to_response reads"""
+    stmt = lambda_stmt(lambda: select(Product).where(Product.slug == slug))
+    if for_response:
+        stmt += lambda s: s.options(selectinload(Product.categories), selectinload(Product.sizes))
+    return stmt
+
+
+def user_by_uuid(user_id) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.uuid == user_id))
+
+
+def cart_with_items(user_id) -> StatementLambdaElement:
+    """User's cart with items -> product size -> product (unique() the result)"""
+    return lambda_stmt(lambda: select(Cart).options(
+        joinedload(Cart.items).joinedload(Cart_Item.product_size).joinedload(ProductSize.product)
+    ).where(Cart.user_id == user_id))
+
+
+def order_with_items(order_id: int, user_id=None) -> StatementLambdaElement:
+    """Order with its items, optionally only if it belongs to user_id (unique() the result)"""
+    stmt = lambda_stmt(lambda: select(Order).options(joinedload(Order.items)).where(Order.id == order_id))
+    if user_id is not None:
+        # Cached separately from the admin shape (the added lambda is part of the cache key)
+        stmt += lambda s: s.where(Order.user_id == user_id)
+    return stmt
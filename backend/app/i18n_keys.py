@@ -43,6 +43,7 @@ class I18nKeys:
     PRODUCT_DELETED = "product.deleted"
     PRODUCT_ADDED_TO_CART = "product.added_to_cart"
     PRODUCT_FETCH_ERROR = "product.fetch_error"
+    PRODUCT_SLUG_EXISTS = "product.slug_exists"
 
     # Cart messages
     CART_ITEM_ADDED = "cart.item_added"
@@ -0,0 +1,44 @@
+"""
+Event loop blocking detection
+
+Uses asyncio debug mode: every callback/task step that runs longer than
+slow_callback_duration is logged by the "asyncio" logger as
+"Executing <...> took X seconds". LoopBlockRecorder collects those records
+so tests can assert that async routes never run blocking I/O inline, and
+the app can log them in development (LOOP_BLOCK_WARN_MS).
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+asyncio_logger = logging.getLogger("asyncio")
+
+
+class LoopBlockRecorder(logging.Handler):
+    """Collect slow-callback warnings emitted by asyncio debug mode"""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.blocks: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if message.startswith("Executing"):
+            self.blocks.append(message)
+
+
+def enable_loop_block_detection(threshold: float = 0.1,
+                                loop: Optional[asyncio.AbstractEventLoop] = None) -> LoopBlockRecorder:
+    """Report every loop step longer than threshold seconds; returns the recorder"""
+    loop = loop or asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold
+    recorder = LoopBlockRecorder()
+    asyncio_logger.addHandler(recorder)
+    return recorder
+
+
+def disable_loop_block_detection(recorder: LoopBlockRecorder, loop: Optional[asyncio.AbstractEventLoop] = None):
+    loop = loop or asyncio.get_running_loop()
+    loop.set_debug(False)
+    asyncio_logger.removeHandler(recorder)
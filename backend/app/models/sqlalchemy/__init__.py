@@ -2,9 +2,9 @@
 from .user import User
 from .review import Review
 from .product import Product, ProductSize
-from .order import Order, OrderItem
+from .order import Order, OrderItem, OrderStatusDelta
 from .category import Category
 from .cart import Cart, Cart_Item
 
-models_arr = [User, Review, Order, OrderItem,
+models_arr = [User, Review, Order, OrderItem, OrderStatusDelta,
               Product, ProductSize, Category, Cart, Cart_Item]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer, Float
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer, Float, UniqueConstraint
 from sqlalchemy.orm import relationship, Mapped
 from app.db import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -11,6 +11,9 @@ if TYPE_CHECKING:
 
 class Cart(Base):
     __tablename__ = 'carts'
+    __table_args__ = (
+        UniqueConstraint('user_id', name='uq_carts_user_id'),  # one cart per user
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.uuid'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -21,6 +24,10 @@ class Cart(Base):
 
 class Cart_Item(Base):
     __tablename__ = 'cart_items'
+    __table_args__ = (
+        # add_to_cart bumps the quantity of an existing line instead of adding another
+        UniqueConstraint('cart_id', 'product_id', 'product_size_id', name='uq_cart_items_cart_product_size'),
+    )
 
     id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Float, Integer, Text, ForeignKey, DateTime, Table, Enum
+from sqlalchemy import Column, String, Float, Integer, BigInteger, Text, ForeignKey, DateTime, Table, Enum, Index, event, insert, delete
 from sqlalchemy.orm import relationship, Mapped
+from sqlalchemy.orm.attributes import get_history
 from datetime import datetime
 from app.db import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -22,6 +23,11 @@ class OrderStatus(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = 'orders'
+    __table_args__ = (
+        Index('ix_orders_user_id_created_at', 'user_id', 'created_at'),  # order history
+        Index('ix_orders_status_created_at', 'status', 'created_at'),  # admin list by status
+        Index('ix_orders_created_at_id', 'created_at', 'id'),  # admin list keyset pagination
+    )
     
     id = Column("id", Integer, primary_key=True, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.uuid'), nullable=False)
@@ -50,7 +56,7 @@ class OrderItem(Base):
     __tablename__ = 'order_items'
     
     id = Column("id", Integer, primary_key=True, index=True)
-    order_id = Column("order_id", Integer, ForeignKey('orders.id'))
+    order_id = Column("order_id", Integer, ForeignKey('orders.id'), index=True)
     product_id = Column("product_id", Integer, ForeignKey('products.id'))
     product_name = Column("product_name", String(255), nullable=False)
     product_image = Column("product_image", String(500), nullable=True)
@@ -61,3 +67,60 @@ class OrderItem(Base):
     
     order = relationship("Order", back_populates="items")
     product = relationship("Product")
+
+
+class OrderStatusDelta(Base):
+    """+1/-1 per order insert, status change and delete - SUM(delta) per status is the order count.
+
+    Kept in step with orders by the mapper events below, so the admin order list
+    never has to COUNT(*) the whole orders table. Rows are only ever inserted:
+    concurrent checkouts don't wait on a shared counter row.
+    compact_order_status_deltas() folds them back into one row per status.
+    """
+    __tablename__ = 'order_status_deltas'
+
+    id = Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    status = Column("status", String(20), nullable=False, index=True)
+    delta = Column("delta", BigInteger, nullable=False)
+
+
+def _record_status_deltas(connection, *deltas):
+    """Insert (status, delta) rows in the flushing transaction"""
+    connection.execute(
+        insert(OrderStatusDelta.__table__), [{"status": status, "delta": delta} for status, delta in deltas]
+    )
+
+
+def compact_order_status_deltas(connection) -> int:
+    """Replace the delta rows by one row per status holding their sum; returns the rows removed
+
+    DELETE ... RETURNING sums exactly the rows it removed, so deltas inserted
+    meanwhile by checkouts are kept for the next run.
+    """
+    table = OrderStatusDelta.__table__
+    removed = connection.execute(delete(table).returning(table.c.status, table.c.delta)).all()
+    totals = {}
+    for status, delta in removed:
+        totals[status] = totals.get(status, 0) + delta
+    rows = [{"status": status, "delta": total} for status, total in totals.items() if total]
+    if rows:
+        connection.execute(insert(table), rows)
+    return len(removed)
+
+
+@event.listens_for(Order, "after_insert")
+def _count_new_order(mapper, connection, order):
+    _record_status_deltas(connection, (order.status or OrderStatus.PENDING.value, 1))
+
+
+@event.listens_for(Order, "after_update")
+def _count_status_change(mapper, connection, order):
+    history = get_history(order, "status")
+    if history.deleted and history.added and history.deleted[0] != history.added[0]:
+        _record_status_deltas(connection, (history.deleted[0], -1), (history.added[0], 1))
+
+
+@event.listens_for(Order, "after_delete")
+def _count_deleted_order(mapper, connection, order):
+    history = get_history(order, "status")
+    _record_status_deltas(connection, (history.deleted[0] if history.deleted else order.status, -1))
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Float, Integer, Text, ForeignKey, DateTime, Table, Date
+from sqlalchemy import Column, String, Float, Integer, Text, ForeignKey, DateTime, Table, Date, UniqueConstraint, Index, event, update, select, func, case, cast
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import get_history
 from datetime import datetime
 from app.db import Base
 from .join_tables import product_categories
@@ -8,6 +9,14 @@ from .product_color import ProductColor
 
 class Product(Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        UniqueConstraint('slug', name='uq_products_slug'),
+        # Keyset pagination of the product list (newest, price_asc / price_desc)
+        Index('ix_products_created_at_id', 'created_at', 'id'),
+        Index('ix_products_price_id', 'price', 'id'),
+    )
+    # Fetch server defaults (created_at) in the INSERT's RETURNING instead of a SELECT on first access
+    __mapper_args__ = {'eager_defaults': True}
 
     id = Column(Integer, primary_key=True)
     slug = Column(String)
@@ -19,6 +28,7 @@ class Product(Base):
     blurb = Column(Text, nullable=True)
     description = Column(Text, nullable=True)
     image_url = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Supplement-specific fields
     serving_size = Column(String(100), nullable=True)
@@ -32,6 +42,15 @@ class Product(Base):
     country_of_origin = Column(String(100), nullable=True)
     certification = Column(String(255), nullable=True)
 
+    # Review aggregates - kept in step with reviews by the Review mapper events below
+    rating_avg = Column(Float, nullable=False, default=0, server_default='0')
+    rating_count = Column(Integer, nullable=False, default=0, server_default='0')
+    stars_1 = Column(Integer, nullable=False, default=0, server_default='0')
+    stars_2 = Column(Integer, nullable=False, default=0, server_default='0')
+    stars_3 = Column(Integer, nullable=False, default=0, server_default='0')
+    stars_4 = Column(Integer, nullable=False, default=0, server_default='0')
+    stars_5 = Column(Integer, nullable=False, default=0, server_default='0')
+
     reviews = relationship("Review", back_populates="product")
     categories = relationship("Category", secondary=product_categories, back_populates="products")
     sizes = relationship("ProductSize", back_populates="product")
@@ -40,7 +59,10 @@ class Product(Base):
 
 class ProductSize(Base):
     __tablename__ = 'product_sizes'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        UniqueConstraint('product_id', 'size', name='uq_product_sizes_product_id_size'),
+        {'extend_existing': True},
+    )
 
     size_id = Column("id", Integer, primary_key=True)
     product_id = Column("product_id", Integer, ForeignKey('products.id'), nullable=False)
@@ -49,3 +71,71 @@ class ProductSize(Base):
 
     product = relationship("Product", back_populates="sizes")
     cart_items = relationship("Cart_Item", back_populates="product_size")
+
+
+# Star histogram columns, index n-1 -> reviews rated n
+STAR_COLUMNS = ("stars_1", "stars_2", "stars_3", "stars_4", "stars_5")
+RATING_COLUMNS = ("rating_avg", "rating_count") + STAR_COLUMNS
+
+
+def rating_histogram(product: Product) -> dict:
+    """{stars: number of reviews} of a product, 1-5"""
+    return {stars: getattr(product, column) or 0 for stars, column in enumerate(STAR_COLUMNS, start=1)}
+
+
+def _bump_rating(connection, product_id: int, rating: int, delta: int):
+    """Add / remove one review of `rating` stars in the flushing transaction
+
+    One UPDATE whose SET expressions all read the row's old values, so
+    concurrent reviews of the same product can't lose an increment.
+    """
+    table = Product.__table__
+    stars = table.c[STAR_COLUMNS[rating - 1]]
+    count = table.c.rating_count + delta
+    total = sum(table.c[column] * n for n, column in enumerate(STAR_COLUMNS, start=1)) + rating * delta
+    connection.execute(update(table).where(table.c.id == product_id).values({
+        stars: stars + delta,
+        table.c.rating_count: count,
+        table.c.rating_avg: case((count > 0, cast(total, Float) / count), else_=0.0),
+    }))
+
+
+@event.listens_for(Review, "after_insert")
+def _rate_new_review(mapper, connection, review):
+    _bump_rating(connection, review.product_id, review.rating, 1)
+
+
+@event.listens_for(Review, "after_update")
+def _rerate_review(mapper, connection, review):
+    product_id, rating = get_history(review, "product_id"), get_history(review, "rating")
+    if product_id.deleted or rating.deleted:
+        _bump_rating(connection, (product_id.deleted or [review.product_id])[0], (rating.deleted or [review.rating])[0], -1)
+        _bump_rating(connection, review.product_id, review.rating, 1)
+
+
+@event.listens_for(Review, "after_delete")
+def _unrate_deleted_review(mapper, connection, review):
+    product_id, rating = get_history(review, "product_id"), get_history(review, "rating")
+    _bump_rating(connection, (product_id.deleted or [review.product_id])[0], (rating.deleted or [review.rating])[0], -1)
+
+
+def recompute_product_ratings(connection, product_ids=None) -> int:
+    """Rebuild the rating aggregates from the reviews table (all products, or `product_ids`)
+
+    For the backfill and for repairing drift - bulk query.delete() / raw SQL
+    on reviews bypass the mapper events. Returns the number of products updated.
+    """
+    table, reviews = Product.__table__, Review.__table__
+
+    def reviews_of_product(column, *criteria):
+        return select(column).where(reviews.c.product_id == table.c.id, *criteria).scalar_subquery()
+
+    statement = update(table).values({
+        table.c.rating_count: reviews_of_product(func.count()),
+        table.c.rating_avg: func.coalesce(reviews_of_product(func.avg(reviews.c.rating)), 0),
+        **{table.c[column]: reviews_of_product(func.count(), reviews.c.rating == n)
+           for n, column in enumerate(STAR_COLUMNS, start=1)},
+    })
+    if product_ids is not None:
+        statement = statement.where(table.c.id.in_(product_ids))
+    return connection.execute(statement).rowcount
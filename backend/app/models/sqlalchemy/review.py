@@ -1,19 +1,25 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from datetime import datetime
 from app.db import Base
 
 
 class Review(Base):
     __tablename__ = 'reviews'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # A product's reviews newest first, keyset-paginated on (created_at, id)
+        Index('ix_reviews_product_id_created_at_id', 'product_id', 'created_at', 'id'),
+        UniqueConstraint('product_id', 'user_id', name='uq_reviews_product_id_user_id'),  # one review per user
+        {'extend_existing': True},
+    )
     
     id = Column(Integer, primary_key=True)
-    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    # active_history: the product rating events need the old product / rating even if it wasn't loaded
+    product_id = column_property(Column(Integer, ForeignKey('products.id'), nullable=False), active_history=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.uuid'), nullable=False)
     content = Column(Text, nullable=False)
-    rating = Column(Integer, nullable=False)  # 1-5 stars
+    rating = column_property(Column(Integer, nullable=False), active_history=True)  # 1-5 stars
     created_at = Column(DateTime, default=datetime.utcnow)
     
     product = relationship("Product", back_populates="reviews")
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from app.schemas.order_schemas import (
     CreateOrderRequest, OrderResponse, OrderListItem,
     AdminOrdersResponse, UpdateOrderStatusRequest
@@ -22,9 +22,16 @@ def create_order(
 
 
 @order_router.get("/orders", response_model=List[OrderListItem])
-def get_my_orders(current_user: User = Depends(require_user)):
-    """Get all orders for current user"""
-    return OrderService.get_user_orders(str(current_user.uuid))
+def get_my_orders(
+    response: Response,
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(require_user)
+):
+    """Get current user's orders, newest first (total in X-Total-Count)"""
+    user_id = str(current_user.uuid)
+    response.headers["X-Total-Count"] = str(OrderService.count_user_orders(user_id))
+    return OrderService.get_user_orders(user_id, page=page, size=size)
 
 
 @order_router.get("/orders/{order_id}", response_model=OrderResponse)
@@ -48,10 +55,11 @@ def admin_get_all_orders(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces page)"),
     current_user: User = Depends(require_admin)
 ):
     """Get all orders with pagination (admin only)"""
-    return OrderService.admin_get_all_orders(page=page, size=size, status_filter=status)
+    return OrderService.admin_get_all_orders(page=page, size=size, status_filter=status, cursor=cursor)
 
 
 @order_router.get("/admin/orders/{order_id}", response_model=OrderResponse)
@@ -1,33 +1,184 @@
-from typing import Optional
+from typing import List, Optional, Union
+import io
+import os
 import json
-from fastapi import APIRouter, FastAPI, HTTPException, Query, Path, UploadFile, File, Depends
+from functools import partial
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Path, UploadFile, File, Depends, Request, Response
 from fastapi.responses import JSONResponse
-from app.schemas.product_schemas import ProductBase, ProductCreate, ProductResponse, ProductUpdate
-from app.schemas.review_schemas import ReviewCreate, ReviewResponse, ReviewListResponse
+from app.schemas.product_schemas import ProductBase, ProductCreate, ProductResponse, ProductCardResponse, ProductUpdate
+from app.schemas.review_schemas import ReviewCreate, ReviewResponse, ReviewListResponse, ReviewSummaryResponse
 from app.models.sqlalchemy import Product
-from app.services.product_service import Product_Service
-from app.services.review_service import ReviewService
+from app.services.product_service import (
+    Product_Service, map_product_to_response, map_product_to_card, product_page_cursor, PRODUCT_SORTS,
+)
+from app.services.review_service import ReviewService, REVIEW_PAGE_SIZE
+from app.services.product_import import import_products, detect_format
 from app.services.cloudinary_service import CloudinaryService
 from app.services.user_service import require_admin, require_user
 from app.i18n_keys import I18nKeys
-from app.cache import cache_get, cache_set, invalidate_product_cache
+from app.db import run_in_session, run_in_read_session
+from app.db.keyset import decode_cursor, InvalidCursor
+from sqlalchemy.orm import Session
+from app.cache.etag import conditional_response
+from app.cache import (
+    CacheEntry, cache_get, cache_set, cache_get_or_load, cache_get_or_load_entry, cache_namespace_version,
+    invalidate_product_cache, invalidate_imported_products, invalidate_review_cache, products_cache_key,
+    product_missing_cache_key, review_summary_cache_key, review_first_page_cache_key, top_products_cache_key,
+    known_product_slugs, local_cache,
+    PRODUCTS_NAMESPACE, NEGATIVE_CACHE_TTL,
+)
 
 product_router = APIRouter()
 
+# Cache warm-up: first card pages (per page size the storefront uses) and top-N product details
+WARMUP_PAGES = int(os.getenv('CACHE_WARMUP_PAGES', '2'))
+WARMUP_PAGE_SIZES = [int(size) for size in os.getenv('CACHE_WARMUP_PAGE_SIZES', '20,12,8').split(',') if size.strip()]
+WARMUP_TOP_PRODUCTS = int(os.getenv('CACHE_WARMUP_TOP_PRODUCTS', '20'))
+# Best sellers barely move between re-warms - recompute the GROUP BY over order_items a few times a day
+WARMUP_TOP_PRODUCTS_TTL = int(os.getenv('CACHE_WARMUP_TOP_PRODUCTS_TTL', '21600'))
+
 # Cache key builders
-def build_products_cache_key(page: int, limit: int, category: str = None, product_type: str = None, 
+def build_products_cache_key(version: int, page: int, limit: int, category: str = None, product_type: str = None,
                               min_price: float = None, max_price: float = None, search: str = None,
-                              on_sale: bool = None) -> str:
-    """Build cache key for products list based on query params"""
-    return f"products:page={page}:limit={limit}:cat={category}:type={product_type}:min={min_price}:max={max_price}:search={search}:sale={on_sale}"
+                              manufacturer: str = None, certification: str = None,
+                              on_sale: bool = None, sort: str = None, after: str = None,
+                              fields: str = "full") -> str:
+    """Build cache key for products list based on query params and namespace version"""
+    return products_cache_key(
+        page=page, size=limit, version=version,
+        cat=category, type=product_type, min=min_price, max=max_price,
+        search=search, mfr=manufacturer, cert=certification, sale=on_sale,
+        sort=sort, after=after,
+        fields=None if fields == "full" else fields,  # full pages keep their original keys
+    )
 
 def build_product_cache_key(product_slug: str) -> str:
     """Build cache key for single product"""
     return f"product:slug:{product_slug}"
 
 
-@product_router.get("/products")
+def clean_text_filter(value: Optional[str]) -> Optional[str]:
+    """Trim a text filter - blank means unset"""
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+async def get_products_page(page: int = 0, limit: int = 10, category: str = None, product_type: str = None,
+                            min_price: float = None, max_price: float = None, search: str = None,
+                            manufacturer: str = None, certification: str = None,
+                            on_sale: bool = None, sort: str = None, cursor: str = None,
+                            fields: str = "full") -> CacheEntry:
+    """Cached product list page (shared by GET /products and cache warm-up)"""
+    # Normalize filters so equivalent URLs share one cache entry (text filters are ILIKE, so case is irrelevant)
+    category, product_type, search, manufacturer, certification = (
+        clean_text_filter(v) for v in (category, product_type, search, manufacturer, certification)
+    )
+    min_price = min_price or None  # price >= 0 matches everything
+    on_sale = on_sale or None  # on_sale=false does not filter
+
+    # Cursor pages are keyed by the decoded position (cursors are case-sensitive, cache params are not)
+    after = None
+    if cursor:
+        page = 0
+        try:
+            key, row_id = decode_cursor(cursor, PRODUCT_SORTS[sort or "default"])
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail=I18nKeys.GENERAL_BAD_REQUEST)
+        after = f"{key}|{row_id}"
+
+    version = await cache_namespace_version(PRODUCTS_NAMESPACE)
+    cache_key = build_products_cache_key(
+        version, page, limit, category=category, product_type=product_type,
+        min_price=min_price, max_price=max_price, search=search,
+        manufacturer=manufacturer, certification=certification, on_sale=on_sale,
+        sort=sort, after=after, fields=fields,
+    )
+    
+    def query(db: Session):
+        products = Product_Service.get_products(
+            db,
+            page=page,
+            limit=limit,
+            category=category,
+            product_type=product_type,
+            min_price=min_price,
+            max_price=max_price,
+            search=search,
+            manufacturer=manufacturer,
+            certification=certification,
+            on_sale=on_sale,
+            sort=sort,
+            cursor=cursor,
+            fields=fields
+        )
+        # Cache mapped response dicts, not ORM objects
+        mapper = map_product_to_card if fields == "card" else map_product_to_response
+        return [mapper(product).dict() for product in products]
+
+    # Cache miss - query DB once, concurrent misses for this key share the result.
+    # Query and mapping run in one session in the DB executor, off the event loop.
+    # Cache fills read the primary: a lagging replica's rows would otherwise be pinned
+    # in Redis for the whole TTL right after the invalidation that was meant to drop them
+    async def load():
+        return await run_in_session(query)
+
+    # Fresh for 5 minutes, then served stale for up to 10 more while refreshing in background
+    return await cache_get_or_load_entry(cache_key, load, ttl=300, stale_ttl=600, metric="products_list", etag=True)
+
+
+async def get_product_detail(product_slug: str) -> CacheEntry:
+    """Cached product detail (shared by GET /products/{slug} and cache warm-up)"""
+    cache_key = build_product_cache_key(product_slug)
+    missing_key = product_missing_cache_key(product_slug)
+
+    def query(db: Session):
+        product = Product_Service.get_product(db, product_slug)
+        # Convert to dict for caching (Pydantic model -> dict)
+        return map_product_to_response(product).dict()
+    
+    # Recently looked up and not found: answer from the negative entry (one GET, none once it is
+    # in the local tier) before missing the detail key and taking its lock
+    if local_cache.get(cache_key) is None and await cache_get(missing_key):
+        raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
+
+    # Cache miss - query DB once, concurrent misses for this key share the result
+    async def load():
+        try:
+            return await run_in_session(query)
+        except HTTPException as e:
+            if e.status_code == 404:
+                await cache_set(missing_key, True, ttl=NEGATIVE_CACHE_TTL)
+            raise
+
+    # Fresh for 5 minutes, then served stale for up to 10 more while refreshing in background
+    return await cache_get_or_load_entry(cache_key, load, ttl=300, stale_ttl=600, metric="product_detail", etag=True)
+
+
+async def catalog_warmup_jobs() -> list:
+    """Warm-up jobs: first list pages (all products and per product_type) and best-seller details"""
+    jobs = []
+    product_types = await run_in_read_session(Product_Service.get_product_types)
+    # Not in the products namespace: every product edit re-warms, none of them should re-rank
+    top_slugs = await cache_get_or_load(
+        top_products_cache_key(WARMUP_TOP_PRODUCTS),
+        partial(run_in_read_session, Product_Service.get_top_product_slugs, WARMUP_TOP_PRODUCTS),
+        ttl=WARMUP_TOP_PRODUCTS_TTL, metric="warmup_top_products",
+    )
+    for product_type in [None] + product_types:
+        for page in range(WARMUP_PAGES):
+            for limit in WARMUP_PAGE_SIZES:
+                jobs.append(partial(get_products_page, page, limit, product_type=product_type, fields="card"))
+    for slug in top_slugs:
+        jobs.append(partial(get_product_detail, slug))
+    return jobs
+
+
+@product_router.get("/products", response_model=Union[List[ProductResponse], List[ProductCardResponse]])
 async def read_products(
+    request: Request,
+    response: Response,
     page: int = Query(0, ge=0, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
     category: Optional[str] = Query(None, description="Filter by category name"),
@@ -37,73 +188,95 @@ async def read_products(
     search: Optional[str] = Query(None, description="Search by product name or description"),
     manufacturer: Optional[str] = Query(None, description="Filter by manufacturer/brand"),
     certification: Optional[str] = Query(None, description="Filter by certification (FDA, GMP, NSF, etc.)"),
-    on_sale: Optional[bool] = Query(None, description="Filter products on sale (with sale_price)")
+    on_sale: Optional[bool] = Query(None, description="Filter products on sale (with sale_price)"),
+    sort: Optional[str] = Query(
+        None, pattern="^(default|newest|price_asc|price_desc)$",
+        description="Sort order (default: id, or relevance when searching)",
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces page)"),
+    fields: str = Query(
+        "full", pattern="^(full|card)$",
+        description="full: complete products; card: only what a list card shows (no texts, categories or sizes)",
+    )
 ):
-    """Get products with optional filters - with Redis cache"""
-    cache_key = f"products:page={page}:limit={limit}:cat={category}:type={product_type}:min={min_price}:max={max_price}:search={search}:mfr={manufacturer}:cert={certification}:sale={on_sale}"
-    
-    # Try cache first
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-    
-    # Cache miss - query DB
-    result = Product_Service.get_products(
-        page=page,
-        limit=limit,
-        category=category,
-        product_type=product_type,
-        min_price=min_price,
-        max_price=max_price,
-        search=search,
-        manufacturer=manufacturer,
-        certification=certification,
-        on_sale=on_sale
+    """Get products with optional filters - with Redis cache
+
+    Every full page in a keyset order carries an X-Next-Cursor header; pass it
+    back as `cursor` to fetch the next page at constant cost however deep.
+    """
+    entry = await get_products_page(
+        page, limit, category=category, product_type=product_type, min_price=min_price, max_price=max_price,
+        search=search, manufacturer=manufacturer, certification=certification, on_sale=on_sale,
+        sort=sort, cursor=cursor, fields=fields,
     )
-    
-    # Set cache (TTL 5 minutes)
-    await cache_set(cache_key, result, ttl=300)
-    
-    return result
+    # Relevance order (search without sort) is offset-only
+    if sort or not search or cursor:
+        next_cursor = product_page_cursor(entry.value, limit, sort)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    # Client already has this page - 304 without serializing it, still telling it where the next page starts
+    not_modified = conditional_response(request, response, entry.etag)
+    if not_modified:
+        if "X-Next-Cursor" in response.headers:
+            not_modified.headers["X-Next-Cursor"] = response.headers["X-Next-Cursor"]
+        return not_modified
+    return entry.value
 
 
 @product_router.get("/products/{product_slug}", response_model=ProductResponse)
-async def read_product(product_slug: str):
+async def read_product(product_slug: str, request: Request, response: Response):
     """Get single product by slug - with Redis cache"""
-    cache_key = build_product_cache_key(product_slug)
-    
-    # Try cache first
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-    
-    # Cache miss - query DB  
-    product = Product_Service.get_product(product_slug)
-    
-    # Convert to dict for caching (Pydantic model -> dict)
-    from app.services.product_service import map_product_to_response
-    product_dict = map_product_to_response(product).dict()
-    
-    # Set cache (TTL 5 minutes)
-    await cache_set(cache_key, product_dict, ttl=300)
-    
-    return product
+    # Slug not in the Bloom filter of existing products - 404 without any lookup
+    if not known_product_slugs.might_contain(product_slug):
+        raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
+
+    entry = await get_product_detail(product_slug)
+    not_modified = conditional_response(request, response, entry.etag)
+    if not_modified:
+        return not_modified
+    return entry.value
 
 @product_router.post("/products", response_model=dict)
 async def create_product(product: ProductCreate, current_user = Depends(require_admin)):
     """Create a new product (admin only)"""
     # product: ProductCreate đã nhận sizes/colors
-    result = Product_Service.create_product(product)
-    await invalidate_product_cache()
+    result = await run_in_session(Product_Service.create_product, product)
+    # Also clears any negative cache entry for the new slug
+    await invalidate_product_cache(slug=product.slug)
     return result
 
 
+@product_router.post("/products/import", response_model=dict)
+async def import_product_file(
+    file: UploadFile = File(..., description="CSV or JSONL catalog (see app/services/product_import.py)"),
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|jsonl)$",
+                               description="File format (default: from the file extension)"),
+    current_user = Depends(require_admin)
+):
+    """Bulk create / update products from a file (admin only)
+
+    Invalid rows are reported with their line number and skipped; the rest
+    is imported. Caches are invalidated once at the end.
+    """
+    fmt = fmt or detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail=I18nKeys.GENERAL_BAD_REQUEST)
+    # Parsed lazily from the spooled upload in the DB executor
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    report = await run_in_session(import_products, stream, fmt)
+    await invalidate_imported_products(report.slugs)
+    return report.summary()
+
+
 @product_router.put("/products/{product_slug}", response_model=dict)
 async def update_product(product_slug: str, product: ProductUpdate, current_user = Depends(require_admin)):
     """Update a product (admin only)"""
-    result = Product_Service.update_product(product_slug, product.dict(exclude_unset=True))
+    result = await run_in_session(Product_Service.update_product, product_slug, product.dict(exclude_unset=True))
     # Invalidate caches (specific product + list)
     await invalidate_product_cache(slug=product_slug)
+    new_slug = result.get("slug")
+    if new_slug and new_slug != product_slug:
+        await invalidate_product_cache(slug=new_slug)
     return result
 
 
@@ -113,7 +286,7 @@ async def update_product_stock(product_slug: str, stock: int, current_user = Dep
     if stock < 0:
         raise HTTPException(status_code=400, detail="Stock cannot be negative")
     
-    result = Product_Service.update_product_stock(product_slug, stock)
+    result = await run_in_session(Product_Service.update_product_stock, product_slug, stock)
     # Invalidate caches
     await invalidate_product_cache(slug=product_slug)
     return result
@@ -127,21 +300,64 @@ async def upload_product_image(file: UploadFile = File(...)):
 
 
 # Review endpoints
+@product_router.get("/products/{product_slug}/reviews/summary", response_model=ReviewSummaryResponse)
+async def get_review_summary(product_slug: str, request: Request, response: Response):
+    """Average rating, review count and star histogram of a product - with Redis cache"""
+    async def load():
+        summary = await run_in_session(ReviewService.get_review_summary, product_slug)
+        return summary.dict()
+
+    entry = await cache_get_or_load_entry(
+        review_summary_cache_key(product_slug), load, ttl=600, metric="review_summary", etag=True
+    )
+    not_modified = conditional_response(request, response, entry.etag)
+    if not_modified:
+        return not_modified
+    return entry.value
+
+
 @product_router.get("/products/{product_slug}/reviews", response_model=ReviewListResponse)
-def get_product_reviews(product_slug: str):
-    """Get all reviews for a product with average rating"""
-    return ReviewService.get_product_reviews(product_slug)
+async def get_product_reviews(
+    product_slug: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=50, description="Reviews per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+):
+    """One page of a product's reviews (newest first) with the rating summary
+
+    The first default-size page - what the product page shows - is cached
+    (filled from the primary); deeper pages are keyset pages read straight
+    from a replica.
+    """
+    if cursor or limit != REVIEW_PAGE_SIZE:
+        return await run_in_read_session(ReviewService.get_product_reviews, product_slug, limit, cursor)
+
+    async def load():
+        page = await run_in_session(ReviewService.get_product_reviews, product_slug, limit)
+        return page.dict()
+
+    entry = await cache_get_or_load_entry(
+        review_first_page_cache_key(product_slug), load, ttl=300, metric="review_first_page", etag=True
+    )
+    not_modified = conditional_response(request, response, entry.etag)
+    if not_modified:
+        return not_modified
+    return entry.value
 
 
 @product_router.post("/products/{product_slug}/reviews", response_model=ReviewResponse)
-def create_review(product_slug: str, review: ReviewCreate, current_user = Depends(require_user)):
+async def create_review(product_slug: str, review: ReviewCreate, current_user = Depends(require_user)):
     """Create a new review for a product (authenticated users only)"""
-    return ReviewService.create_review(product_slug, review, current_user.uuid)
+    result = await run_in_session(ReviewService.create_review, product_slug, review, current_user.uuid)
+    await invalidate_review_cache(product_slug)
+    return result
 
 
 @product_router.delete("/reviews/{review_id}")
-def delete_review(review_id: int, current_user = Depends(require_user)):
+async def delete_review(review_id: int, current_user = Depends(require_user)):
     """Delete a review (owner or admin only)"""
     is_admin = getattr(current_user, 'role', None) == 'admin'
-    ReviewService.delete_review(review_id, current_user.uuid, is_admin)
+    product_slug = await run_in_session(ReviewService.delete_review, review_id, current_user.uuid, is_admin)
+    await invalidate_review_cache(product_slug)
     return {"message": I18nKeys.REVIEW_DELETED}
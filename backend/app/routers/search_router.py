@@ -2,8 +2,15 @@
 Search router for Elasticsearch-powered product search
 Provides advanced search capabilities with Vietnamese text support
 """
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
+from app.cache import (
+    CacheEntry, cache_get_or_load_entry, cache_namespace_version, search_aggregations_cache_key,
+    normalize_search_query, PRODUCTS_NAMESPACE,
+)
+from app.cache.codec import fingerprint
+from app.cache.etag import conditional_response
 from app.search.elastic_client import get_es_client, check_es_health
 from app.search.product_index import INDEX_NAME, get_index_stats
 import logging
@@ -31,6 +38,8 @@ def index_statistics():
 
 @router.get("/products")
 def search_products(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(None, min_length=1, description="Search query"),
     product_type: Optional[str] = Query(None, description="Filter by product type"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
@@ -38,7 +47,7 @@ def search_products(
     on_sale: Optional[bool] = Query(None, description="Filter products on sale"),
     page: int = Query(0, ge=0, description="Page number (0-indexed)"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
-    sort_by: Optional[str] = Query("relevance", description="Sort by: relevance, price_asc, price_desc, newest")
+    sort_by: Optional[str] = Query("relevance", description="Sort by: relevance, price_asc, price_desc, newest, rating")
 ):
     """
     Search products with Elasticsearch
@@ -61,7 +70,7 @@ def search_products(
         on_sale: Filter only products with sale_price
         page: Page number (0-indexed)
         limit: Items per page (1-100)
-        sort_by: Sort order (relevance, price_asc, price_desc, newest)
+        sort_by: Sort order (relevance, price_asc, price_desc, newest, rating)
         
     Returns:
         dict: Search results with items, total, page info
@@ -129,6 +138,12 @@ def search_products(
             query_body["sort"] = [{"price": {"order": "desc"}}]
         elif sort_by == "newest":
             query_body["sort"] = [{"created_at": {"order": "desc"}}]
+        elif sort_by == "rating":
+            # Best rated first; among equal averages the more reviewed one
+            query_body["sort"] = [
+                {"rating_avg": {"order": "desc", "unmapped_type": "float"}},
+                {"rating_count": {"order": "desc", "unmapped_type": "integer"}},
+            ]
         # else: relevance (default _score)
         
         # Execute search
@@ -153,18 +168,25 @@ def search_products(
                 "blurb": source.get("blurb"),
                 "has_sale": source.get("has_sale", False),
                 "discount_percentage": source.get("discount_percentage", 0),
+                "rating_avg": source.get("rating_avg", 0.0),
+                "rating_count": source.get("rating_count", 0),
                 "score": hit["_score"]  # Relevance score
             })
         
-        return {
+        body = {
             "items": products,
             "total": total,
             "page": page,
             "limit": limit,
             "total_pages": (total + limit - 1) // limit,  # Ceiling division
             "query": q,
-            "took_ms": result["took"]  # Search time in milliseconds
         }
+        # ETag covers the results only - took_ms changes on every call
+        not_modified = conditional_response(request, response, fingerprint(body))
+        if not_modified:
+            return not_modified
+        body["took_ms"] = result["took"]  # Search time in milliseconds
+        return body
         
     except Exception as e:
         logger.error(f"Search failed: {e}", exc_info=True)
@@ -220,13 +242,98 @@ def autocomplete_search(
         return {"suggestions": []}
 
 
+def _fetch_aggregations(q: Optional[str]) -> dict:
+    """Run the aggregation query against Elasticsearch"""
+    es = get_es_client()
+    
+    # Base query
+    query = {
+        "match_all": {}
+    }
+    if q:
+        query = {
+            "multi_match": {
+                "query": q,
+                "fields": ["product_name^3", "blurb", "description"],
+                "fuzziness": "AUTO"
+            }
+        }
+    
+    result = es.search(
+        index=INDEX_NAME,
+        body={
+            "query": query,
+            "size": 0,  # Don't return documents, just aggregations
+            "aggs": {
+                "product_types": {
+                    "terms": {
+                        "field": "product_type",
+                        "size": 20
+                    }
+                },
+                "price_ranges": {
+                    "range": {
+                        "field": "price",
+                        "ranges": [
+                            {"key": "under_100k", "to": 100000},
+                            {"key": "100k_500k", "from": 100000, "to": 500000},
+                            {"key": "500k_1m", "from": 500000, "to": 1000000},
+                            {"key": "over_1m", "from": 1000000}
+                        ]
+                    }
+                },
+                "on_sale_count": {
+                    "filter": {"term": {"has_sale": True}}
+                }
+            }
+        }
+    )
+    
+    aggs = result["aggregations"]
+    
+    return {
+        "product_types": [
+            {"type": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggs["product_types"]["buckets"]
+        ],
+        "price_ranges": [
+            {"range": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggs["price_ranges"]["buckets"]
+        ],
+        "on_sale_count": aggs["on_sale_count"]["doc_count"]
+    }
+
+
+async def get_search_aggregations(q: Optional[str] = None) -> CacheEntry:
+    """Cached aggregations entry (shared by GET /search/aggregations and cache warm-up)"""
+    version = await cache_namespace_version(PRODUCTS_NAMESPACE)
+    cache_key = search_aggregations_cache_key(q, version=version)
+    # Every variant sharing the key gets the facets of the same (normalized) query
+    q = normalize_search_query(q) or None
+
+    async def load():
+        # ES client is synchronous - keep it off the event loop
+        return await run_in_threadpool(_fetch_aggregations, q)
+
+    return await cache_get_or_load_entry(cache_key, load, ttl=300, stale_ttl=600,
+                                         metric="search_aggregations", etag=True)
+
+
+async def search_warmup_jobs() -> list:
+    """Warm-up jobs: the default (unfiltered) facets shown on the products page"""
+    return [get_search_aggregations]
+
+
 @router.get("/aggregations")
-def search_aggregations(
+async def search_aggregations(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(None, description="Search query for aggregations")
 ):
     """
     Get aggregations (facets) for search results
     Useful for showing filter options with counts
+    Cached per query (stale-while-revalidate), invalidated with the product cache
     
     Args:
         q: Optional search query to scope aggregations
@@ -235,64 +342,11 @@ def search_aggregations(
         dict: Aggregation results (product types, price ranges)
     """
     try:
-        es = get_es_client()
-        
-        # Base query
-        query = {
-            "match_all": {}
-        }
-        if q:
-            query = {
-                "multi_match": {
-                    "query": q,
-                    "fields": ["product_name^3", "blurb", "description"],
-                    "fuzziness": "AUTO"
-                }
-            }
-        
-        result = es.search(
-            index=INDEX_NAME,
-            body={
-                "query": query,
-                "size": 0,  # Don't return documents, just aggregations
-                "aggs": {
-                    "product_types": {
-                        "terms": {
-                            "field": "product_type",
-                            "size": 20
-                        }
-                    },
-                    "price_ranges": {
-                        "range": {
-                            "field": "price",
-                            "ranges": [
-                                {"key": "under_100k", "to": 100000},
-                                {"key": "100k_500k", "from": 100000, "to": 500000},
-                                {"key": "500k_1m", "from": 500000, "to": 1000000},
-                                {"key": "over_1m", "from": 1000000}
-                            ]
-                        }
-                    },
-                    "on_sale_count": {
-                        "filter": {"term": {"has_sale": True}}
-                    }
-                }
-            }
-        )
-        
-        aggs = result["aggregations"]
-        
-        return {
-            "product_types": [
-                {"type": bucket["key"], "count": bucket["doc_count"]}
-                for bucket in aggs["product_types"]["buckets"]
-            ],
-            "price_ranges": [
-                {"range": bucket["key"], "count": bucket["doc_count"]}
-                for bucket in aggs["price_ranges"]["buckets"]
-            ],
-            "on_sale_count": aggs["on_sale_count"]["doc_count"]
-        }
+        entry = await get_search_aggregations(q)
+        not_modified = conditional_response(request, response, entry.etag)
+        if not_modified:
+            return not_modified
+        return entry.value
         
     except Exception as e:
         logger.error(f"Aggregations failed: {e}")
@@ -92,12 +92,13 @@ class AdminOrderListItem(BaseModel):
 
 
 class AdminOrdersResponse(BaseModel):
-    """Paginated orders list for admin"""
+    """Paginated orders list for admin (total / page / total_pages only for offset pages)"""
     orders: List[AdminOrderListItem]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # pass as `cursor` for the next page
 
 
 class UpdateOrderStatusRequest(BaseModel):
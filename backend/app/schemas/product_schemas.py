@@ -68,6 +68,22 @@ class ProductResponse(ProductBase):
     categories: List[CategoryBase] = []
     sizes: List[ProductSizeBase] = []
     colors: List[ProductColorResponse] = []
+    rating_avg: float = Field(0.0, example=4.6)
+    rating_count: int = Field(0, example=12)
+
+class ProductCardResponse(BaseModel):
+    """Product list card (GET /products?fields=card) - no long texts or relationships"""
+    id: int = Field(..., example=1)
+    slug: str = Field(..., example="unique-product-slug-1234")
+    product_name: str = Field(..., example="Stylish Sunglasses")
+    price: float = Field(..., example=19.99)
+    sale_price: Optional[float] = Field(None, example=9.99)
+    stock: Optional[int] = Field(None, example=100)
+    image_url: Optional[str] = Field(None, example="http://example.com/image.png")
+    blurb: Optional[str] = Field(None, example="A short description of the product")
+    created_at: Optional[datetime] = Field(None, example=datetime.now())
+    rating_avg: float = Field(0.0, example=4.6)
+    rating_count: int = Field(0, example=12)
 
 class ProductListResponse(BaseModel):
     products: List[ProductResponse]
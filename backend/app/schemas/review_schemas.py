@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import uuid
 
@@ -36,7 +36,12 @@ class ReviewResponse(BaseModel):
         from_attributes = True
 
 
-class ReviewListResponse(BaseModel):
-    reviews: List[ReviewResponse]
+class ReviewSummaryResponse(BaseModel):
     average_rating: float = 0.0
     total_reviews: int = 0
+    rating_histogram: Dict[int, int] = Field(default_factory=dict, description="Number of reviews per star rating (1-5)")
+
+
+class ReviewListResponse(ReviewSummaryResponse):
+    reviews: List[ReviewResponse]
+    next_cursor: Optional[str] = None  # pass as `cursor` for the next page
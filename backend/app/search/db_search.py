@@ -0,0 +1,75 @@
+"""
+Postgres-native product search (used when Elasticsearch isn't)
+
+Relies on the add_product_search_vector migration:
+- search_normalize(text): lower + unaccent, so "Sữa Đậu" and "sua dau" match
+- products.search_vector: generated, weighted tsvector over name / type / blurb / description
+- GIN index on search_vector, trigram indexes on the normalized name and on product_type
+
+Databases without the column (SQLite tests, migration not applied yet) keep the
+ILIKE path - see full_text_available().
+"""
+from threading import Lock
+from typing import Tuple
+from sqlalchemy import func, inspect, literal, literal_column, or_
+from sqlalchemy.orm import Query, Session
+from app.models.sqlalchemy import Product
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 'simple': no stemming - Postgres ships no Vietnamese dictionary and syllables shouldn't be stemmed
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+SEARCH_VECTOR = literal_column("products.search_vector")
+
+_availability = {}
+_availability_lock = Lock()
+
+
+def full_text_available(db: Session) -> bool:
+    """True when the session's database has products.search_vector (checked once per database)"""
+    bind = db.get_bind()
+    key = str(bind.engine.url)
+    with _availability_lock:
+        if key not in _availability:
+            available = False
+            if bind.dialect.name == "postgresql":
+                try:
+                    columns = inspect(bind.engine).get_columns("products")
+                    available = any(column["name"] == "search_vector" for column in columns)
+                except Exception as e:
+                    logger.error(f"Could not check for products.search_vector: {e}")
+            _availability[key] = available
+        return _availability[key]
+
+
+def normalize(value):
+    return func.search_normalize(value)
+
+
+def apply_full_text_search(query: Query, term: str, match_any: bool = False) -> Tuple[Query, object]:
+    """
+    Filter a Product query by a ranked full-text match
+
+    Args:
+        query: Query selecting Product
+        term: User search text (websearch syntax: quotes, "or", -exclusions)
+        match_any: Match any of the words instead of all of them (chat keyword search)
+
+    Returns:
+        (filtered query, rank expression to order by - descending)
+    """
+    words = term.split()
+    if match_any:
+        term = " or ".join(words)
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, normalize(literal(term)))
+    # Partial words and typos ("whe", "protien") - trigram word similarity on the name
+    normalized_term = normalize(literal(" ".join(words)))
+    normalized_name = normalize(Product.product_name)
+
+    query = query.filter(or_(
+        SEARCH_VECTOR.op("@@")(tsquery),
+        normalized_term.op("<%")(normalized_name),
+    ))
+    rank = func.ts_rank_cd(SEARCH_VECTOR, tsquery) + func.word_similarity(normalized_term, normalized_name)
+    return query, rank
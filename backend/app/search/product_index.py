@@ -107,7 +107,11 @@ PRODUCT_INDEX_MAPPING = {
             
             # Computed fields
             "has_sale": {"type": "boolean"},
-            "discount_percentage": {"type": "float"}
+            "discount_percentage": {"type": "float"},
+            
+            # Review aggregates (sort by rating)
+            "rating_avg": {"type": "float"},
+            "rating_count": {"type": "integer"}
         }
     }
 }
@@ -126,6 +130,8 @@ def ensure_product_index():
             es.indices.create(index=INDEX_NAME, body=PRODUCT_INDEX_MAPPING)
             logger.info(f"Index {INDEX_NAME} created successfully")
         else:
+            # Add fields introduced since the index was created (existing fields are unchanged)
+            es.indices.put_mapping(index=INDEX_NAME, properties=PRODUCT_INDEX_MAPPING["mappings"]["properties"])
             logger.info(f"Index {INDEX_NAME} already exists")
             
     except Exception as e:
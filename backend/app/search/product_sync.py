@@ -4,6 +4,7 @@ Handles indexing, updating, and deletion of products in ES with proper error han
 """
 from .elastic_client import get_es_client
 from .product_index import INDEX_NAME
+from contextlib import contextmanager
 from datetime import datetime
 import logging
 
@@ -49,7 +50,9 @@ def map_product_to_es_doc(product) -> dict:
         "created_at": product.created_at.isoformat() if hasattr(product, "created_at") and product.created_at else datetime.utcnow().isoformat(),
         "image_url": product.image_url if hasattr(product, "image_url") else None,
         "has_sale": has_sale,
-        "discount_percentage": round(discount_percentage, 2)
+        "discount_percentage": round(discount_percentage, 2),
+        "rating_avg": float(getattr(product, "rating_avg", None) or 0.0),
+        "rating_count": getattr(product, "rating_count", None) or 0
     }
 
 
@@ -83,13 +86,15 @@ def index_product(product) -> bool:
         return False
 
 
-def bulk_index_products(products: list) -> dict:
+def bulk_index_products(products: list, refresh: bool = True, chunk_size: int = 500) -> dict:
     """
     Bulk index multiple products to Elasticsearch
     More efficient for large batches
     
     Args:
         products: List of Product model instances
+        refresh: Refresh the index after the request (bulk imports refresh once at the end instead)
+        chunk_size: Documents per _bulk request
         
     Returns:
         dict: Statistics about the bulk operation
@@ -112,7 +117,7 @@ def bulk_index_products(products: list) -> dict:
         
         # Execute bulk operation
         from elasticsearch.helpers import bulk
-        success, failed = bulk(es, actions, raise_on_error=False, refresh=True)
+        success, failed = bulk(es, actions, raise_on_error=False, refresh=refresh, chunk_size=chunk_size)
         
         logger.info(f"Bulk indexed {success} products, {len(failed)} failed")
         
@@ -127,6 +132,37 @@ def bulk_index_products(products: list) -> dict:
         return {"success": 0, "failed": len(products), "errors": [str(e)]}
 
 
+@contextmanager
+def index_refresh_paused():
+    """
+    Disable periodic refresh of the product index for a bulk load
+    
+    Restores the previous refresh_interval and refreshes once on exit. If
+    Elasticsearch is unreachable the load still runs (indexing will fail
+    and be reported by bulk_index_products).
+    """
+    es = None
+    previous = None
+    try:
+        es = get_es_client()
+        settings = es.indices.get_settings(index=INDEX_NAME, name="index.refresh_interval")
+        previous = settings.get(INDEX_NAME, {}).get("settings", {}).get("index", {}).get("refresh_interval")
+        es.indices.put_settings(index=INDEX_NAME, settings={"index": {"refresh_interval": "-1"}})
+    except Exception as e:
+        logger.error(f"Failed to pause refresh of {INDEX_NAME}: {e}")
+        es = None
+    try:
+        yield
+    finally:
+        if es is not None:
+            try:
+                # None resets an interval that was never set to the index default
+                es.indices.put_settings(index=INDEX_NAME, settings={"index": {"refresh_interval": previous}})
+                es.indices.refresh(index=INDEX_NAME)
+            except Exception as e:
+                logger.error(f"Failed to restore refresh of {INDEX_NAME}: {e}")
+
+
 def update_product_in_index(product) -> bool:
     """
     Update an existing product in Elasticsearch
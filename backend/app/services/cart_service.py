@@ -1,12 +1,12 @@
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import joinedload
 
 from app.models.sqlalchemy.cart import Cart, Cart_Item
 from app.models.sqlalchemy.product import Product, ProductSize
 from app.models.sqlalchemy.user import User
 from app.schemas.cart_schemas import CartBase, CartItemBase, AddToCartRequest
 from app.db import get_db_session
+from app.db.queries import cart_with_items
 from app.i18n_keys import I18nKeys
 
 # Cart cache disabled - sync SQLAlchemy incompatible with async cache
@@ -20,9 +20,7 @@ class CartService:
         # Fetch from DB
         db = get_db_session()
         try:
-            cart = db.query(Cart).options(
-                joinedload(Cart.items).joinedload(Cart_Item.product_size).joinedload(ProductSize.product)
-            ).filter(Cart.user_id == user_id).first()
+            cart = db.execute(cart_with_items(user_id)).unique().scalars().first()
 
             if not cart:
                 cart = Cart(user_id=user_id)
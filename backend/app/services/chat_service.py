@@ -8,6 +8,7 @@ from typing import List, Dict, Optional
 from openai import OpenAI
 from app.db import get_db_session
 from app.models.sqlalchemy import Product
+from app.search.db_search import full_text_available, apply_full_text_search
 from sqlalchemy import or_, desc
 
 # Load API key from environment
@@ -80,9 +81,14 @@ class ChatService:
         db = get_db_session()
         try:
             products_query = db.query(Product)
+            order_by = [desc(Product.id)]
             
+            # Ranked full-text search on Postgres (any keyword matches)
+            if query and full_text_available(db):
+                products_query, rank = apply_full_text_search(products_query, query, match_any=True)
+                order_by.insert(0, rank.desc())
             # Search in product name, description, blurb, and product_type
-            if query:
+            elif query:
                 # Split query into individual words for flexible matching
                 keywords = query.split()
                 
@@ -101,8 +107,8 @@ class ChatService:
             if category:
                 products_query = products_query.filter(Product.product_type.ilike(f"%{category}%"))
             
-            # Get results - order by id DESC (latest products first)
-            products = products_query.order_by(desc(Product.id)).limit(limit).all()
+            # Get results - best match first, then latest products first
+            products = products_query.order_by(*order_by).limit(limit).all()
             
             return [{
                 "name": p.product_name,
@@ -1,9 +1,9 @@
 from typing import List, Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, select
 import math
 
-from app.models.sqlalchemy.order import Order, OrderItem, OrderStatus
+from app.models.sqlalchemy.order import Order, OrderItem, OrderStatus, OrderStatusDelta
 from app.models.sqlalchemy.cart import Cart, Cart_Item
 from app.models.sqlalchemy.product import ProductSize, Product
 from app.models.sqlalchemy.user import User
@@ -12,8 +12,18 @@ from app.schemas.order_schemas import (
     AdminOrderListItem, AdminOrdersResponse
 )
 from app.db import get_db_session
+from app.db.keyset import KeysetOrder, InvalidCursor, encode_cursor, parse_datetime
+from app.db.queries import cart_with_items, order_with_items
 from app.i18n_keys import I18nKeys
 
+# Admin order list order (newest first) - keyset cursors encode (created_at, id)
+ADMIN_ORDERS_ORDER = KeysetOrder("newest", Order.created_at, Order.id, descending=True, parse=parse_datetime)
+
+# Item count per order, computed by the database (uses ix_order_items_order_id) instead of loading the items
+ITEMS_COUNT = (
+    select(func.count(OrderItem.id)).where(OrderItem.order_id == Order.id).correlate(Order).scalar_subquery()
+)
+
 
 class OrderService:
     
@@ -23,11 +33,7 @@ class OrderService:
         db = get_db_session()
         try:
             # Get user's cart with items
-            cart = db.query(Cart).options(
-                joinedload(Cart.items)
-                .joinedload(Cart_Item.product_size)
-                .joinedload(ProductSize.product)
-            ).filter(Cart.user_id == user_id).first()
+            cart = db.execute(cart_with_items(user_id)).unique().scalars().first()
             
             if not cart or not cart.items:
                 raise HTTPException(
@@ -143,35 +149,53 @@ class OrderService:
             db.close()
     
     @staticmethod
-    def get_user_orders(user_id: str) -> List[OrderListItem]:
-        """Get all orders for a user"""
-        db = get_db_session()
+    def get_user_orders(user_id: str, page: int = 1, size: int = 20) -> List[OrderListItem]:
+        """Get one page of a user's orders, newest first"""
+        db = get_db_session(read_only=True)
         try:
-            orders = db.query(Order).options(
-                joinedload(Order.items)
-            ).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).all()
+            rows = db.query(
+                Order.id, Order.total_amount, Order.status, Order.created_at,
+                ITEMS_COUNT.label("items_count"),
+            ).filter(Order.user_id == user_id).order_by(
+                Order.created_at.desc(), Order.id.desc()
+            ).offset((page - 1) * size).limit(size).all()
             
             return [
                 OrderListItem(
-                    id=order.id,
-                    total_amount=order.total_amount,
-                    status=order.status,
-                    items_count=len(order.items) if order.items else 0,
-                    created_at=order.created_at
+                    id=row.id,
+                    total_amount=row.total_amount,
+                    status=row.status,
+                    items_count=row.items_count,
+                    created_at=row.created_at
                 )
-                for order in orders
+                for row in rows
             ]
         finally:
             db.close()
     
+    @staticmethod
+    def count_user_orders(user_id: str) -> int:
+        """Number of orders a user has placed (index-only on ix_orders_user_id_created_at)"""
+        db = get_db_session(read_only=True)
+        try:
+            return db.query(func.count(Order.id)).filter(Order.user_id == user_id).scalar()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def count_orders(db, status_filter: Optional[str] = None) -> int:
+        """Total orders (optionally of one status) summed from the order_status_deltas rows"""
+        query = db.query(func.coalesce(func.sum(OrderStatusDelta.delta), 0))
+        if status_filter:
+            query = query.filter(OrderStatusDelta.status == status_filter)
+        return int(query.scalar())
+    
     @staticmethod
     def get_order_detail(user_id: str, order_id: int) -> OrderResponse:
         """Get order detail - only if belongs to user"""
-        db = get_db_session()
+        db = get_db_session(read_only=True)
         try:
-            order = db.query(Order).options(
-                joinedload(Order.items)
-            ).filter(Order.id == order_id, Order.user_id == user_id).first()
+            order = db.execute(order_with_items(order_id, user_id)).unique().scalars().first()
             
             if not order:
                 raise HTTPException(
@@ -254,42 +278,52 @@ class OrderService:
     def admin_get_all_orders(
         page: int = 1,
         size: int = 20,
-        status_filter: Optional[str] = None
+        status_filter: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> AdminOrdersResponse:
-        """Get all orders with pagination (admin only)"""
-        db = get_db_session()
+        """Get all orders with pagination (admin only)
+
+        With a cursor (next_cursor of the previous page) the page continues after
+        that order - no OFFSET and no COUNT, so deep pages cost the same as the first.
+        """
+        db = get_db_session(read_only=True)
         try:
-            query = db.query(Order).options(
-                joinedload(Order.items)
-            )
+            # Only the listed columns, the user's email and an items_count aggregate - no OrderItem rows
+            query = db.query(
+                Order.id, Order.user_id, Order.shipping_name, Order.total_amount, Order.status, Order.created_at,
+                User.email.label("user_email"), ITEMS_COUNT.label("items_count"),
+            ).outerjoin(User, User.uuid == Order.user_id)
             
             # Filter by status if provided
             if status_filter:
                 query = query.filter(Order.status == status_filter)
             
-            # Get total count
-            total = query.count()
-            total_pages = math.ceil(total / size) if total > 0 else 1
-            
-            # Paginate and order
-            orders = query.order_by(Order.created_at.desc()).offset((page - 1) * size).limit(size).all()
-            
-            # Get user emails for orders
-            user_ids = list(set(str(o.user_id) for o in orders))
-            users_map = {}
-            if user_ids:
-                users = db.query(User).filter(User.uuid.in_(user_ids)).all()
-                users_map = {str(u.uuid): u.email for u in users}
+            if cursor:
+                total = total_pages = page = None
+                try:
+                    orders = ADMIN_ORDERS_ORDER.apply(query, cursor).limit(size).all()
+                except InvalidCursor:
+                    raise HTTPException(status_code=400, detail=I18nKeys.GENERAL_BAD_REQUEST)
+            else:
+                # Total from the per-status deltas instead of COUNT(*) over orders
+                total = OrderService.count_orders(db, status_filter)
+                total_pages = math.ceil(total / size) if total > 0 else 1
+                
+                # Paginate and order
+                orders = ADMIN_ORDERS_ORDER.apply(query).offset((page - 1) * size).limit(size).all()
+            next_cursor = None
+            if len(orders) == size:
+                next_cursor = encode_cursor(ADMIN_ORDERS_ORDER, orders[-1].created_at, orders[-1].id)
             
             order_items = [
                 AdminOrderListItem(
                     id=order.id,
                     user_id=str(order.user_id),
-                    user_email=users_map.get(str(order.user_id)),
+                    user_email=order.user_email,
                     shipping_name=order.shipping_name,
                     total_amount=order.total_amount,
                     status=order.status,
-                    items_count=len(order.items) if order.items else 0,
+                    items_count=order.items_count,
                     created_at=order.created_at
                 )
                 for order in orders
@@ -300,7 +334,8 @@ class OrderService:
                 total=total,
                 page=page,
                 size=size,
-                total_pages=total_pages
+                total_pages=total_pages,
+                next_cursor=next_cursor
             )
         finally:
             db.close()
@@ -308,11 +343,9 @@ class OrderService:
     @staticmethod
     def admin_get_order_detail(order_id: int) -> OrderResponse:
         """Get any order detail (admin only)"""
-        db = get_db_session()
+        db = get_db_session(read_only=True)
         try:
-            order = db.query(Order).options(
-                joinedload(Order.items)
-            ).filter(Order.id == order_id).first()
+            order = db.execute(order_with_items(order_id)).unique().scalars().first()
             
             if not order:
                 raise HTTPException(
@@ -359,12 +392,7 @@ class OrderService:
         db = get_db_session()
         try:
             # Get order and verify ownership
-            order = db.query(Order).options(
-                joinedload(Order.items)
-            ).filter(
-                Order.id == order_id,
-                Order.user_id == user_id
-            ).first()
+            order = db.execute(order_with_items(order_id, user_id)).unique().scalars().first()
             
             if not order:
                 raise HTTPException(
@@ -405,9 +433,7 @@ class OrderService:
         
         db = get_db_session()
         try:
-            order = db.query(Order).options(
-                joinedload(Order.items)
-            ).filter(Order.id == order_id).first()
+            order = db.execute(order_with_items(order_id)).unique().scalars().first()
             
             if not order:
                 raise HTTPException(
@@ -434,9 +460,7 @@ class OrderService:
         db = get_db_session()
         try:
             # Get order with items
-            order = db.query(Order).options(
-                joinedload(Order.items)
-            ).filter(Order.id == order_id).first()
+            order = db.execute(order_with_items(order_id)).unique().scalars().first()
             
             if not order:
                 print(f"[Stock Deduction] Order {order_id} not found")
@@ -486,9 +510,7 @@ class OrderService:
         db = get_db_session()
         try:
             # Get order with items
-            order = db.query(Order).options(
-                joinedload(Order.items)
-            ).filter(Order.id == order_id).first()
+            order = db.execute(order_with_items(order_id)).unique().scalars().first()
             
             if not order:
                 print(f"[Stock Rollback] Order {order_id} not found")
@@ -0,0 +1,260 @@
+"""
+Bulk product import (CSV / JSONL)
+
+Rows are parsed lazily from the stream, validated with ProductCreate and
+written in batches: one multi-row INSERT ... ON CONFLICT (slug) DO UPDATE
+for the products, one for their sizes (upsert on product + size) and one
+for their colors, committed per batch. A batch the database rejects is
+retried row by row in savepoints, so one bad row is reported instead of
+failing its neighbours. Elasticsearch gets each committed batch in _bulk
+chunks with index refresh paused until the end; the caller invalidates the
+cache once with the returned slugs (see invalidate_imported_products).
+
+CSV columns are the ProductCreate fields; `sizes` is "size:stock;size:stock"
+and `colors` is "color=image_url;color". JSONL lines are ProductCreate
+objects. A row replaces all of an existing product's fields (missing or
+blank -> NULL, stock -> 0) and upserts the sizes it lists. Within one file
+the last row for a slug wins.
+"""
+import os
+import csv
+import json
+import logging
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.models.sqlalchemy import Product, ProductSize
+from app.models.sqlalchemy.product import RATING_COLUMNS
+from app.models.sqlalchemy.product_color import ProductColor
+from app.schemas.product_schemas import ProductCreate
+from app.search.product_sync import bulk_index_products, index_refresh_paused
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+# Products per commit (the driver gets them as multi-row INSERTs)
+IMPORT_BATCH_SIZE = int(os.getenv('PRODUCT_IMPORT_BATCH_SIZE', '1000'))
+# Documents per Elasticsearch _bulk request
+IMPORT_INDEX_CHUNK = int(os.getenv('PRODUCT_IMPORT_INDEX_CHUNK', '2000'))
+# Row errors kept in the report (the count keeps going)
+MAX_REPORTED_ERRORS = 1000
+
+# Catalog columns a row sets - not the id, created_at or the review aggregates
+PRODUCT_COLUMNS = [
+    column.name for column in Product.__table__.columns if column.name not in ("id", "created_at", *RATING_COLUMNS)
+]
+
+
+class ImportReport:
+    """Running totals of an import (passed to on_progress after every batch)"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.superseded = 0  # earlier rows of a slug repeated in the same batch
+        self.indexed = 0
+        self.index_failed = 0
+        self.errors: List[dict] = []
+        self.slugs: List[str] = []
+
+    def add_error(self, row: int, error: str, slug: Optional[str] = None):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "slug": slug, "error": error})
+
+    def summary(self) -> dict:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "superseded": self.superseded,
+            "indexed": self.indexed,
+            "index_failed": self.index_failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """csv / jsonl from a file name (.ndjson counts as jsonl)"""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return "jsonl" if extension in ("jsonl", "ndjson") else extension if extension in IMPORT_FORMATS else None
+
+
+def iter_import_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """(line number, raw record) of each row, read lazily - CSV dicts or JSONL lines"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for number, line in enumerate(stream, start=1):
+            if line.strip():
+                yield number, line
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(";") if part.strip()]
+
+
+def _parse_csv_row(row: dict) -> dict:
+    data = {key.strip(): (value.strip() or None if isinstance(value, str) else value)
+            for key, value in row.items() if key}
+    sizes = []
+    for entry in _split_list(data.pop("sizes", None)):
+        size, _, stock = entry.rpartition(":")
+        if not size:
+            raise ValueError(f"sizes entry {entry!r} is not size:stock")
+        sizes.append({"size": size, "stock_quantity": stock})
+    colors = []
+    for entry in _split_list(data.pop("colors", None)):
+        color, _, image_url = entry.partition("=")
+        colors.append({"color": color, "image_url": image_url or None})
+    data["sizes"] = sizes or None
+    data["colors"] = colors or None
+    return data
+
+
+def parse_import_row(raw, fmt: str) -> ProductCreate:
+    """Validated product from a raw record - ValueError / ValidationError if invalid"""
+    data = _parse_csv_row(raw) if fmt == "csv" else json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("row is not an object")
+    return ProductCreate(**data)
+
+
+def _row_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+    if isinstance(error, SQLAlchemyError):
+        return str(getattr(error, "orig", None) or error).splitlines()[0]
+    return str(error)
+
+
+def _dialect_insert(db: Session):
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def _write_products(db: Session, products: List[ProductCreate]) -> Dict[str, int]:
+    """Upsert products, their sizes and colors - slug -> product id"""
+    insert = _dialect_insert(db)
+    rows = []
+    for product in products:
+        row = product.dict(exclude={"sizes", "colors"})
+        row["stock"] = row.get("stock") or 0
+        rows.append({column: row.get(column) for column in PRODUCT_COLUMNS})
+
+    # Executed with a list of rows: one cached statement that SQLAlchemy's "insertmanyvalues"
+    # sends as multi-row INSERTs (building a VALUES clause per batch would recompile every time)
+    table = Product.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.slug],
+        set_={column: statement.excluded[column] for column in PRODUCT_COLUMNS if column != "slug"},
+    ).returning(table.c.id, table.c.slug)
+    ids = {slug: product_id for product_id, slug in db.execute(statement, rows)}
+
+    sizes = [
+        {"product_id": ids[product.slug], "size": size.size, "stock_quantity": size.stock_quantity}
+        for product in products for size in product.sizes or []
+    ]
+    if sizes:
+        size_table = ProductSize.__table__
+        statement = insert(size_table)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[size_table.c.product_id, size_table.c.size],
+            set_={"stock_quantity": statement.excluded.stock_quantity},
+        ), sizes)
+
+    # Colors have no natural key - a row listing colors replaces the product's colors
+    recolored = [ids[product.slug] for product in products if product.colors]
+    if recolored:
+        db.execute(delete(ProductColor).where(ProductColor.product_id.in_(recolored)))
+        db.execute(ProductColor.__table__.insert(), [
+            {"product_id": ids[product.slug], "color": color.color, "image_url": color.image_url}
+            for product in products for color in product.colors or []
+        ])
+    return ids
+
+
+def _write_batch(db: Session, batch: Dict[str, Tuple[int, ProductCreate]], report: ImportReport) -> List[int]:
+    """Write one batch (slug -> (row, product)) and commit - ids of the written products"""
+    existing = set(db.execute(select(Product.slug).where(Product.slug.in_(list(batch)))).scalars())
+    try:
+        with db.begin_nested():
+            ids = _write_products(db, [product for _, product in batch.values()])
+    except SQLAlchemyError:
+        # Find the offending rows: each row in its own savepoint
+        ids = {}
+        for slug, (row, product) in batch.items():
+            try:
+                with db.begin_nested():
+                    ids.update(_write_products(db, [product]))
+            except SQLAlchemyError as e:
+                report.add_error(row, _row_error(e), slug)
+    db.commit()
+
+    for slug in ids:
+        if slug in existing:
+            report.updated += 1
+        else:
+            report.created += 1
+    report.slugs.extend(ids)
+    return list(ids.values())
+
+
+def _index_batch(db: Session, product_ids: List[int], report: ImportReport):
+    products = db.query(Product).filter(Product.id.in_(product_ids)).all()
+    result = bulk_index_products(products, refresh=False, chunk_size=IMPORT_INDEX_CHUNK)
+    report.indexed += result["success"]
+    report.index_failed += result["failed"]
+    db.expunge_all()
+
+
+def import_products(
+    db: Session,
+    stream: TextIO,
+    fmt: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    index: bool = True,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """Stream rows from `stream` into the catalog; invalid rows are reported, not fatal"""
+    report = ImportReport()
+
+    def flush(batch):
+        product_ids = _write_batch(db, batch, report)
+        if index and product_ids:
+            _index_batch(db, product_ids, report)
+        logger.info(f"Product import: {report.rows} rows, {report.created} created, "
+                    f"{report.updated} updated, {report.failed} failed")
+        if on_progress:
+            on_progress(report)
+
+    with index_refresh_paused() if index else nullcontext():
+        batch: Dict[str, Tuple[int, ProductCreate]] = {}
+        for row, raw in iter_import_rows(stream, fmt):
+            report.rows += 1
+            try:
+                product = parse_import_row(raw, fmt)
+            except (ValueError, TypeError, ValidationError) as e:
+                slug = raw.get("slug") if isinstance(raw, dict) else None
+                report.add_error(row, _row_error(e), slug)
+                continue
+            if product.slug in batch:
+                report.superseded += 1
+                del batch[product.slug]  # keep file order: the later row goes last
+            batch[product.slug] = (row, product)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = {}
+        if batch:
+            flush(batch)
+    return report
@@ -1,14 +1,19 @@
 from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.models.sqlalchemy import Product, ProductSize, Category
-from app.schemas.product_schemas import ProductBase, ProductResponse, CategoryResponse, ProductSizeResponse
-from app.db import get_db_session
+from sqlalchemy.orm import Session, selectinload, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import or_, func, insert, inspect
+from app.models.sqlalchemy import Product, ProductSize, Category, OrderItem
+from app.models.sqlalchemy.product_color import ProductColor
+from app.schemas.product_schemas import ProductBase, ProductResponse, ProductCardResponse, CategoryResponse, ProductSizeResponse
 from fastapi import HTTPException
 from fastapi_pagination import Page, paginate
-from app import app
 from app.i18n_keys import I18nKeys
 from app.search.product_sync import index_product, delete_product_from_index
+from app.search.db_search import full_text_available, apply_full_text_search
+from app.db.keyset import KeysetOrder, InvalidCursor, encode_cursor, parse_datetime
+from app.db import commit_keeping_state
+from app.db.queries import product_by_slug
 import os
 from colorama import Fore
 from datetime import datetime
@@ -16,7 +21,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-db = get_db_session()
+# Relationships map_product_to_response reads - load them with every product that gets mapped,
+# one extra statement each for the whole page instead of two lazy loads per product
+PRODUCT_RESPONSE_LOADERS = (selectinload(Product.categories), selectinload(Product.sizes))
+
 def map_product_to_response(db_product: Product) -> ProductResponse:
     categories = [CategoryResponse(name=category.name, id=category.id) for category in db_product.categories]
     sizes = [ProductSizeResponse(size=size.size, stock_quantity=size.stock_quantity, size_id=size.size_id) for size in db_product.sizes]
@@ -33,43 +41,100 @@ def map_product_to_response(db_product: Product) -> ProductResponse:
         sizes=sizes,
         sale_price=db_product.sale_price,
         stock=db_product.stock,
-        created_at=db_product.created_at if hasattr(db_product, 'created_at') and db_product.created_at else datetime.now()
+        created_at=db_product.created_at if hasattr(db_product, 'created_at') and db_product.created_at else datetime.now(),
+        rating_avg=round(db_product.rating_avg or 0.0, 2),
+        rating_count=db_product.rating_count or 0
+    )
+
+# Columns of a list card (fields=card) - skips the long Text columns and the relationships
+PRODUCT_CARD_COLUMNS = (
+    Product.id, Product.slug, Product.product_name, Product.price, Product.sale_price,
+    Product.stock, Product.image_url, Product.blurb, Product.created_at, Product.rating_avg, Product.rating_count,
+)
+
+def map_product_to_card(db_product: Product) -> ProductCardResponse:
+    return ProductCardResponse(
+        id=db_product.id,
+        slug=db_product.slug,
+        product_name=db_product.product_name,
+        price=db_product.price,
+        sale_price=db_product.sale_price,
+        stock=db_product.stock,
+        image_url=db_product.image_url,
+        blurb=db_product.blurb,
+        created_at=db_product.created_at,
+        rating_avg=round(db_product.rating_avg or 0.0, 2),
+        rating_count=db_product.rating_count or 0,
     )
+
+# Product list orders - all usable with keyset cursors
+PRODUCT_SORTS = {
+    "default": KeysetOrder("default", None, Product.id),
+    "newest": KeysetOrder("newest", Product.created_at, Product.id, descending=True, parse=parse_datetime),
+    "price_asc": KeysetOrder("price_asc", Product.price, Product.id, parse=float),
+    "price_desc": KeysetOrder("price_desc", Product.price, Product.id, descending=True, parse=float),
+}
+
+def product_page_cursor(products: List[Dict], limit: int, sort: Optional[str] = None) -> Optional[str]:
+    """Cursor for the page after `products` (mapped response dicts), None on the last page"""
+    if len(products) < limit:
+        return None
+    order = PRODUCT_SORTS[sort or "default"]
+    last = products[-1]
+    return encode_cursor(order, None if order.key is None else last[order.key.key], last["id"])
+
+def _insert_children(db: Session, model, rows: List[Dict]) -> list:
+    """One bulk INSERT ... RETURNING of a product's child rows - the new objects, in id order"""
+    if not rows:
+        return []
+    # RETURNING order isn't guaranteed for multi-row inserts; ids are, like a lazy load's order
+    children = db.scalars(insert(model).returning(model), rows).all()
+    return sorted(children, key=lambda child: inspect(child).identity)
+
+def _is_slug_conflict(error: IntegrityError) -> bool:
+    """uq_products_slug violation (Postgres names the constraint, SQLite the column)"""
+    message = str(error.orig)
+    return "uq_products_slug" in message or "products.slug" in message
+
 class Product_Service():
     
     # Create a new product
-    def create_product(product: ProductBase) -> Dict:
-        # Tạo product chính
-        product_data = product.dict(exclude={"sizes", "colors"})
-        db_product = Product(**product_data)
-        db.add(db_product)
-        db.commit()
-        db.refresh(db_product)
-
-        # Tạo size nếu có
-        sizes = getattr(product, "sizes", None)
-        if sizes:
-            for size in sizes:
-                db_size = ProductSize(
-                    product_id=db_product.id,
-                    size=size.size,
-                    stock_quantity=size.stock_quantity
-                )
-                db.add(db_size)
-            db.commit()
+    def create_product(db: Session, product: ProductBase) -> Dict:
+        """
+        Create a product with its sizes and colors in one transaction
 
-        # Tạo màu nếu có
-        colors = getattr(product, "colors", None)
-        if colors:
-            from app.models.sqlalchemy.product_color import ProductColor
-            for color in colors:
-                db_color = ProductColor(
-                    product_id=db_product.id,
-                    color=color.color,
-                    image_url=color.image_url
-                )
-                db.add(db_color)
-            db.commit()
+        The product INSERT returns its id and created_at, each child table gets
+        one bulk INSERT ... RETURNING, and the response is mapped from the rows
+        in the session - no SELECTs. Any failure rolls the whole product back.
+        """
+        try:
+            # Tạo product chính
+            db_product = Product(**product.dict(exclude={"sizes", "colors"}))
+            db.add(db_product)
+            db.flush()
+
+            # Tạo size, màu nếu có
+            sizes = [
+                {"product_id": db_product.id, "size": size.size, "stock_quantity": size.stock_quantity}
+                for size in getattr(product, "sizes", None) or []
+            ]
+            colors = [
+                {"product_id": db_product.id, "color": color.color, "image_url": color.image_url}
+                for color in getattr(product, "colors", None) or []
+            ]
+            # The new product has exactly these children - set the collections as loaded
+            set_committed_value(db_product, "categories", [])
+            set_committed_value(db_product, "sizes", _insert_children(db, ProductSize, sizes))
+            set_committed_value(db_product, "colors", _insert_children(db, ProductColor, colors))
+            commit_keeping_state(db)
+        except IntegrityError as e:
+            db.rollback()
+            if _is_slug_conflict(e):
+                raise HTTPException(status_code=409, detail=I18nKeys.PRODUCT_SLUG_EXISTS)
+            raise
+        except Exception:
+            db.rollback()
+            raise
 
         # Sync to Elasticsearch (non-blocking, don't fail if ES is down)
         try:
@@ -81,6 +146,7 @@ class Product_Service():
 
     # Get a list of all products with filters
     def get_products(
+        db: Session,
         page: int = 0, 
         limit: int = 10,
         category: Optional[str] = None,
@@ -90,10 +156,24 @@ class Product_Service():
         search: Optional[str] = None,
         manufacturer: Optional[str] = None,
         certification: Optional[str] = None,
-        on_sale: Optional[bool] = None
+        on_sale: Optional[bool] = None,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: str = "full"
     ) -> List[Dict]:
+        """
+        Filtered product page
+
+        Without `sort`, a search is ordered by relevance (offset pages only) and
+        everything else by id. With a `cursor` (see product_page_cursor) the page
+        continues after the cursor's row in `sort` order and `page` is ignored.
+        fields="card" loads only PRODUCT_CARD_COLUMNS (map with map_product_to_card).
+        """
         try:
-            query = db.query(Product)
+            if fields == "card":
+                query = db.query(Product).options(load_only(*PRODUCT_CARD_COLUMNS))
+            else:
+                query = db.query(Product).options(*PRODUCT_RESPONSE_LOADERS)
             
             # Filter by product_type (e.g., "Vitamins", "Protein", etc.)
             if product_type:
@@ -121,8 +201,11 @@ class Product_Service():
             if on_sale:
                 query = query.filter(Product.sale_price.isnot(None))
             
-            # Search by product name or description
-            if search:
+            # Search by product name or description - ranked full-text on Postgres
+            rank = None
+            if search and full_text_available(db):
+                query, rank = apply_full_text_search(query, search)
+            elif search:
                 query = query.filter(
                     or_(
                         Product.product_name.ilike(f"%{search}%"),
@@ -131,27 +214,74 @@ class Product_Service():
                     )
                 )
             
-            # Pagination
-            products = query.offset(page * limit).limit(limit).all()
-            return products
+            if rank is not None and sort is None and cursor is None:
+                query = query.order_by(rank.desc(), Product.id.desc())
+                return query.offset(page * limit).limit(limit).all()
+
+            # Keyset pagination when continuing from a cursor, offset pages otherwise
+            query = PRODUCT_SORTS[sort or "default"].apply(query, cursor)
+            if cursor is None:
+                query = query.offset(page * limit)
+            return query.limit(limit).all()
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail=I18nKeys.GENERAL_BAD_REQUEST)
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=I18nKeys.PRODUCT_FETCH_ERROR)
     # Get a single product by ID
-    def get_product(product_slug: str):
+    def get_product(db: Session, product_slug: str):
         try:
-            product = db.query(Product).filter(Product.slug == product_slug).one()
-            print(product)
-            return product
+            product = db.execute(product_by_slug(product_slug, for_response=True)).scalars().first()
         except Exception as e:
             db.rollback()  # Ensure to rollback on any error.
+            logger.error(f"Failed to fetch product {product_slug}: {e}")
+            raise HTTPException(status_code=500, detail=I18nKeys.GENERAL_ERROR)
+        # Only a real miss is a 404 (callers negative-cache it)
+        if not product:
             raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
+        return product
+
+    @staticmethod
+    def get_all_slugs(db: Session) -> List[str]:
+        """All product slugs (feeds the known-slug Bloom filter)"""
+        try:
+            return [slug for (slug,) in db.query(Product.slug).all()]
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def get_product_types(db: Session) -> List[str]:
+        """Distinct non-empty product types (cache warm-up pages)"""
+        try:
+            rows = db.query(Product.product_type).filter(Product.product_type.isnot(None)).distinct().all()
+            return sorted(product_type for (product_type,) in rows if product_type)
+        except Exception:
+            db.rollback()
+            raise
 
+    @staticmethod
+    def get_top_product_slugs(db: Session, limit: int = 20) -> List[str]:
+        """Best sellers by units ordered, newest first among ties (cache warm-up details)"""
+        try:
+            units = func.coalesce(func.sum(OrderItem.quantity), 0)
+            rows = (
+                db.query(Product.slug)
+                .outerjoin(OrderItem, OrderItem.product_id == Product.id)
+                .group_by(Product.id, Product.slug)
+                .order_by(units.desc(), Product.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return [slug for (slug,) in rows]
+        except Exception:
+            db.rollback()
+            raise
 
     # Update a product
-    def update_product(product_slug: str, product_data: dict) -> Dict:
+    def update_product(db: Session, product_slug: str, product_data: dict) -> Dict:
         try:
-            db_product = db.query(Product).filter(Product.slug == product_slug).first()
+            db_product = db.execute(product_by_slug(product_slug, for_response=True)).scalars().first()
             if not db_product:
                 raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
             
@@ -160,8 +290,8 @@ class Product_Service():
                 if value is not None and hasattr(db_product, key):
                     setattr(db_product, key, value)
             
-            db.commit()
-            db.refresh(db_product)
+            # Relationships were loaded with the product and the columns hold what was written
+            commit_keeping_state(db)
             
             # Sync to Elasticsearch
             try:
@@ -172,14 +302,19 @@ class Product_Service():
             return map_product_to_response(db_product).dict()
         except HTTPException:
             raise
+        except IntegrityError as e:
+            db.rollback()
+            if _is_slug_conflict(e):
+                raise HTTPException(status_code=409, detail=I18nKeys.PRODUCT_SLUG_EXISTS)
+            raise HTTPException(status_code=500, detail=I18nKeys.GENERAL_ERROR)
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=I18nKeys.GENERAL_ERROR)
 
     # Delete a product
-    def delete_product(product_slug: str) -> bool:
+    def delete_product(db: Session, product_slug: str) -> bool:
         try:
-            db_product = db.query(Product).filter(Product.slug == product_slug).first()
+            db_product = db.execute(product_by_slug(product_slug)).scalars().first()
             if not db_product:
                 raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
             
@@ -202,10 +337,10 @@ class Product_Service():
             raise HTTPException(status_code=500, detail=I18nKeys.GENERAL_ERROR)
 
     @staticmethod
-    def update_product_stock(product_slug: str, stock: int) -> Dict:
+    def update_product_stock(db: Session, product_slug: str, stock: int) -> Dict:
         """Update product stock"""
         try:
-            db_product = db.query(Product).filter(Product.slug == product_slug).first()
+            db_product = db.execute(product_by_slug(product_slug)).scalars().first()
             if not db_product:
                 raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
             
@@ -1,22 +1,30 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, load_only
 from app.models.sqlalchemy import Review, Product, User
+from app.models.sqlalchemy.product import rating_histogram, RATING_COLUMNS
 from app.models.sqlalchemy.order import Order, OrderItem, OrderStatus
-from app.schemas.review_schemas import ReviewCreate, ReviewResponse, ReviewListResponse, ReviewAuthor
-from app.db import get_db_session
+from app.schemas.review_schemas import ReviewCreate, ReviewResponse, ReviewListResponse, ReviewSummaryResponse, ReviewAuthor
 from fastapi import HTTPException
 from app.i18n_keys import I18nKeys
+from app.search.product_sync import index_product
+from app.db.keyset import KeysetOrder, InvalidCursor, encode_cursor, parse_datetime
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
 
-db = get_db_session()
+# Reviews per page (the product page's first page is cached)
+REVIEW_PAGE_SIZE = 10
+
+# Review pages, newest first - keyset cursors encode (created_at, id), see ix_reviews_product_id_created_at_id
+REVIEWS_ORDER = KeysetOrder("newest", Review.created_at, Review.id, descending=True, parse=parse_datetime)
 
 
 def map_review_to_response(review: Review) -> ReviewResponse:
     author = ReviewAuthor(
         uuid=review.author.uuid,
-        display_name=review.author.display_name,
+        # User has no display_name column - build it from the name fields
+        display_name=" ".join(filter(None, [review.author.first_name, review.author.last_name])) or None,
         email=review.author.email
     )
     return ReviewResponse(
@@ -29,11 +37,38 @@ def map_review_to_response(review: Review) -> ReviewResponse:
     )
 
 
+def _reindex_rating(product: Product):
+    """Push the product's new rating aggregates to Elasticsearch (search sorts by rating)"""
+    try:
+        index_product(product)
+    except Exception as e:
+        logger.error(f"Failed to update rating of product {product.id} in Elasticsearch: {e}")
+
+
+def map_rating_summary(product: Product) -> ReviewSummaryResponse:
+    # Aggregates are kept on the product row by the Review mapper events
+    return ReviewSummaryResponse(
+        average_rating=round(product.rating_avg or 0.0, 1),
+        total_reviews=product.rating_count or 0,
+        rating_histogram=rating_histogram(product)
+    )
+
+
+def _rated_product(db: Session, product_slug: str) -> Product:
+    """The product's id and rating aggregates only - 404 if the slug doesn't exist"""
+    product = db.query(Product).options(
+        load_only(Product.id, *(getattr(Product, column) for column in RATING_COLUMNS))
+    ).filter(Product.slug == product_slug).first()
+    if not product:
+        raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
+    return product
+
+
 class ReviewService:
     
     @staticmethod
-    def create_review(product_slug: str, review_data: ReviewCreate, user_id: uuid.UUID) -> ReviewResponse:
-        """Create a new review for a product"""
+    def create_review(db: Session, product_slug: str, review_data: ReviewCreate, user_id: uuid.UUID) -> ReviewResponse:
+        """Create a new review for a product (the product's rating aggregates move in the same commit)"""
         # Find product by slug
         product = db.query(Product).filter(Product.slug == product_slug).first()
         if not product:
@@ -70,6 +105,7 @@ class ReviewService:
         db.add(new_review)
         db.commit()
         db.refresh(new_review)
+        _reindex_rating(product)
         
         # Load author relationship
         new_review = db.query(Review).options(
@@ -79,39 +115,39 @@ class ReviewService:
         return map_review_to_response(new_review)
     
     @staticmethod
-    def get_product_reviews(product_slug: str) -> ReviewListResponse:
-        """Get all reviews for a product with average rating"""
-        # Find product by slug
-        product = db.query(Product).filter(Product.slug == product_slug).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=I18nKeys.PRODUCT_NOT_FOUND)
-        
-        # Get reviews with author
-        reviews = db.query(Review).options(
-            joinedload(Review.author)
-        ).filter(
-            Review.product_id == product.id
-        ).order_by(Review.created_at.desc()).all()
-        
-        # Calculate average rating
-        if reviews:
-            avg_rating = db.query(func.avg(Review.rating)).filter(
-                Review.product_id == product.id
-            ).scalar() or 0.0
-        else:
-            avg_rating = 0.0
-        
-        review_responses = [map_review_to_response(r) for r in reviews]
+    def get_product_reviews(
+        db: Session, product_slug: str, limit: int = REVIEW_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> ReviewListResponse:
+        """
+        One page of a product's reviews, newest first, with the rating summary
+
+        Pages are keyset pages on (created_at, id): pass next_cursor back as
+        `cursor` for the next one - any page costs one index range scan.
+        """
+        product = _rated_product(db, product_slug)
+        query = db.query(Review).options(joinedload(Review.author)).filter(Review.product_id == product.id)
+        try:
+            reviews = REVIEWS_ORDER.apply(query, cursor).limit(limit).all()
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail=I18nKeys.GENERAL_BAD_REQUEST)
         
+        next_cursor = None
+        if len(reviews) == limit:
+            next_cursor = encode_cursor(REVIEWS_ORDER, reviews[-1].created_at, reviews[-1].id)
         return ReviewListResponse(
-            reviews=review_responses,
-            average_rating=round(float(avg_rating), 1),
-            total_reviews=len(reviews)
+            reviews=[map_review_to_response(r) for r in reviews],
+            next_cursor=next_cursor,
+            **map_rating_summary(product).dict()
         )
     
     @staticmethod
-    def delete_review(review_id: int, user_id: uuid.UUID, is_admin: bool = False) -> bool:
-        """Delete a review (user can delete own, admin can delete any)"""
+    def get_review_summary(db: Session, product_slug: str) -> ReviewSummaryResponse:
+        """Average, count and star histogram of a product's reviews - a single row read"""
+        return map_rating_summary(_rated_product(db, product_slug))
+    
+    @staticmethod
+    def delete_review(db: Session, review_id: int, user_id: uuid.UUID, is_admin: bool = False) -> str:
+        """Delete a review (user can delete own, admin can delete any) - the reviewed product's slug"""
         review = db.query(Review).filter(Review.id == review_id).first()
         if not review:
             raise HTTPException(status_code=404, detail=I18nKeys.REVIEW_NOT_FOUND)
@@ -120,6 +156,8 @@ class ReviewService:
         if not is_admin and review.user_id != user_id:
             raise HTTPException(status_code=403, detail=I18nKeys.UNAUTHORIZED)
         
+        product = review.product
         db.delete(review)
         db.commit()
-        return True
+        _reindex_rating(product)
+        return product.slug
@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 from app.models.sqlalchemy import User
 from app.schemas.user_schemas import UserCreate, UserResponse, LoginRequest, TokenResponse
 from app.db import get_db_session
+from app.db.queries import user_by_uuid
 from app.i18n_keys import I18nKeys
 
 load_dotenv()
@@ -111,7 +112,7 @@ class UserServices:
 
         db = get_db_session()
         try:
-            user = db.query(User).filter(User.uuid == user_id).first()
+            user = db.execute(user_by_uuid(user_id)).scalars().first()
             if user is None:
                 raise credentials_exception
             return user
@@ -122,7 +123,7 @@ class UserServices:
     def get_user_by_id(user_id: str) -> Optional[User]:
         db = get_db_session()
         try:
-            return db.query(User).filter(User.uuid == user_id).first()
+            return db.execute(user_by_uuid(user_id)).scalars().first()
         finally:
             db.close()
 
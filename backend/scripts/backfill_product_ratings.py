@@ -0,0 +1,40 @@
+"""
+Rebuild the products' rating aggregates (rating_avg, rating_count, stars_1..5) from the reviews
+
+The Review mapper events keep them in step with every review written through
+the ORM; run this after the migration if old app instances kept writing
+reviews, or after reviews were changed by raw SQL / bulk deletes.
+Pass --reindex to push the new aggregates to Elasticsearch as well.
+
+Usage: python scripts/backfill_product_ratings.py [--reindex]
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import session_scope
+from app.models.sqlalchemy import Product
+from app.models.sqlalchemy.product import recompute_product_ratings
+from app.search.product_sync import bulk_index_products
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute product rating aggregates from reviews")
+    parser.add_argument("--reindex", action="store_true", help="Re-index the products in Elasticsearch afterwards")
+    args = parser.parse_args()
+
+    with session_scope() as db:
+        updated = recompute_product_ratings(db.connection())
+        db.commit()
+        print(f"Recomputed ratings of {updated} products")
+
+        if args.reindex:
+            result = bulk_index_products(db.query(Product).all())
+            print(f"Indexed {result['success']} products ({result['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark cache codecs on the seeded supplement catalog
+
+Encodes every product of scripts/seed_supplements.py as a cached
+ProductResponse (detail entries) plus the whole catalog as one list entry,
+and reports encode/decode time and stored bytes for each codec/compression
+combination. No database or Redis needed; combinations whose optional
+library is not installed are skipped.
+
+Usage: python scripts/bench_cache_codec.py [--repeat 2000] [--threshold 1024]
+"""
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app.cache.codec import CacheCodec, CODEC_NAMES, COMPRESSION_NAMES
+from app.schemas.product_schemas import ProductResponse
+from seed_supplements import supplement_catalog
+
+COMBINATIONS = [
+    ("json", "none"),
+    ("orjson", "none"),
+    ("msgpack", "none"),
+    ("json", "zstd"),
+    ("orjson", "zstd"),
+    ("orjson", "lz4"),
+    ("msgpack", "zstd"),
+    ("msgpack", "lz4"),
+]
+
+
+def build_payloads() -> list:
+    """Product detail dicts shaped like the cached read_product response"""
+    payloads = []
+    for product_id, data in enumerate(supplement_catalog(), start=1):
+        response = ProductResponse(id=product_id, created_at=datetime.now(), **data)
+        payloads.append(response.dict())
+    return payloads
+
+
+def bench(codec: CacheCodec, payloads: list, repeat: int) -> dict:
+    encoded = [codec.encode(p) for p in payloads]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for p in payloads:
+            codec.encode(p)
+    encode_us = (time.perf_counter() - start) / (repeat * len(payloads)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for e in encoded:
+            codec.decode(e)
+    decode_us = (time.perf_counter() - start) / (repeat * len(payloads)) * 1e6
+
+    return {"encode_us": encode_us, "decode_us": decode_us, "bytes": sum(len(e) for e in encoded)}
+
+
+def main(repeat: int, threshold: int):
+    details = build_payloads()
+    listing = [details]  # the full catalog as a single list-page entry
+
+    print(f"{len(details)} products, repeat={repeat}, compression threshold={threshold} bytes\n")
+    print(f"{'codec':<18} | {'detail enc us':>13} | {'detail dec us':>13} | {'detail bytes':>12} | "
+          f"{'list enc us':>11} | {'list dec us':>11} | {'list bytes':>10}")
+    print("-" * 106)
+
+    for codec_name, compression in COMBINATIONS:
+        codec = CacheCodec(codec=codec_name, compression=compression, compression_threshold=threshold)
+        # Skip combinations that fell back because a library is missing
+        if codec.codec != CODEC_NAMES[codec_name] or codec.compression != COMPRESSION_NAMES[compression]:
+            continue
+        d = bench(codec, details, repeat)
+        l = bench(codec, listing, max(1, repeat // 10))
+        print(f"{codec_name + '+' + compression:<18} | {d['encode_us']:>13.1f} | {d['decode_us']:>13.1f} | "
+              f"{d['bytes']:>12} | {l['encode_us']:>11.1f} | {l['decode_us']:>11.1f} | {l['bytes']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="Encode/decode rounds per product")
+    parser.add_argument("--threshold", type=int, default=1024, help="Compression threshold in bytes")
+    args = parser.parse_args()
+    main(args.repeat, args.threshold)
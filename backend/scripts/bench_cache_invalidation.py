@@ -0,0 +1,84 @@
+"""
+Benchmark product list cache invalidation against a real Redis (REDIS_URL)
+
+Compares the old KEYS + per-key DELETE invalidation with the namespace
+generation counter (single INCR) for 10 .. 100k cached list pages.
+
+Usage: python scripts/bench_cache_invalidation.py [--sizes 10,100,1000,10000,100000]
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app.cache as cache
+from app.cache import (
+    init_redis, close_redis, cache_bump_namespace, cache_namespace_version,
+    products_cache_key, PRODUCTS_NAMESPACE,
+)
+
+BENCH_PREFIX = "bench"
+
+
+async def populate(pages: int, version: int):
+    """Fill Redis with `pages` cached list pages of the current generation"""
+    pipe = cache.redis.pipeline(transaction=False)
+    for page in range(pages):
+        key = f"{BENCH_PREFIX}:{products_cache_key(page=page, size=20, version=version)}"
+        pipe.setex(key, 300, "[]")
+        if page % 1000 == 999:
+            await pipe.execute()
+    await pipe.execute()
+
+
+async def invalidate_with_keys() -> float:
+    """Old strategy: KEYS products:* then one DELETE per key"""
+    start = time.perf_counter()
+    keys = await cache.redis.keys(f"{BENCH_PREFIX}:{PRODUCTS_NAMESPACE}:*")
+    if keys:
+        await asyncio.gather(*[cache.redis.delete(k) for k in keys])
+    return (time.perf_counter() - start) * 1000
+
+
+async def invalidate_with_version() -> float:
+    """New strategy: one INCR of the namespace generation"""
+    start = time.perf_counter()
+    await cache_bump_namespace(PRODUCTS_NAMESPACE)
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(sizes):
+    await init_redis()
+    if cache.redis is None:
+        print("Redis unavailable - set REDIS_URL")
+        return
+
+    print(f"{'pages':>8} | {'KEYS+DEL (ms)':>14} | {'INCR (ms)':>10}")
+    print("-" * 40)
+    for pages in sizes:
+        await populate(pages, version=0)
+        keys_ms = await invalidate_with_keys()
+
+        version = await cache_namespace_version(PRODUCTS_NAMESPACE)
+        await populate(pages, version=version)
+        incr_ms = await invalidate_with_version()
+
+        print(f"{pages:>8} | {keys_ms:>14.2f} | {incr_ms:>10.3f}")
+
+        # Clean up the orphaned generation so the next run starts empty
+        async for key in cache.redis.scan_iter(match=f"{BENCH_PREFIX}:*", count=1000):
+            await cache.redis.unlink(key)
+
+    await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000",
+                        help="Comma-separated numbers of cached pages to test")
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.sizes.split(",")]))
@@ -0,0 +1,108 @@
+"""
+Benchmark async product routes with DB calls inline vs. offloaded (run_db)
+
+Simulates one worker under concurrent load: --db-clients keep issuing
+product list queries (Product_Service.get_products + mapping, like a cache
+miss in read_products) while --hit-clients issue cheap requests (a cached
+page serialized to JSON, like a cache hit). Reports throughput of each
+kind, hit latency and the worst event loop stall.
+
+"inline" is the old behaviour (sync query inside async def), "offload"
+runs the query in the bounded DB executor (DB_EXECUTOR_WORKERS).
+--latency-ms adds a per-query delay inside the DB call to model the
+network round trip to a remote Postgres.
+
+Usage: python scripts/bench_db_offload.py [--seconds 5] [--db-clients 4] [--hit-clients 50] [--latency-ms 2]
+"""
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import run_db, session_scope
+from app.services.product_service import Product_Service, map_product_to_response
+
+
+def list_page(latency: float) -> list:
+    if latency:
+        time.sleep(latency)
+    with session_scope() as db:
+        products = Product_Service.get_products(db, page=0, limit=20)
+        return [map_product_to_response(product).dict() for product in products]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run(mode: str, seconds: float, db_clients: int, hit_clients: int, latency: float) -> dict:
+    cached_page = list_page(0)
+    deadline = time.perf_counter() + seconds
+    counts = {"db": 0, "hits": 0}
+    hit_latencies = []
+    max_stall = 0.0
+
+    async def db_client():
+        while time.perf_counter() < deadline:
+            if mode == "inline":
+                list_page(latency)
+                await asyncio.sleep(0)
+            else:
+                await run_db(list_page, latency)
+            counts["db"] += 1
+
+    async def hit_client():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(0)
+            json.dumps(cached_page, default=str)
+            hit_latencies.append(time.perf_counter() - started)
+            counts["hits"] += 1
+
+    async def heartbeat():
+        nonlocal max_stall
+        interval = 0.005
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_stall = max(max_stall, time.perf_counter() - started - interval)
+
+    await asyncio.gather(
+        heartbeat(),
+        *(db_client() for _ in range(db_clients)),
+        *(hit_client() for _ in range(hit_clients)),
+    )
+    return {
+        "db_rps": counts["db"] / seconds,
+        "hit_rps": counts["hits"] / seconds,
+        "hit_p99_ms": percentile(hit_latencies, 0.99) * 1000,
+        "max_stall_ms": max_stall * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs offloaded DB calls in async routes")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--db-clients", type=int, default=4)
+    parser.add_argument("--hit-clients", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Simulated DB round trip per query")
+    args = parser.parse_args()
+
+    print(f"{args.db_clients} DB clients, {args.hit_clients} cache-hit clients, {args.seconds}s per mode, "
+          f"+{args.latency_ms}ms per query")
+    print(f"{'mode':<8} {'db req/s':>10} {'hit req/s':>11} {'hit p99 ms':>11} {'max stall ms':>13}")
+    for mode in ("inline", "offload"):
+        r = asyncio.run(run(mode, args.seconds, args.db_clients, args.hit_clients, args.latency_ms / 1000))
+        print(f"{mode:<8} {r['db_rps']:>10.0f} {r['hit_rps']:>11.0f} {r['hit_p99_ms']:>11.2f} {r['max_stall_ms']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark Postgres full-text product search against the old ILIKE path
+
+Builds a synthetic catalog (Vietnamese and English names, diacritics, long
+descriptions) in a scratch Postgres schema (DATABASE_URL, nothing outside the
+scratch schema is touched), applies the add_product_search_vector migration,
+then times Product_Service.get_products(search=...) and
+ChatService.search_products(...) with the ILIKE path and with the ranked
+full-text path. Reports median latency and the number of results returned.
+
+Usage: python scripts/bench_db_search.py [--products 100000] [--runs 7]
+"""
+import sys
+import os
+import time
+import argparse
+import importlib.util
+import statistics
+from unittest.mock import patch
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+import app.db
+from app.db import Base, DATABASE_URL
+from app.models.sqlalchemy import models_arr  # noqa: F401 - registers models
+from app.services.product_service import Product_Service
+from app.services.chat_service import ChatService
+
+SCHEMA = "bench_search"
+MIGRATION = os.path.join(
+    os.path.dirname(__file__), '..', 'alembic', 'versions', '9d4e6b1c8a27_add_product_search_vector.py'
+)
+
+NAMES = [
+    'Sữa Whey Protein', 'Dầu cá Omega 3', 'Vitamin C 1000mg', 'Collagen Thủy Phân', 'Sữa đậu nành',
+    'Tảo xoắn Spirulina', 'Men vi sinh', 'Canxi Nano', 'Kẽm Zinc', 'Trà xanh giảm cân',
+    'Tinh bột nghệ', 'Hồng sâm Hàn Quốc', 'Mass Gainer', 'BCAA Energy', 'Glucosamine',
+]
+TYPES = ['Protein', 'Vitamins', 'Beauty', 'Weight Management', 'Digestive Health', 'Immune Support']
+DESCRIPTION = (
+    "Sản phẩm hỗ trợ sức khỏe, bổ sung dinh dưỡng hằng ngày. Thành phần tự nhiên, "
+    "đạt chuẩn GMP. Supports daily nutrition and recovery after training. "
+)
+# (label, search text) - includes unaccented and misspelled queries shoppers type
+QUERIES = [
+    ("common word", "whey"),
+    ("with diacritics", "sữa đậu nành"),
+    ("without diacritics", "sua dau nanh"),
+    ("two words", "dau ca"),
+    ("typo", "colagen"),
+    ("rare", "glucosamine 77777"),
+]
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("add_product_search_vector", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed(conn, products: int):
+    print(f"Seeding {products} products...")
+    conn.execute(text("""
+        INSERT INTO products (id, slug, product_type, product_name, price, stock, blurb, description)
+        SELECT i, 'product-' || i,
+               (:types)[1 + i % cardinality(:types)],
+               (:names)[1 + i % cardinality(:names)] || ' ' || i,
+               10 + i % 90, 100,
+               'Hàng chính hãng ' || (:names)[1 + (i / 7) % cardinality(:names)],
+               repeat(:description, 3)
+        FROM generate_series(1, :products) i
+    """), {"products": products, "names": NAMES, "types": TYPES, "description": DESCRIPTION})
+    conn.execute(text("ANALYZE products"))
+
+
+def timed(fn, runs: int):
+    timings, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ILIKE vs ranked full-text product search")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    if not DATABASE_URL or not DATABASE_URL.startswith("postgresql"):
+        sys.exit("DATABASE_URL must point at Postgres")
+
+    engine = create_engine(DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA},public"})
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    # ChatService opens its own sessions through app.db
+    app.db._SessionLocal = SessionLocal
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    results = []
+    try:
+        with engine.begin() as conn:
+            Base.metadata.create_all(bind=conn)
+            seed(conn, args.products)
+            with Operations.context(MigrationContext.configure(conn)):
+                load_migration().upgrade()
+            conn.execute(text("ANALYZE products"))
+
+        db = SessionLocal()
+        try:
+            for label, search in QUERIES:
+                for mode, available in (("ilike", False), ("fulltext", True)):
+                    with patch("app.services.product_service.full_text_available", lambda _db: available), \
+                            patch("app.services.chat_service.full_text_available", lambda _db: available):
+                        products = timed(lambda: Product_Service.get_products(db, page=0, limit=20, search=search), args.runs)
+                        chat = timed(lambda: ChatService.search_products(search, limit=5), args.runs)
+                    results.append((label, search, mode, products, chat))
+        finally:
+            db.close()
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print(f"{'query':<20} {'text':<20} {'mode':<9} {'list ms':>9} {'hits':>5} {'chat ms':>9} {'hits':>5}")
+    for label, search, mode, (list_ms, list_hits), (chat_ms, chat_hits) in results:
+        print(f"{label:<20} {search:<20} {mode:<9} {list_ms:>9.2f} {list_hits:>5} {chat_ms:>9.2f} {chat_hits:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark hot-path queries before and after the add_hot_path_indexes migration
+
+Builds the schema in a scratch Postgres schema (DATABASE_URL, nothing outside
+the scratch schema is touched), seeds a large synthetic dataset with
+generate_series, and reports EXPLAIN ANALYZE execution times of the
+detail / cart / order history / admin list / review lookups without the
+migration's indexes and constraints, then again after running the migration's
+upgrade() on the same data.
+
+Usage: python scripts/bench_hot_path_indexes.py [--products 100000] [--users 50000] [--orders 500000] [--runs 5]
+"""
+import sys
+import os
+import argparse
+import importlib.util
+import statistics
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from app.db import Base, DATABASE_URL
+from app.models.sqlalchemy import models_arr  # noqa: F401 - registers models
+
+SCHEMA = "bench_indexes"
+MIGRATION = os.path.join(
+    os.path.dirname(__file__), '..', 'alembic', 'versions', '5c1f9a7e2b3d_add_hot_path_indexes.py'
+)
+
+# Deterministic user uuids so the queries below can name a user without a lookup
+USER_UUID = "md5('user' || {})::uuid"
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("add_hot_path_indexes", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_migration(conn, step):
+    with Operations.context(MigrationContext.configure(conn)):
+        step()
+
+
+def seed(conn, products: int, users: int, orders: int):
+    print(f"Seeding {products} products, {users} users, {orders} orders...")
+    conn.execute(text(f"""
+        INSERT INTO users (uuid, email, hashed_password, salt, role, is_active, email_verified)
+        SELECT {USER_UUID.format('i')}, 'user' || i || '@example.com', 'x', 'x', 'user', true, true
+        FROM generate_series(0, :users - 1) i
+    """), {"users": users})
+    conn.execute(text("""
+        INSERT INTO products (id, slug, product_type, product_name, price, stock, created_at)
+        SELECT i, 'product-' || i, 'type-' || (i % 8), 'Product ' || i, 10 + (i % 90), 100,
+               now() - (i || ' minutes')::interval
+        FROM generate_series(1, :products) i
+    """), {"products": products})
+    conn.execute(text("""
+        INSERT INTO product_sizes (product_id, size, stock_quantity)
+        SELECT p, s, 50 FROM generate_series(1, :products) p, unnest(ARRAY['250g', '1kg', '2kg']) s
+    """), {"products": products})
+    conn.execute(text(f"""
+        INSERT INTO carts (id, user_id, created_at)
+        SELECT i + 1, {USER_UUID.format('i')}, now() FROM generate_series(0, :users - 1) i
+    """), {"users": users})
+    conn.execute(text("""
+        INSERT INTO cart_items (cart_id, product_id, product_size_id, quantity, price)
+        SELECT c, ps.product_id, ps.id, 1, 10
+        FROM generate_series(1, :users) c
+        JOIN product_sizes ps ON ps.id IN ((c * 7) % (:products * 3) + 1, (c * 13) % (:products * 3) + 1)
+    """), {"users": users, "products": products})
+    # ~2% of orders still pending - the admin list's usual filter
+    conn.execute(text(f"""
+        INSERT INTO orders (id, user_id, shipping_name, shipping_phone, shipping_email, shipping_address,
+                            subtotal, shipping_fee, total_amount, status, created_at, updated_at)
+        SELECT i, {USER_UUID.format('i % :users')}, 'Name', '0900000000', 'a@example.com', 'Address',
+               100, 0, 100,
+               CASE WHEN i % 50 = 0 THEN 'pending' WHEN i % 7 = 0 THEN 'cancelled' ELSE 'delivered' END,
+               now() - (i || ' seconds')::interval, now()
+        FROM generate_series(1, :orders) i
+    """), {"orders": orders, "users": users})
+    conn.execute(text("""
+        INSERT INTO order_items (order_id, product_id, product_name, quantity, unit_price, total_price)
+        SELECT o, (o * k) % :products + 1, 'Product', 1, 10, 10
+        FROM generate_series(1, :orders) o, generate_series(1, 3) k
+    """), {"orders": orders, "products": products})
+    # One review per (product, user): review i is user (i / products) on product (i % products)
+    conn.execute(text(f"""
+        INSERT INTO reviews (product_id, user_id, content, rating, created_at)
+        SELECT i % :products + 1, {USER_UUID.format('(i / :products) % :users')}, 'Great', 1 + i % 5,
+               now() - (i || ' seconds')::interval
+        FROM generate_series(0, :orders - 1) i
+    """), {"orders": orders, "products": products, "users": users})
+    conn.execute(text("ANALYZE"))
+
+
+def hot_queries(products: int, users: int) -> dict:
+    product_id = products // 2 + 7
+    user = USER_UUID.format(users // 3)
+    return {
+        "product by slug": f"SELECT * FROM products WHERE slug = 'product-{product_id}'",
+        "size by product+size": f"SELECT * FROM product_sizes WHERE product_id = {product_id} AND size = '1kg'",
+        "cart by user": f"SELECT * FROM carts WHERE user_id = {user}",
+        "cart line": f"SELECT * FROM cart_items WHERE cart_id = {users // 3 + 1} AND product_id = {product_id} "
+                     f"AND product_size_id = {product_id * 3}",
+        "order history": f"SELECT * FROM orders WHERE user_id = {user} ORDER BY created_at DESC LIMIT 20",
+        "admin pending orders": "SELECT * FROM orders WHERE status = 'pending' ORDER BY created_at DESC LIMIT 20",
+        "order items": f"SELECT * FROM order_items WHERE order_id = {product_id}",
+        "product reviews": f"SELECT * FROM reviews WHERE product_id = {product_id} ORDER BY created_at DESC LIMIT 20",
+    }
+
+
+def explain(conn, sql: str, runs: int):
+    """Median EXPLAIN ANALYZE execution time (ms) and the top plan node"""
+    timings = []
+    for _ in range(runs):
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")).scalar()[0]
+        timings.append(plan["Execution Time"])
+    node = plan["Plan"]
+    while node.get("Plans") and node["Node Type"] in ("Limit", "Sort", "Gather Merge", "Gather"):
+        node = node["Plans"][0]
+    return statistics.median(timings), node["Node Type"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE hot-path queries before/after the index migration")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    if not DATABASE_URL or not DATABASE_URL.startswith("postgresql"):
+        sys.exit("DATABASE_URL must point at Postgres")
+
+    engine = create_engine(DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    migration = load_migration()
+    queries = hot_queries(args.products, args.users)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    try:
+        with engine.begin() as conn:
+            # Models already declare the new indexes - drop them to get the pre-migration schema
+            Base.metadata.create_all(bind=conn)
+            run_migration(conn, migration.downgrade)
+            seed(conn, args.products, args.users, args.orders)
+
+        with engine.connect() as conn:
+            before = {name: explain(conn, sql, args.runs) for name, sql in queries.items()}
+
+        with engine.begin() as conn:
+            run_migration(conn, migration.upgrade)
+            conn.execute(text("ANALYZE"))
+
+        with engine.connect() as conn:
+            after = {name: explain(conn, sql, args.runs) for name, sql in queries.items()}
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print(f"{'query':<22} {'before ms':>10} {'after ms':>10} {'speedup':>9}  plan")
+    for name in queries:
+        (before_ms, before_plan), (after_ms, after_plan) = before[name], after[name]
+        speedup = before_ms / after_ms if after_ms else float("inf")
+        print(f"{name:<22} {before_ms:>10.3f} {after_ms:>10.3f} {speedup:>8.1f}x  {before_plan} -> {after_plan}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark deep pages: OFFSET vs keyset (cursor) pagination
+
+Seeds --products products and --orders orders into a scratch database
+(a temporary SQLite file by default, or a scratch schema of the Postgres
+DATABASE_URL with --postgres), then times Product_Service.get_products in
+each keyset sort order and OrderService.admin_get_all_orders at increasing
+page depths, once with page=N (OFFSET) and once with the cursor of page N.
+
+Usage: python scripts/bench_keyset_pagination.py [--products 200000] [--orders 200000] [--limit 20] [--postgres]
+"""
+import sys
+import os
+import time
+import uuid
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+import app.db
+from app.db import Base, DATABASE_URL
+from app.db.keyset import encode_cursor
+from app.models.sqlalchemy import Product, User, Order
+from app.services.product_service import Product_Service, PRODUCT_SORTS
+from app.services.order_service import OrderService, ADMIN_ORDERS_ORDER
+
+SCHEMA = "bench_keyset"
+DEPTHS = [1, 10, 100, 1000, 5000]
+CHUNK = 10_000
+
+
+def seed(engine, products: int, orders: int):
+    print(f"Seeding {products} products, {orders} orders...")
+    start = datetime(2024, 1, 1)
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"uuid": user_id, "email": "bench@example.com", "hashed_password": "x", "salt": "x"}])
+        for first in range(0, products, CHUNK):
+            conn.execute(insert(Product), [
+                {"slug": f"product-{i}", "product_type": "Protein", "product_name": f"Product {i}",
+                 "price": float(10 + i % 500), "stock": 10, "created_at": start + timedelta(minutes=i // 2)}
+                for i in range(first, min(first + CHUNK, products))
+            ])
+        for first in range(0, orders, CHUNK):
+            conn.execute(insert(Order), [
+                {"user_id": user_id, "shipping_name": "A", "shipping_phone": "1", "shipping_email": "a@example.com",
+                 "shipping_address": "x", "status": "delivered", "created_at": start + timedelta(minutes=i)}
+                for i in range(first, min(first + CHUNK, orders))
+            ])
+
+
+def timed(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def product_cursor(db, sort: str, position: int) -> str:
+    """Cursor pointing after the product at 0-based `position` in `sort` order"""
+    order = PRODUCT_SORTS[sort]
+    row = order.apply(db.query(Product)).offset(position).first()
+    return encode_cursor(order, None if order.key is None else getattr(row, order.key.key), row.id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OFFSET vs keyset pagination at increasing depth")
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--postgres", action="store_true", help=f"Use a {SCHEMA} schema of DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.postgres:
+        engine = create_engine(DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "keyset.db")
+        engine = create_engine(f"sqlite:///{path}")
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    # OrderService opens its own sessions through app.db
+    app.db._SessionLocal = SessionLocal
+    app.db._replica_engines = []
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        seed(engine, args.products, args.orders)
+        if args.postgres:
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE"))
+
+        limit = args.limit
+        depths = [d for d in DEPTHS if d * limit < min(args.products, args.orders)]
+        print(f"{'list':<18} {'page':>6} {'offset ms':>10} {'cursor ms':>10}")
+        with SessionLocal() as db:
+            for sort in PRODUCT_SORTS:
+                for depth in depths:
+                    cursor = product_cursor(db, sort, depth * limit - 1)
+                    offset_ms = timed(lambda: Product_Service.get_products(db, page=depth, limit=limit, sort=sort), args.runs)
+                    cursor_ms = timed(lambda: Product_Service.get_products(db, limit=limit, sort=sort, cursor=cursor), args.runs)
+                    print(f"{'products/' + sort:<18} {depth:>6} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+
+            for depth in depths:
+                row = ADMIN_ORDERS_ORDER.apply(db.query(Order)).offset(depth * limit - 1).first()
+                cursor = encode_cursor(ADMIN_ORDERS_ORDER, row.created_at, row.id)
+                offset_ms = timed(lambda: OrderService.admin_get_all_orders(page=depth + 1, size=limit), args.runs)
+                cursor_ms = timed(lambda: OrderService.admin_get_all_orders(size=limit, cursor=cursor), args.runs)
+                print(f"{'admin orders':<18} {depth:>6} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+    finally:
+        if args.postgres:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark GET /products payloads: full products vs list cards (fields=card)
+
+Seeds --products products with catalog-sized texts (description, ingredients,
+usage instructions, warnings, allergen info), two categories and three sizes
+each into a scratch database (a temporary SQLite file by default, or a scratch
+schema of the Postgres DATABASE_URL with --postgres). For each page size it
+then times Product_Service.get_products + mapping + JSON encoding, as the
+route's cache miss does, and reports the encoded bytes per page.
+
+Usage: python scripts/bench_product_projection.py [--products 2000] [--runs 20] [--postgres]
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.db import Base, DATABASE_URL
+from app.models.sqlalchemy import Product, ProductSize, Category
+from app.services.product_service import Product_Service, map_product_to_response, map_product_to_card
+
+SCHEMA = "bench_projection"
+PAGE_SIZES = [8, 20, 100]
+LOREM = "Whey protein isolate with added digestive enzymes, tested for purity and potency. "
+
+
+def seed(db, products: int):
+    print(f"Seeding {products} products...")
+    categories = [Category(name="Protein"), Category(name="Fitness")]
+    for i in range(products):
+        product = Product(
+            slug=f"product-{i}", product_type="Protein", product_name=f"Product {i}", price=10.0 + i % 50,
+            stock=10, image_url=f"https://res.cloudinary.com/demo/product-{i}.jpg", blurb=LOREM[:60],
+            description=LOREM * 25, ingredients=LOREM * 6, usage_instructions=LOREM * 4,
+            warnings=LOREM * 3, allergen_info=LOREM * 2,
+        )
+        product.categories = categories
+        product.sizes = [ProductSize(size=size, stock_quantity=5) for size in ("1kg", "2kg", "5kg")]
+        db.add(product)
+    db.commit()
+
+
+def timed_page(SessionLocal, limit: int, fields: str, runs: int):
+    """(median ms, bytes) of one page: query + map + JSON encode, in a fresh session each run"""
+    mapper = map_product_to_card if fields == "card" else map_product_to_response
+    timings, body = [], b""
+    for _ in range(runs):
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            page = [mapper(product).dict() for product in Product_Service.get_products(db, limit=limit, fields=fields)]
+        body = json.dumps(page, default=str).encode()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs card product list pages")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--postgres", action="store_true", help=f"Use a {SCHEMA} schema of DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.postgres:
+        engine = create_engine(DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"})
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    else:
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'projection.db')}")
+    SessionLocal = sessionmaker(bind=engine)
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            seed(db, args.products)
+
+        print(f"{'limit':>5} {'full ms':>8} {'card ms':>8} {'full bytes':>11} {'card bytes':>11} {'bytes saved':>11}")
+        for limit in PAGE_SIZES:
+            full_ms, full_bytes = timed_page(SessionLocal, limit, "full", args.runs)
+            card_ms, card_bytes = timed_page(SessionLocal, limit, "card", args.runs)
+            print(f"{limit:>5} {full_ms:>8.2f} {card_ms:>8.2f} {full_bytes:>11} {card_bytes:>11} "
+                  f"{1 - card_bytes / full_bytes:>11.0%}")
+    finally:
+        if args.postgres:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
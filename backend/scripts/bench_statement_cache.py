@@ -0,0 +1,112 @@
+"""
+Microbenchmark: Python-side cost of the hot lookups, rebuilt vs cached statements
+
+Seeds a tiny SQLite database (so query time is mostly Python: statement
+construction, cache key generation, compilation and ORM loading) and times
+each hot lookup three ways:
+
+  uncompiled-cache  the original db.query(...) with the compiled cache disabled
+  rebuilt           the original db.query(...) (statement rebuilt, compiled SQL cached)
+  lambda            the app.db.queries lambda statement
+
+Prints microseconds per call and the compiled cache hit rate from app.db.metrics.
+
+Usage: python scripts/bench_statement_cache.py [--calls 5000]
+"""
+import sys
+import os
+import time
+import uuid
+import argparse
+import tempfile
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.orm import sessionmaker, joinedload
+from app.db import Base, _create_pooled_engine
+from app.db.metrics import totals
+from app.db.queries import product_by_slug, user_by_uuid, cart_with_items, order_with_items
+from app.models.sqlalchemy import Product, ProductSize, User, Cart, Cart_Item, Order, OrderItem
+
+
+def seed(db):
+    user_id = uuid.uuid4()
+    db.add(User(uuid=user_id, email="bench@example.com", hashed_password="x", salt="x"))
+    product = Product(slug="whey", product_type="Protein", product_name="Whey", price=10.0)
+    product.sizes = [ProductSize(size="1kg", stock_quantity=5)]
+    db.add(product)
+    db.flush()
+    size = product.sizes[0]
+    cart = Cart(user_id=user_id)
+    cart.items = [Cart_Item(product_id=product.id, product_size_id=size.size_id, quantity=1, price=10.0)]
+    order = Order(user_id=user_id, shipping_name="A", shipping_phone="1", shipping_email="a@example.com",
+                  shipping_address="x", status="pending")
+    order.items = [OrderItem(product_id=product.id, product_name="Whey", quantity=1, unit_price=10.0, total_price=10.0)]
+    db.add_all([cart, order])
+    db.commit()
+    return user_id, order.id
+
+
+def lookups(user_id, order_id):
+    """name -> (original query, cached statement) callables taking a session"""
+    return {
+        "product by slug": (
+            lambda db: db.query(Product).filter(Product.slug == "whey").first(),
+            lambda db: db.execute(product_by_slug("whey")).scalars().first(),
+        ),
+        "user by uuid": (
+            lambda db: db.query(User).filter(User.uuid == user_id).first(),
+            lambda db: db.execute(user_by_uuid(user_id)).scalars().first(),
+        ),
+        "cart with items": (
+            lambda db: db.query(Cart).options(
+                joinedload(Cart.items).joinedload(Cart_Item.product_size).joinedload(ProductSize.product)
+            ).filter(Cart.user_id == user_id).first(),
+            lambda db: db.execute(cart_with_items(user_id)).unique().scalars().first(),
+        ),
+        "order with items": (
+            lambda db: db.query(Order).options(joinedload(Order.items)).filter(
+                Order.id == order_id, Order.user_id == user_id
+            ).first(),
+            lambda db: db.execute(order_with_items(order_id, user_id)).unique().scalars().first(),
+        ),
+    }
+
+
+def per_call_us(session_factory, fn, calls: int) -> float:
+    with session_factory() as db:
+        fn(db)  # warm up (fills the compiled / lambda caches)
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn(db)
+            db.expunge_all()  # measure loading rows, not identity map hits
+        return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-query Python overhead, rebuilt vs cached statements")
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = _create_pooled_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'statements.db')}")
+    Base.metadata.create_all(bind=engine)
+    cached = sessionmaker(bind=engine)
+    uncached = sessionmaker(bind=engine.execution_options(compiled_cache=None))
+    with cached() as db:
+        user_id, order_id = seed(db)
+
+    try:
+        print(f"{'lookup':<18} {'no cache us':>12} {'rebuilt us':>11} {'lambda us':>10} {'saved':>7}")
+        for name, (original, statement) in lookups(user_id, order_id).items():
+            no_cache = per_call_us(uncached, original, args.calls)
+            rebuilt = per_call_us(cached, original, args.calls)
+            cached_us = per_call_us(cached, statement, args.calls)
+            print(f"{name:<18} {no_cache:>12.1f} {rebuilt:>11.1f} {cached_us:>10.1f} {1 - cached_us / rebuilt:>7.0%}")
+        print(f"compiled cache: {totals()['compiled_cache']}")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
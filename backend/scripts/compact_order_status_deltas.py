@@ -0,0 +1,28 @@
+"""
+Fold the order_status_deltas rows into one row per status
+
+Every order insert, status change and delete adds a +1/-1 row (no shared
+counter row for concurrent checkouts to wait on); the admin order list sums
+them. Run this periodically (e.g. hourly from cron) so the sum stays small.
+
+Usage: python scripts/compact_order_status_deltas.py
+"""
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import session_scope
+from app.models.sqlalchemy.order import compact_order_status_deltas
+
+
+def main():
+    with session_scope() as db:
+        removed = compact_order_status_deltas(db.connection())
+        db.commit()
+        print(f"Compacted {removed} order status deltas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Bulk import products from a CSV or JSONL file (same pipeline as POST /products/import)
+
+Rows are streamed from the file, upserted on slug in batches, indexed in
+Elasticsearch in bulk chunks and the product caches are invalidated once at
+the end. Invalid rows are reported with their line number and skipped.
+
+Usage: python scripts/import_products.py catalog.csv [--format csv|jsonl] [--batch-size 1000] [--no-index]
+"""
+import sys
+import os
+import json
+import asyncio
+import argparse
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import session_scope
+from app.cache import init_redis, close_redis, invalidate_imported_products
+from app.services.product_import import import_products, detect_format, IMPORT_BATCH_SIZE, IMPORT_FORMATS
+
+
+def print_progress(report):
+    print(f"  {report.rows} rows: {report.created} created, {report.updated} updated, "
+          f"{report.failed} failed, {report.indexed} indexed", flush=True)
+
+
+async def invalidate_caches(slugs):
+    await init_redis()
+    try:
+        await invalidate_imported_products(slugs)
+    finally:
+        await close_redis()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import products from CSV / JSONL")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--no-index", action="store_true", help="Skip Elasticsearch (reindex_products.py later)")
+    parser.add_argument("--errors", help="Write the full report (with row errors) to this JSON file")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name - pass --format")
+
+    print(f"Importing {args.path} ({fmt})...")
+    with open(args.path, encoding="utf-8-sig", newline="") as stream, session_scope() as db:
+        report = import_products(
+            db, stream, fmt, batch_size=args.batch_size, index=not args.no_index, on_progress=print_progress,
+        )
+
+    asyncio.run(invalidate_caches(report.slugs))
+
+    summary = report.summary()
+    print(f"Done: {summary['created']} created, {summary['updated']} updated, {summary['failed']} failed "
+          f"({summary['superseded']} superseded by a later row of the same slug)")
+    for error in summary["errors"][:20]:
+        print(f"  row {error['row']} ({error['slug'] or '-'}): {error['error']}")
+    if args.errors:
+        with open(args.errors, "w") as out:
+            json.dump(summary, out, indent=2)
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,13 +31,13 @@ def clear_existing_products(db: Session):
     print("✓ Existing products and related data cleared")
 
 
-def create_supplement_products(db: Session):
-    """Create sample supplement products"""
+def supplement_catalog() -> list:
+    """Sample supplement products (with sizes) - shared with benchmarks"""
     
     # Calculate expiry dates (2 years from now)
     expiry_date = date.today() + timedelta(days=730)
     
-    supplements = [
+    return [
         # Vitamins & Minerals
         {
             "slug": "vitamin-d3-5000iu",
@@ -370,6 +370,12 @@ def create_supplement_products(db: Session):
             ]
         },
     ]
+
+
+def create_supplement_products(db: Session):
+    """Create sample supplement products"""
+    
+    supplements = supplement_catalog()
     
     print(f"\n📦 Creating {len(supplements)} supplement products...")
     
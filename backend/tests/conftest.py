@@ -1,11 +1,13 @@
 import pytest
+import pytest_asyncio
 import sys
 import os
 
 # Add backend directory to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from app.db import Base, get_db_session
 from app.models.sqlalchemy import Product, Category, ProductSize, User, Cart, Cart_Item, Order, OrderItem
@@ -83,4 +85,130 @@ def sample_category(db_session):
     category = Category(name="Test Category")
     db_session.add(category)
     db_session.commit()
-    return category
\ No newline at end of file
+    return category
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.asyncio.Redis used by cache tests"""
+
+    def __init__(self):
+        self.store = {}
+        self.calls = []
+        self.published = []
+
+    async def ping(self):
+        return True
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self.calls.append(("set", key))
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def setex(self, key, ttl, value):
+        self.calls.append(("setex", key))
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        self.calls.append(("delete", keys))
+        return sum(1 for k in keys if self.store.pop(k, None) is not None)
+
+    async def unlink(self, *keys):
+        self.calls.append(("unlink", keys))
+        return sum(1 for k in keys if self.store.pop(k, None) is not None)
+
+    async def exists(self, *keys):
+        return sum(1 for k in keys if k in self.store)
+
+    async def incr(self, key):
+        self.calls.append(("incr", key))
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    async def publish(self, channel, message):
+        self.calls.append(("publish", channel))
+        self.published.append((channel, message))
+        return 1
+
+    async def scan_iter(self, match=None, count=None):
+        import fnmatch
+        for key in list(self.store):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point app.cache at an in-memory FakeRedis"""
+    import app.cache
+    from app.cache.breaker import CircuitBreaker
+    client = FakeRedis()
+    monkeypatch.setattr(app.cache, "redis", client)
+    monkeypatch.setattr(app.cache, "breaker", CircuitBreaker(failure_threshold=3, base_backoff=0.01, max_backoff=0.05))
+    monkeypatch.setattr(app.cache, "_missed_invalidations", {"keys": set(), "patterns": set(), "namespaces": set()})
+    app.cache.local_cache.clear()
+    yield client
+    app.cache.local_cache.clear()
+
+
+@pytest.fixture
+def sqlite_app_db(tmp_path, monkeypatch):
+    """Factory for file SQLite databases with every table, wired in as app.db's primary
+
+    sqlite_app_db(name="app", pooled=False, primary=True, **engine_kwargs) returns a
+    sessionmaker (engine: .kw["bind"]). pooled=True builds the engine with
+    _create_pooled_engine (timed pool + statement hooks); primary=False only creates
+    the database, e.g. for a replica. Engines are disposed after the test.
+    """
+    import app.db
+    engines = []
+
+    def make(name="app", pooled=False, primary=True, **engine_kwargs):
+        url = f"sqlite:///{tmp_path / f'{name}.db'}"
+        if pooled:
+            engine = app.db._create_pooled_engine(url)
+        else:
+            engine = create_engine(url, connect_args={"check_same_thread": False}, **engine_kwargs)
+        engines.append(engine)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+        if primary:
+            monkeypatch.setattr(app.db, "_engine", engine)
+            monkeypatch.setattr(app.db, "_SessionLocal", SessionLocal)
+            monkeypatch.setattr(app.db, "_replica_engines", [])
+        return SessionLocal
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def statement_log():
+    """SQL of every statement any engine runs during the test - clear() it before measuring"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest_asyncio.fixture
+async def loop_blocks():
+    """Record event loop steps slower than 50ms (sync I/O inside async code)"""
+    from app.loop_monitor import enable_loop_block_detection, disable_loop_block_detection
+    recorder = enable_loop_block_detection(threshold=0.05)
+    yield recorder.blocks
+    disable_loop_block_detection(recorder)
+
@@ -0,0 +1,805 @@
+import json
+import time
+import asyncio
+from datetime import datetime, date
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+import app.cache
+from app.cache import (
+    cache_get, cache_set, cache_delete_pattern, cache_namespace_version,
+    cache_bump_namespace, invalidate_product_cache, products_cache_key,
+    product_slug_cache_key, cache_stats, local_cache, PRODUCTS_NAMESPACE,
+    CACHE_INVALIDATION_CHANNEL, cache_get_or_load, lock_cache_key, SWR_MARKER,
+    product_missing_cache_key, known_product_slugs,
+)
+from app.cache.local import LocalCache
+from app.cache.codec import CacheCodec, MAGIC
+from app.cache.bloom import BloomFilter, KnownKeysFilter
+from app.cache.breaker import CircuitBreaker
+from app.cache.warmup import CacheWarmer
+from app.cache.etag import etag_matches, conditional_response
+
+
+def make_request(headers=None):
+    """Bare Starlette request for calling route functions directly"""
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers, "query_string": b""})
+
+
+class TestNamespaceVersions:
+    """Test generation-counter invalidation của product list cache"""
+
+    def test_products_cache_key_includes_version(self):
+        assert products_cache_key(page=1, size=10, version=3) == "products:v3:page=1:size=10"
+        assert products_cache_key(page=1, size=10, version=3, type="Vitamins", cat=None) == \
+            "products:v3:page=1:size=10:type=vitamins"
+
+    def test_search_aggregations_key_normalizes_query(self):
+        key = app.cache.search_aggregations_cache_key("whey protein", version=3)
+        assert key == "products:v3:aggs:q=whey protein"
+        assert app.cache.search_aggregations_cache_key("  Whey \t PROTEIN ", version=3) == key
+        assert app.cache.search_aggregations_cache_key("   ", version=3) == \
+            app.cache.search_aggregations_cache_key(None, version=3)
+
+    @pytest.mark.asyncio
+    async def test_version_defaults_to_zero(self, fake_redis):
+        assert await cache_namespace_version(PRODUCTS_NAMESPACE) == 0
+
+    @pytest.mark.asyncio
+    async def test_bump_changes_list_keys(self, fake_redis):
+        old_key = products_cache_key(page=0, size=10, version=await cache_namespace_version(PRODUCTS_NAMESPACE))
+        await cache_set(old_key, [{"id": 1}])
+
+        assert await cache_bump_namespace(PRODUCTS_NAMESPACE) == 1
+
+        new_key = products_cache_key(page=0, size=10, version=await cache_namespace_version(PRODUCTS_NAMESPACE))
+        assert new_key != old_key
+        assert await cache_get(new_key) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_does_not_scan_keyspace(self, fake_redis):
+        for page in range(50):
+            await cache_set(products_cache_key(page=page, size=10), [])
+        await cache_set(product_slug_cache_key("whey"), {"id": 1})
+        fake_redis.calls.clear()
+
+        await invalidate_product_cache(slug="whey")
+
+        ops = [op for op, _ in fake_redis.calls]
+        assert ops == ["delete", "publish", "delete", "publish", "incr"]
+        assert await cache_get(product_slug_cache_key("whey")) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_pattern_unlinks_matching_keys(self, fake_redis):
+        for page in range(5):
+            await cache_set(f"tmp:{page}", page)
+        await cache_set("other", 1)
+
+        assert await cache_delete_pattern("tmp:*", batch_size=2) is True
+        assert list(fake_redis.store) == ["other"]
+
+
+class TestLocalCache:
+    """Test in-process LRU tier"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire(self, monkeypatch):
+        import app.cache.local as local_module
+        now = [1000.0]
+        monkeypatch.setattr(local_module.time, "monotonic", lambda: now[0])
+        cache = LocalCache(maxsize=10, ttl=30)
+        cache.set("a", 1, ttl=300)  # capped at the tier TTL
+
+        now[0] += 29
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+
+    def test_delete_matching(self):
+        cache = LocalCache(maxsize=10)
+        cache.set("products:v1:page=0", [])
+        cache.set("product:slug:whey", {})
+        cache.delete_matching("products:*")
+
+        assert len(cache) == 1
+
+
+class TestTwoTierCache:
+    """Test local tier in front of Redis"""
+
+    @pytest.mark.asyncio
+    async def test_local_hit_skips_network(self, fake_redis):
+        await cache_set("product:slug:whey", {"id": 1})
+        fake_redis.calls.clear()
+
+        assert await cache_get("product:slug:whey") == {"id": 1}
+        assert fake_redis.calls == []
+        assert cache_stats()["local"]["hits"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_populates_local_tier(self, fake_redis):
+        fake_redis.store["product:slug:whey"] = json.dumps({"id": 1})
+
+        assert await cache_get("product:slug:whey") == {"id": 1}
+        fake_redis.calls.clear()
+        assert await cache_get("product:slug:whey") == {"id": 1}
+        assert fake_redis.calls == []
+
+    @pytest.mark.asyncio
+    async def test_invalidation_is_published(self, fake_redis):
+        await cache_set("product:slug:whey", {"id": 1})
+        await invalidate_product_cache(slug="whey")
+
+        assert local_cache.get("product:slug:whey") is None
+        channel, message = fake_redis.published[0]
+        assert channel == CACHE_INVALIDATION_CHANNEL
+        assert json.loads(message) == ["product:slug:whey"]
+
+    def test_invalidation_message_drops_local_keys(self):
+        local_cache.set("product:slug:whey", {"id": 1})
+        local_cache.set("products:v0:page=0:size=10", [])
+
+        app.cache._apply_invalidation(json.dumps(["product:slug:whey", "products:*"]))
+
+        assert len(local_cache) == 0
+
+
+class TestCircuitBreaker:
+    """Test Redis circuit breaker"""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        assert breaker.record_failure() is False
+        assert breaker.record_failure() is False
+        assert breaker.record_failure() is True
+        assert breaker.allow_request() is False
+        assert breaker.stats()["transitions"] == {"opened": 1, "closed": 0}
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.allow_request() is True
+
+    def test_failed_probes_back_off_exponentially(self):
+        breaker = CircuitBreaker(failure_threshold=1, base_backoff=1, max_backoff=5)
+        breaker.trip()
+        delays = []
+        for _ in range(4):
+            delays.append(breaker.retry_in())
+            breaker.record_probe(False)
+        assert delays == [1, 2, 4, 5]
+
+        breaker.record_probe(True)
+        assert breaker.allow_request() is True
+        assert breaker.retry_in() == 1
+        assert breaker.stats()["probes"] == {"ok": 1, "failed": 4}
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_redis_and_recovers(self, fake_redis):
+        async def down(*args, **kwargs):
+            fake_redis.calls.append(("get", args))
+            raise ConnectionError("redis down")
+
+        async def ping_down():
+            raise ConnectionError("redis down")
+
+        fake_redis.get = down
+        fake_redis.ping = ping_down
+        for _ in range(3):
+            assert await cache_get("product:slug:whey") is None
+        assert app.cache.breaker.state == "open"
+
+        # Open: no network call at all
+        fake_redis.calls.clear()
+        assert await cache_get("product:slug:whey") is None
+        assert await cache_set("product:slug:whey", {"id": 1}) is False
+        assert fake_redis.calls == []
+        assert cache_stats()["redis"]["available"] is False
+
+        # Redis comes back - the background probe closes the breaker
+        del fake_redis.get
+        del fake_redis.ping
+        for _ in range(50):
+            if app.cache.breaker.allow_request():
+                break
+            await asyncio.sleep(0.01)
+        assert app.cache.breaker.allow_request() is True
+        assert await cache_set("product:slug:whey", {"id": 1}) is True
+        assert await cache_get("product:slug:whey") == {"id": 1}
+        assert cache_stats()["breaker"]["transitions"] == {"opened": 1, "closed": 1}
+        await app.cache.close_redis()
+
+    @pytest.mark.asyncio
+    async def test_invalidations_while_open_are_replayed(self, fake_redis):
+        async def ping_down():
+            raise ConnectionError("redis down")
+
+        version = await cache_namespace_version(PRODUCTS_NAMESPACE)
+        await cache_set("product:slug:whey", {"id": 1})
+        fake_redis.ping = ping_down
+        app.cache.breaker.trip()
+        app.cache._start_probe()
+
+        # Admin edits whey while Redis is unreachable
+        with patch.object(app.cache.cache_warmer, "schedule"):
+            await invalidate_product_cache(slug="whey")
+        assert "product:slug:whey" in fake_redis.store
+
+        del fake_redis.ping
+        for _ in range(50):
+            if app.cache.breaker.allow_request() and "product:slug:whey" not in fake_redis.store:
+                break
+            await asyncio.sleep(0.01)
+        assert await cache_get("product:slug:whey") is None
+        assert await cache_namespace_version(PRODUCTS_NAMESPACE) > version
+        await app.cache.close_redis()
+
+
+class TestSingleFlight:
+    """Test stampede protection trên cache miss"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_misses_run_one_loader(self, fake_redis):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"id": 1}
+
+        results = await asyncio.gather(*[cache_get_or_load("product:slug:whey", loader) for _ in range(20)])
+
+        assert len(calls) == 1
+        assert all(r == {"id": 1} for r in results)
+        assert lock_cache_key("product:slug:whey") not in fake_redis.store
+
+    @pytest.mark.asyncio
+    async def test_parallel_read_product_queries_db_once(self, fake_redis):
+        from app.routers import product_router
+
+        def fake_get_product(db, slug):
+            return MagicMock(slug=slug)
+
+        mapped = MagicMock()
+        mapped.dict.return_value = {"id": 1, "slug": "whey"}
+
+        with patch.object(product_router.Product_Service, "get_product", side_effect=fake_get_product) as get_product, \
+             patch.object(product_router, "map_product_to_response", return_value=mapped):
+            results = await asyncio.gather(*[
+                product_router.read_product("whey", make_request(), Response()) for _ in range(20)
+            ])
+
+        assert get_product.call_count == 1
+        assert all(r == {"id": 1, "slug": "whey"} for r in results)
+
+    @pytest.mark.asyncio
+    async def test_follower_waits_for_other_worker(self, fake_redis, monkeypatch):
+        monkeypatch.setattr(app.cache, "CACHE_LOCK_POLL_INTERVAL", 0.01)
+        fake_redis.store[lock_cache_key("product:slug:whey")] = "other-worker"
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"id": 2}
+
+        async def other_worker_fills_key():
+            await asyncio.sleep(0.05)
+            fake_redis.store["product:slug:whey"] = json.dumps({"id": 1})
+
+        result, _ = await asyncio.gather(cache_get_or_load("product:slug:whey", loader), other_worker_fills_key())
+
+        assert result == {"id": 1}
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_loader_error_reaches_every_waiter(self, fake_redis):
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise HTTPException(status_code=404)
+
+        results = await asyncio.gather(
+            *[cache_get_or_load("product:slug:missing", loader) for _ in range(5)],
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, HTTPException) for r in results)
+        assert lock_cache_key("product:slug:missing") not in fake_redis.store
+
+
+class TestStaleWhileRevalidate:
+    """Test SWR: stale entries served ngay, refresh chạy nền"""
+
+    def _store_stale(self, fake_redis, key, value):
+        fake_redis.store[key] = json.dumps({SWR_MARKER: time.time() - 1, "value": value})
+
+    @pytest.mark.asyncio
+    async def test_set_with_stale_ttl_wraps_payload(self, fake_redis):
+        await cache_set("product:slug:whey", {"id": 1}, ttl=300, stale_ttl=600)
+
+        stored = app.cache.codec.decode(fake_redis.store["product:slug:whey"])
+        assert stored["value"] == {"id": 1}
+        assert stored[SWR_MARKER] > time.time()
+        assert await cache_get("product:slug:whey") == {"id": 1}
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_and_refreshed_once(self, fake_redis):
+        self._store_stale(fake_redis, "product:slug:whey", {"id": 1, "v": "old"})
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return {"id": 1, "v": "new"}
+
+        results = await asyncio.gather(*[
+            cache_get_or_load("product:slug:whey", loader, ttl=300, stale_ttl=600) for _ in range(10)
+        ])
+        assert all(r["v"] == "old" for r in results)
+
+        await asyncio.gather(*app.cache._background_tasks)
+        assert len(calls) == 1
+        assert await cache_get("product:slug:whey", allow_stale=False) == {"id": 1, "v": "new"}
+
+    @pytest.mark.parametrize("contended", [False, True])
+    @pytest.mark.asyncio
+    async def test_stale_local_entry_recovers_from_fresh_redis(self, fake_redis, contended):
+        # This worker's local copy went stale; another worker already refreshed Redis
+        key = "product:slug:whey"
+        local_cache.set(key, {SWR_MARKER: time.time() - 1, "value": {"v": 0}})
+        fake_redis.store[key] = app.cache.codec.encode({SWR_MARKER: time.time() + 300, "value": {"v": 99}})
+        if contended:
+            fake_redis.store[lock_cache_key(key)] = "other-worker"
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"v": 1}
+
+        assert await cache_get_or_load(key, loader, ttl=300, stale_ttl=600) == {"v": 0}
+        await asyncio.gather(*app.cache._background_tasks)
+
+        fake_redis.calls.clear()
+        results = [await cache_get_or_load(key, loader, ttl=300, stale_ttl=600) for _ in range(5)]
+        assert results == [{"v": 99}] * 5
+        assert not calls
+        assert fake_redis.calls == []  # served from the local tier, no further refresh
+
+    @pytest.mark.asyncio
+    async def test_allow_stale_false_treats_stale_as_miss(self, fake_redis):
+        self._store_stale(fake_redis, "product:slug:whey", {"id": 1})
+
+        assert await cache_get("product:slug:whey", allow_stale=False) is None
+        assert await cache_get("product:slug:whey") == {"id": 1}
+
+
+class TestCacheCodec:
+    """Test pluggable codec + compression cho cached payloads"""
+
+    PAYLOAD = {
+        "id": 1,
+        "slug": "vitamin-d3-5000iu",
+        "description": "Premium Vitamin D3 supplement. " * 100,
+        "created_at": datetime(2025, 1, 2, 3, 4, 5),
+        "expiry_date": date(2027, 1, 1),
+        "sizes": [{"size": "60 softgels", "stock_quantity": 10}],
+    }
+
+    @pytest.mark.parametrize("name,module", [("json", None), ("orjson", "orjson"), ("msgpack", "msgpack")])
+    def test_roundtrip(self, name, module):
+        if module:
+            pytest.importorskip(module)
+        codec = CacheCodec(codec=name)
+        decoded = codec.decode(codec.encode(self.PAYLOAD))
+
+        assert decoded["description"] == self.PAYLOAD["description"]
+        assert decoded["created_at"] == "2025-01-02T03:04:05"
+        assert decoded["expiry_date"] == "2027-01-01"
+
+    @pytest.mark.parametrize("compression,module", [("zstd", "zstandard"), ("lz4", "lz4")])
+    def test_compression_above_threshold(self, compression, module):
+        pytest.importorskip(module)
+        codec = CacheCodec(codec="json", compression=compression, compression_threshold=512)
+        plain = CacheCodec(codec="json")
+
+        big = codec.encode(self.PAYLOAD)
+        small = codec.encode({"id": 1})
+
+        assert len(big) < len(plain.encode(self.PAYLOAD))
+        assert small == plain.encode({"id": 1})
+        assert codec.decode(big)["slug"] == self.PAYLOAD["slug"]
+
+    def test_reads_legacy_json_entries(self):
+        codec = CacheCodec(codec="json", compression="zstd")
+
+        assert codec.decode(json.dumps({"id": 1})) == {"id": 1}
+        assert codec.decode(b'[{"id": 1}]') == [{"id": 1}]
+
+    def test_header(self):
+        encoded = CacheCodec(codec="json").encode({"id": 1})
+        assert encoded[0] == MAGIC
+
+    def test_any_codec_reads_other_codecs(self):
+        pytest.importorskip("msgpack")
+        written = CacheCodec(codec="msgpack").encode({"id": 1})
+
+        assert CacheCodec(codec="json").decode(written) == {"id": 1}
+
+    def test_unknown_codec_falls_back_to_json(self):
+        codec = CacheCodec(codec="pickle", compression="brotli")
+        assert codec.decode(codec.encode({"id": 1})) == {"id": 1}
+
+
+class TestProductListCache:
+    """Test product list cache: canonical keys + mapped dict entries"""
+
+    def test_equivalent_params_share_key(self):
+        from app.routers.product_router import build_products_cache_key
+
+        a = build_products_cache_key(0, 0, 10, product_type=" Vitamins ", min_price=10.0, search="Whey")
+        b = build_products_cache_key(0, 0, 10, product_type="vitamins", min_price=10, search="whey", on_sale=False)
+
+        assert a == b == "products:v0:page=0:size=10:min=10:search=whey:type=vitamins"
+
+    def test_blank_filters_are_omitted(self):
+        assert products_cache_key(page=0, size=10, search="  ", cat="") == "products:v0:page=0:size=10"
+
+    @pytest.mark.asyncio
+    async def test_read_products_caches_mapped_dicts(self, fake_redis):
+        from app.routers import product_router
+
+        mapped = MagicMock()
+        mapped.dict.return_value = {"id": 1, "slug": "whey"}
+        app.cache._metric_stats.clear()
+
+        with patch.object(product_router.Product_Service, "get_products", return_value=[MagicMock()]) as get_products, \
+             patch.object(product_router, "map_product_to_response", return_value=mapped):
+            first = await product_router.read_products(
+                make_request(), Response(), page=0, limit=10, category=None, product_type="Vitamins ", min_price=None, max_price=None,
+                search=None, manufacturer=None, certification=None, on_sale=None, sort=None, cursor=None, fields="full",
+            )
+            second = await product_router.read_products(
+                make_request(), Response(), page=0, limit=10, category="", product_type="vitamins", min_price=0.0, max_price=None,
+                search=None, manufacturer=None, certification=None, on_sale=False, sort=None, cursor=None, fields="full",
+            )
+
+        assert first == second == [{"id": 1, "slug": "whey"}]
+        assert get_products.call_count == 1
+        assert get_products.call_args.kwargs["product_type"] == "Vitamins"
+        assert cache_stats()["caches"]["products_list"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+class TestNegativeCache:
+    """Test negative caching + Bloom filter cho slug không tồn tại"""
+
+    def test_bloom_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        slugs = [f"product-{i}" for i in range(1000)]
+        for slug in slugs:
+            bloom.add(slug)
+
+        assert all(slug in bloom for slug in slugs)
+        false_positives = sum(f"missing-{i}" in bloom for i in range(1000))
+        assert false_positives < 50
+
+    def test_filter_allows_everything_until_built(self):
+        slugs = KnownKeysFilter(enabled=True)
+        assert slugs.might_contain("anything")
+
+        slugs.rebuild(["whey"])
+        assert slugs.might_contain("whey")
+        assert not slugs.might_contain("anything")
+
+        slugs.add("anything")
+        assert slugs.might_contain("anything")
+
+    @pytest.mark.asyncio
+    async def test_missing_slug_is_negative_cached(self, fake_redis):
+        from app.routers import product_router
+
+        with patch.object(product_router.Product_Service, "get_product",
+                          side_effect=HTTPException(status_code=404)) as get_product:
+            for _ in range(3):
+                with pytest.raises(HTTPException) as exc:
+                    await product_router.read_product("no-such-slug", make_request(), Response())
+                assert exc.value.status_code == 404
+
+        assert get_product.call_count == 1
+        assert await cache_get(product_missing_cache_key("no-such-slug")) is True
+
+    @pytest.mark.asyncio
+    async def test_negative_entry_checked_before_detail_lock(self, fake_redis):
+        from app.routers import product_router
+
+        await cache_set(product_missing_cache_key("no-such-slug"), True)
+        app.cache.local_cache.clear()
+        fake_redis.calls.clear()
+        with pytest.raises(HTTPException) as exc:
+            await product_router.read_product("no-such-slug", make_request(), Response())
+        assert exc.value.status_code == 404
+        assert fake_redis.calls == [("get", product_missing_cache_key("no-such-slug"))]
+
+    @pytest.mark.asyncio
+    async def test_db_errors_are_not_negative_cached(self, fake_redis):
+        from app.routers import product_router
+
+        with patch.object(product_router.Product_Service, "get_product",
+                          side_effect=HTTPException(status_code=500)):
+            with pytest.raises(HTTPException):
+                await product_router.read_product("whey", make_request(), Response())
+
+        assert await cache_get(product_missing_cache_key("whey")) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_clears_negative_entry(self, fake_redis):
+        await cache_set(product_missing_cache_key("new-whey"), True)
+
+        await invalidate_product_cache(slug="new-whey")
+
+        assert await cache_get(product_missing_cache_key("new-whey")) is None
+        assert json.loads(fake_redis.published[-1][1]) == [product_missing_cache_key("new-whey")]
+
+    @pytest.mark.asyncio
+    async def test_bloom_rejects_without_network(self, fake_redis, monkeypatch):
+        from app.routers import product_router
+        slugs = KnownKeysFilter(enabled=True)
+        slugs.rebuild(["whey"])
+        monkeypatch.setattr(product_router, "known_product_slugs", slugs)
+
+        with pytest.raises(HTTPException) as exc:
+            await product_router.read_product("no-such-slug", make_request(), Response())
+
+        assert exc.value.status_code == 404
+        assert fake_redis.calls == []
+
+    def test_invalidation_message_marks_slug_known(self, monkeypatch):
+        slugs = KnownKeysFilter(enabled=True)
+        slugs.rebuild([])
+        monkeypatch.setattr(app.cache, "known_product_slugs", slugs)
+
+        app.cache._apply_invalidation(json.dumps([product_missing_cache_key("new-whey")]))
+
+        assert slugs.might_contain("new-whey")
+
+
+class TestConditionalGet:
+    """Test ETag / If-None-Match cho catalog endpoints"""
+
+    def test_etag_matches(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('"x", W/"abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+    def test_conditional_response_sets_headers(self):
+        response = Response()
+        assert conditional_response(make_request(), response, "abc") is None
+        assert response.headers["etag"] == '"abc"'
+        assert "max-age" in response.headers["cache-control"]
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_returns_304_from_stored_etag(self, fake_redis):
+        from app.routers import product_router
+
+        mapped = MagicMock()
+        mapped.dict.return_value = {"id": 1, "slug": "whey"}
+        with patch.object(product_router.Product_Service, "get_product", return_value=MagicMock()), \
+             patch.object(product_router, "map_product_to_response", return_value=mapped):
+            response = Response()
+            body = await product_router.read_product("whey", make_request(), response)
+        etag = response.headers["etag"]
+        assert body == {"id": 1, "slug": "whey"}
+
+        with patch.object(app.cache, "fingerprint", side_effect=AssertionError("re-encoded on hit")):
+            not_modified = await product_router.read_product(
+                "whey", make_request({"If-None-Match": etag}), Response()
+            )
+
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+        assert not_modified.headers["etag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_etag_changes_with_payload(self, fake_redis):
+        async def loader_a():
+            return {"price": 10}
+
+        async def loader_b():
+            return {"price": 12}
+
+        a = await app.cache.cache_get_or_load_entry("k:a", loader_a, etag=True)
+        b = await app.cache.cache_get_or_load_entry("k:b", loader_b, etag=True)
+        again = await app.cache.cache_get_or_load_entry("k:a", loader_b, etag=True)
+
+        assert a.etag != b.etag
+        assert again.etag == a.etag
+
+
+def job_source(*jobs):
+    """Warm-up job source returning fixed jobs"""
+    async def source():
+        return list(jobs)
+    return source
+
+
+class TestCacheWarmup:
+    """Test cache warm-up on startup and after invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_with_bounded_concurrency(self):
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        warmer = CacheWarmer(concurrency=2, timeout=5)
+        warmer.register(job_source(*[job] * 6))
+        summary = await warmer.run()
+
+        assert summary["ok"] == 6
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_job_does_not_stop_warmup(self):
+        async def boom():
+            raise HTTPException(status_code=404)
+
+        async def ok():
+            return 1
+
+        warmer = CacheWarmer(concurrency=1, timeout=5)
+        warmer.register(job_source(boom, ok))
+        summary = await warmer.run()
+
+        assert summary["ok"] == 1
+        assert summary["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_ready_after_timeout(self):
+        async def slow():
+            await asyncio.sleep(10)
+
+        warmer = CacheWarmer(timeout=0.05)
+        warmer.register(job_source(slow))
+        warmer.start()
+        assert warmer.ready is False
+
+        await asyncio.sleep(0.2)
+        assert warmer.ready is True
+        assert warmer.stats()["last_run"]["timed_out"] is True
+
+    @pytest.mark.asyncio
+    async def test_invalidation_bursts_share_one_rewarm(self):
+        calls = 0
+
+        async def job():
+            nonlocal calls
+            calls += 1
+
+        warmer = CacheWarmer(debounce=0.05)
+        warmer.register(job_source(job))
+        for _ in range(5):
+            warmer.schedule()
+        await asyncio.sleep(0.2)
+
+        assert calls == 1
+        assert warmer.coalesced == 4
+
+    @pytest.mark.asyncio
+    async def test_catalog_jobs_fill_request_keys(self, fake_redis):
+        from app.routers import product_router
+
+        mapped = MagicMock()
+        mapped.dict.return_value = {"id": 1, "slug": "whey"}
+
+        with patch.object(product_router.Product_Service, "get_product_types", return_value=["Vitamins & Minerals"]), \
+             patch.object(product_router.Product_Service, "get_top_product_slugs", return_value=["whey"]), \
+             patch.object(product_router.Product_Service, "get_products", return_value=[MagicMock()]), \
+             patch.object(product_router.Product_Service, "get_product", return_value=MagicMock()) as get_product, \
+             patch.object(product_router, "map_product_to_response", return_value=mapped), \
+             patch.object(product_router, "map_product_to_card", return_value=mapped), \
+             patch.object(product_router, "WARMUP_PAGES", 1), \
+             patch.object(product_router, "WARMUP_PAGE_SIZES", [20]):
+            jobs = await product_router.catalog_warmup_jobs()
+            for job in jobs:
+                await job()
+
+            assert len(jobs) == 3
+            assert "products:v0:page=0:size=20:fields=card" in fake_redis.store
+            assert "products:v0:page=0:size=20:fields=card:type=vitamins & minerals" in fake_redis.store
+            assert product_slug_cache_key("whey") in fake_redis.store
+
+            # A visitor's request is now a cache hit
+            await product_router.read_product("whey", make_request(), Response())
+            assert get_product.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_rewarm_reuses_top_products(self, fake_redis):
+        from app.routers import product_router
+
+        with patch.object(product_router.Product_Service, "get_product_types", return_value=[]), \
+             patch.object(product_router.Product_Service, "get_top_product_slugs", return_value=["whey"]) as top, \
+             patch.object(app.cache.cache_warmer, "schedule"):
+            for _ in range(3):
+                jobs = await product_router.catalog_warmup_jobs()
+                await invalidate_product_cache(slug="whey")
+                app.cache.local_cache.clear()
+
+        assert top.call_count == 1
+        assert len(jobs) == len(product_router.WARMUP_PAGE_SIZES) * product_router.WARMUP_PAGES + 1
+
+
+class TestNonBlockingRoutes:
+    """Test that product routes keep DB work off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_detector_catches_blocking_call(self, loop_blocks):
+        async def blocking():
+            time.sleep(0.1)
+
+        await asyncio.ensure_future(blocking())
+        assert loop_blocks
+
+    @pytest.mark.asyncio
+    async def test_read_product_does_not_block_loop(self, fake_redis, loop_blocks):
+        from app.routers import product_router
+
+        def slow_query(db, slug):
+            time.sleep(0.2)  # a slow Postgres round trip
+            return MagicMock()
+
+        mapped = MagicMock()
+        mapped.dict.return_value = {"id": 1, "slug": "whey"}
+        await cache_set(product_slug_cache_key("cached"), {"id": 2, "slug": "cached"})
+
+        with patch.object(product_router.Product_Service, "get_product", side_effect=slow_query), \
+             patch.object(product_router, "map_product_to_response", return_value=mapped):
+            slow = asyncio.ensure_future(product_router.read_product("whey", make_request(), Response()))
+            await asyncio.sleep(0.01)
+            # A cache hit is served while the DB query is still running
+            started = time.perf_counter()
+            assert await product_router.read_product("cached", make_request(), Response()) == {"id": 2, "slug": "cached"}
+            assert time.perf_counter() - started < 0.1
+            assert not slow.done()
+            assert await slow == {"id": 1, "slug": "whey"}
+
+        assert loop_blocks == []
+
+    @pytest.mark.asyncio
+    async def test_read_products_does_not_block_loop(self, fake_redis, loop_blocks):
+        from app.routers import product_router
+
+        def slow_products(db, **filters):
+            time.sleep(0.2)
+            return []
+
+        with patch.object(product_router.Product_Service, "get_products", side_effect=slow_products):
+            result = await product_router.read_products(
+                make_request(), Response(), page=0, limit=10, category=None, product_type=None, min_price=None,
+                max_price=None, search=None, manufacturer=None, certification=None, on_sale=None,
+                sort=None, cursor=None, fields="full",
+            )
+
+        assert result == []
+        assert loop_blocks == []
+
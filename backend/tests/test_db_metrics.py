@@ -0,0 +1,149 @@
+import logging
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import app.db
+import app.db.metrics
+from app.db import session_scope, get_read_db, db_stats
+from app.db.metrics import normalize_sql, begin_request_stats, pool_stats, RequestDbStats
+from app.db.middleware import DbMetricsMiddleware
+from app.models.sqlalchemy import Product, ProductSize
+from app.services.product_service import Product_Service, map_product_to_response
+
+PRODUCTS = 5
+
+
+@pytest.fixture
+def instrumented(sqlite_app_db, monkeypatch):
+    """app.db on an engine built by _create_pooled_engine (timed pool + statement hooks)"""
+    SessionLocal = sqlite_app_db("metrics", pooled=True)
+    with SessionLocal() as db:
+        for i in range(PRODUCTS):
+            product = Product(slug=f"p{i}", product_type="Protein", product_name=f"P{i}", price=10.0)
+            product.sizes = [ProductSize(size="1kg", stock_quantity=5)]
+            db.add(product)
+        db.commit()
+    monkeypatch.setattr(app.db.metrics, "_request_stats", app.db.metrics.contextvars.ContextVar("test_stats", default=None))
+    return SessionLocal.kw["bind"]
+
+
+def list_and_map(db):
+    """Map products loaded without loader options - categories and sizes lazy-load per product"""
+    products = db.query(Product).order_by(Product.id).limit(PRODUCTS).all()
+    return [map_product_to_response(product) for product in products]
+
+
+class TestNormalizeSql:
+    """Test statements with different literals normalize to one shape"""
+
+    def test_literals_and_params_replaced(self):
+        assert normalize_sql("SELECT * FROM products WHERE slug = 'whey'  AND price > 10.5") == \
+            "SELECT * FROM products WHERE slug = ? AND price > ?"
+        assert normalize_sql("SELECT * FROM products WHERE id = %(id_1)s LIMIT %(param_1)s") == \
+            "SELECT * FROM products WHERE id = ? LIMIT ?"
+
+    def test_in_lists_collapsed(self):
+        assert normalize_sql("SELECT * FROM products WHERE id IN (?, ?, ?)") == \
+            normalize_sql("SELECT * FROM products WHERE id IN (%(id_1)s)") == \
+            "SELECT * FROM products WHERE id IN (?)"
+
+
+class TestRequestDbStats:
+    """Test per-request statement stats recorded by the engine hooks"""
+
+    def test_counts_statements_and_slowest(self, instrumented):
+        stats = begin_request_stats()
+        with session_scope() as db:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+
+        summary = stats.summary()
+        assert summary["statements"] == 2
+        assert summary["slowest_sql"] == "SELECT ?"
+        assert summary["most_repeated_count"] == 2
+        assert stats.db_time >= stats.slowest_time > 0
+        assert stats.pool_wait > 0
+
+    def test_lazy_relationships_show_up_as_n_plus_one(self, instrumented):
+        stats = begin_request_stats()
+        with session_scope() as db:
+            assert len(list_and_map(db)) == PRODUCTS
+
+        # 1 list query + categories and sizes lazy-loaded per product
+        assert stats.statements == 1 + 2 * PRODUCTS
+        assert stats.most_repeated()[1] == PRODUCTS
+
+    @pytest.mark.asyncio
+    async def test_statements_in_executor_count_against_request(self, instrumented):
+        stats = begin_request_stats()
+        await app.db.run_in_read_session(Product_Service.get_product, "p0")
+        assert stats.statements >= 1
+
+    def test_no_request_no_stats(self, instrumented):
+        with session_scope() as db:
+            db.execute(text("SELECT 1"))
+        assert app.db.metrics.current_request_stats() is None
+
+    def test_slow_statements_logged(self, instrumented, monkeypatch, caplog):
+        monkeypatch.setattr(app.db.metrics, "SLOW_QUERY_MS", 0)
+        with caplog.at_level(logging.WARNING, logger="app.db.metrics"):
+            with session_scope() as db:
+                db.execute(text("SELECT * FROM products WHERE slug = 'p1'"))
+        assert "SELECT * FROM products WHERE slug = ?" in caplog.text
+
+    def test_failed_statement_keeps_timing_balanced(self, instrumented):
+        stats = begin_request_stats()
+        with session_scope() as db:
+            with pytest.raises(Exception):
+                db.execute(text("SELECT * FROM missing_table"))
+            db.rollback()
+            db.execute(text("SELECT 1"))
+        assert stats.statements == 1
+
+
+class TestPoolGauges:
+    """Test pool size / checked-out / overflow gauges"""
+
+    def test_checked_out_follows_sessions(self, instrumented):
+        with session_scope() as db:
+            db.execute(text("SELECT 1"))
+            gauges = pool_stats(instrumented)
+            assert gauges["size"] == 10
+            assert gauges["checked_out"] == 1
+        assert pool_stats(instrumented)["checked_out"] == 0
+
+    def test_db_stats_reports_primary_and_replicas(self, instrumented):
+        stats = db_stats()
+        assert stats["pools"]["primary"]["size"] == 10
+        assert stats["pools"]["replicas"] == []
+        assert stats["queries"]["statements"] > 0
+
+
+class TestDbMetricsMiddleware:
+    """Test the middleware warns about requests with many statements"""
+
+    def make_api(self):
+        api = FastAPI()
+        api.add_middleware(DbMetricsMiddleware)
+
+        @api.get("/products")
+        def products(db: Session = Depends(get_read_db)):
+            return [product.slug for product in list_and_map(db)]
+
+        return api
+
+    def test_many_statements_logged_with_repeated_query(self, instrumented, monkeypatch, caplog):
+        monkeypatch.setattr("app.db.middleware.REQUEST_QUERY_WARN", PRODUCTS)
+        with caplog.at_level(logging.WARNING, logger="app.db.middleware"):
+            with TestClient(self.make_api()) as client:
+                assert len(client.get("/products").json()) == PRODUCTS
+        assert f"GET /products ran {1 + 2 * PRODUCTS} statements" in caplog.text
+        assert f"{PRODUCTS}x SELECT" in caplog.text
+
+    def test_server_timing_header(self, instrumented, monkeypatch):
+        monkeypatch.setattr("app.db.middleware.SERVER_TIMING", True)
+        with TestClient(self.make_api()) as client:
+            response = client.get("/products")
+        assert f'desc="{1 + 2 * PRODUCTS} queries"' in response.headers["Server-Timing"]
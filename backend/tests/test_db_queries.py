@@ -0,0 +1,71 @@
+import uuid
+import pytest
+from app.db.metrics import totals
+from app.db.queries import product_by_slug, user_by_uuid, cart_with_items, order_with_items
+from app.models.sqlalchemy import Product, ProductSize, User, Cart, Cart_Item, Order, OrderItem
+
+
+@pytest.fixture
+def hot_db(sqlite_app_db):
+    """Two users, a cart with one item and an order each, on an instrumented SQLite engine"""
+    SessionLocal = sqlite_app_db("queries", pooled=True)
+    buyer, other = uuid.uuid4(), uuid.uuid4()
+    with SessionLocal() as db:
+        for user_id, email in ((buyer, "buyer@example.com"), (other, "other@example.com")):
+            db.add(User(uuid=user_id, email=email, hashed_password="x", salt="x"))
+        for slug in ("whey", "creatine"):
+            product = Product(slug=slug, product_type="Protein", product_name=slug.title(), price=10.0)
+            product.sizes = [ProductSize(size="1kg", stock_quantity=5)]
+            db.add(product)
+        db.flush()
+        size = db.query(ProductSize).first()
+        cart = Cart(user_id=buyer)
+        cart.items = [Cart_Item(product_id=size.product_id, product_size_id=size.size_id, quantity=2, price=10.0)]
+        db.add(cart)
+        for user_id in (buyer, other):
+            order = Order(user_id=user_id, shipping_name="A", shipping_phone="1",
+                          shipping_email="a@example.com", shipping_address="x", status="pending")
+            order.items = [OrderItem(product_name="Whey", quantity=1, unit_price=1.0, total_price=1.0)]
+            db.add(order)
+        db.commit()
+    return {"session": SessionLocal, "buyer": buyer, "other": other}
+
+
+class TestCachedStatements:
+    """Test closure values become parameters of the cached statements"""
+
+    def test_product_by_slug(self, hot_db):
+        with hot_db["session"]() as db:
+            assert db.execute(product_by_slug("whey")).scalars().first().slug == "whey"
+            assert db.execute(product_by_slug("creatine")).scalars().first().slug == "creatine"
+            assert db.execute(product_by_slug("missing")).scalars().first() is None
+
+    def test_user_by_uuid(self, hot_db):
+        with hot_db["session"]() as db:
+            assert db.execute(user_by_uuid(hot_db["other"])).scalars().first().email == "other@example.com"
+
+    def test_order_with_items_scoped_to_user(self, hot_db):
+        with hot_db["session"]() as db:
+            other_order = db.query(Order).filter(Order.user_id == hot_db["other"]).one()
+            assert db.execute(order_with_items(other_order.id, hot_db["buyer"])).unique().scalars().first() is None
+            owned = db.execute(order_with_items(other_order.id, hot_db["other"])).unique().scalars().first()
+            admin = db.execute(order_with_items(other_order.id)).unique().scalars().first()
+            assert owned.id == admin.id == other_order.id
+
+    def test_cart_loaded_in_one_statement(self, hot_db, statement_log):
+        statement_log.clear()
+        with hot_db["session"]() as db:
+            cart = db.execute(cart_with_items(hot_db["buyer"])).unique().scalars().first()
+            assert cart.items[0].product_size.product.slug == "whey"
+        assert len(statement_log) == 1
+
+    def test_repeats_hit_compiled_cache(self, hot_db):
+        with hot_db["session"]() as db:
+            db.execute(product_by_slug("whey")).all()
+            before = totals()["compiled_cache"]
+            for slug in ("whey", "creatine", "missing"):
+                db.execute(product_by_slug(slug)).all()
+        after = totals()["compiled_cache"]
+        assert after["hits"] - before["hits"] == 3
+        assert after["misses"] == before["misses"]
+        assert 0 < after["hit_rate"] <= 1
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+import app.search.db_search
+from app.models.sqlalchemy import Product
+from app.search.db_search import apply_full_text_search, full_text_available
+from app.services.product_service import Product_Service
+
+
+def compile_pg(query):
+    return str(query.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.fixture
+def sqlite_db(sqlite_app_db, monkeypatch):
+    monkeypatch.setattr(app.search.db_search, "_availability", {})
+    with sqlite_app_db("search")() as db:
+        db.add_all([
+            Product(slug="whey", product_type="Protein", product_name="Sữa Whey Protein", price=10.0),
+            Product(slug="fish-oil", product_type="Vitamins", product_name="Dầu cá Omega 3", price=10.0),
+        ])
+        db.commit()
+        yield db
+
+
+class TestFullTextSearch:
+    """Test the Postgres full-text query and the ILIKE fallback"""
+
+    def test_query_uses_search_vector_and_normalization(self):
+        query, rank = apply_full_text_search(Query(Product), "Sữa whey")
+        sql = compile_pg(query.order_by(rank.desc()))
+        assert "products.search_vector @@ websearch_to_tsquery('simple'::regconfig, search_normalize('Sữa whey'))" in sql
+        assert "search_normalize(products.product_name)" in sql
+        assert "ORDER BY ts_rank_cd(products.search_vector" in sql
+
+    def test_match_any_ors_keywords(self):
+        query, _ = apply_full_text_search(Query(Product), "dau  ca", match_any=True)
+        assert "search_normalize('dau or ca')" in compile_pg(query)
+
+    def test_sqlite_falls_back_to_ilike(self, sqlite_db):
+        assert full_text_available(sqlite_db) is False
+        products = Product_Service.get_products(sqlite_db, search="Whey")
+        assert [product.slug for product in products] == ["whey"]
+
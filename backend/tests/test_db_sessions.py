@@ -0,0 +1,218 @@
+import time
+import asyncio
+import itertools
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import app.db
+from app.db import (
+    run_in_session, run_in_read_session, session_scope, begin_db_routing, get_db, get_read_db,
+)
+from app.db.middleware import ReplicaStickinessMiddleware, PRIMARY_COOKIE
+from app.models.sqlalchemy import Product, User, Review
+from app.services.product_service import Product_Service
+from app.services.review_service import ReviewService
+from app.schemas.product_schemas import ProductCreate
+
+QUERY_LATENCY = 0.05
+
+
+@pytest.fixture
+def pooled_sessions(sqlite_app_db):
+    """app.db on the production pool size with a slow "network", holding one reviewed product.
+
+    Yields a dict with the peak number of connections checked out at once.
+    """
+    SessionLocal = sqlite_app_db("sessions", pool_size=10, max_overflow=20)
+    engine = SessionLocal.kw["bind"]
+
+    db = SessionLocal()
+    user = User(email="reader@example.com", hashed_password="x", salt="x")
+    product = Product(slug="whey", product_type="Protein", product_name="Whey", price=100.0)
+    db.add_all([user, product])
+    db.commit()
+    db.add(Review(product_id=product.id, user_id=user.uuid, content="Good", rating=5))
+    db.commit()
+    db.close()
+
+    stats = {"checked_out": 0, "peak": 0}
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(*args):
+        with lock:
+            stats["checked_out"] += 1
+            stats["peak"] = max(stats["peak"], stats["checked_out"])
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(*args):
+        with lock:
+            stats["checked_out"] -= 1
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def slow_network(*args):
+        time.sleep(QUERY_LATENCY)
+
+    return stats
+
+
+class TestPerRequestSessions:
+    """Test per-request sessions: concurrent reads run in parallel on the pool"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_product_and_review_reads_use_pool(self, pooled_sessions):
+        calls = 8
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *[run_in_session(Product_Service.get_product, "whey") for _ in range(calls // 2)],
+            *[run_in_session(ReviewService.get_product_reviews, "whey") for _ in range(calls // 2)],
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+
+        assert not [r for r in results if isinstance(r, Exception)]
+        assert results[-1].total_reviews == 1
+        assert pooled_sessions["peak"] > 1
+        # Serialized on one connection this would take >= calls * QUERY_LATENCY
+        assert elapsed < calls * QUERY_LATENCY
+        # Every session gave its connection back
+        assert pooled_sessions["checked_out"] == 0
+
+    def test_failed_unit_of_work_does_not_leak(self, pooled_sessions):
+        with pytest.raises(ValueError):
+            with session_scope() as db:
+                db.add(Product(slug="half-written", product_type="x", product_name="x", price=1.0))
+                db.flush()
+                raise ValueError("boom")
+
+        # The next unit of work starts clean: no leftover row, no aborted transaction
+        with session_scope() as db:
+            assert db.query(Product).filter(Product.slug == "half-written").first() is None
+            assert Product_Service.get_product(db, "whey").slug == "whey"
+        assert pooled_sessions["checked_out"] == 0
+
+
+class TestUniqueSlug:
+    """Test duplicate slugs are rejected by uq_products_slug with a 409"""
+
+    @patch("app.services.product_service.index_product")
+    def test_create_duplicate_slug(self, mock_index, pooled_sessions):
+        product = ProductCreate(slug="whey", product_type="Protein", product_name="Whey 2", price=1.0, stock=1)
+        with pytest.raises(HTTPException) as error:
+            with session_scope() as db:
+                Product_Service.create_product(db, product)
+        assert error.value.status_code == 409
+
+    @patch("app.services.product_service.index_product")
+    def test_rename_to_taken_slug(self, mock_index, pooled_sessions):
+        with session_scope() as db:
+            db.add(Product(slug="casein", product_type="Protein", product_name="Casein", price=1.0))
+            db.commit()
+            with pytest.raises(HTTPException) as error:
+                Product_Service.update_product(db, "casein", {"slug": "whey"})
+        assert error.value.status_code == 409
+
+
+def add_node_product(SessionLocal, product_name):
+    """One product named after the node (stand-in for a Postgres primary or replica)"""
+    with SessionLocal() as db:
+        db.add(Product(slug="whey", product_type="Protein", product_name=product_name, price=100.0))
+        db.commit()
+
+
+@pytest.fixture
+def replica(sqlite_app_db, monkeypatch):
+    """Primary and replica databases that return different product names"""
+    add_node_product(sqlite_app_db("primary"), "primary")
+    replica_sessions = sqlite_app_db("replica", primary=False)
+    add_node_product(replica_sessions, "replica")
+    replica = replica_sessions.kw["bind"]
+    monkeypatch.setattr(app.db, "_replica_engines", [replica])
+    monkeypatch.setattr(app.db, "_replica_cycle", itertools.cycle([replica]))
+    monkeypatch.setattr(app.db, "_routing", app.db.contextvars.ContextVar("db_routing_test", default=None))
+
+
+def read_name(db):
+    return db.query(Product).filter(Product.slug == "whey").first().product_name
+
+
+def rename(db, name):
+    db.query(Product).filter(Product.slug == "whey").first().product_name = name
+    db.commit()
+
+
+class TestReplicaRouting:
+    """Test read-only sessions go to the replica, writes and read-your-writes to the primary"""
+
+    def test_read_only_sessions_use_replica(self, replica):
+        with session_scope(read_only=True) as db:
+            assert read_name(db) == "replica"
+        with session_scope() as db:
+            assert read_name(db) == "primary"
+
+    def test_no_replica_configured_reads_primary(self, replica, monkeypatch):
+        monkeypatch.setattr(app.db, "_replica_engines", [])
+        with session_scope(read_only=True) as db:
+            assert read_name(db) == "primary"
+
+    def test_reads_after_own_write_stick_to_primary(self, replica):
+        routing = begin_db_routing()
+        with session_scope() as db:
+            rename(db, "renamed")
+        assert routing.wrote is True
+
+        with session_scope(read_only=True) as db:
+            assert read_name(db) == "renamed"
+
+    def test_sticky_client_reads_primary(self, replica):
+        begin_db_routing(sticky=True)
+        with session_scope(read_only=True) as db:
+            assert read_name(db) == "primary"
+
+    @pytest.mark.asyncio
+    async def test_routing_follows_request_into_executor(self, replica):
+        routing = begin_db_routing()
+        assert await run_in_read_session(read_name) == "replica"
+
+        await run_in_session(rename, "renamed")
+        assert routing.wrote is True
+        assert await run_in_read_session(read_name) == "renamed"
+
+    def test_middleware_sets_sticky_cookie_after_write(self, replica):
+        api = FastAPI()
+        api.add_middleware(ReplicaStickinessMiddleware)
+
+        @api.get("/name")
+        def get_name(db: Session = Depends(get_read_db)):
+            return read_name(db)
+
+        @api.post("/name")
+        def post_name(db: Session = Depends(get_db)):
+            rename(db, "renamed")
+            return "ok"
+
+        with TestClient(api) as client:
+            assert client.get("/name").json() == "replica"
+            assert PRIMARY_COOKIE not in client.cookies
+
+            response = client.post("/name")
+            assert PRIMARY_COOKIE in response.cookies
+            # Same client reads its own write; another client still reads the replica
+            assert client.get("/name").json() == "renamed"
+            with TestClient(api) as other:
+                assert other.get("/name").json() == "replica"
+
+    @pytest.mark.asyncio
+    async def test_cache_fills_read_primary(self, replica, fake_redis):
+        from app.routers.product_router import get_product_detail, get_products_page
+        begin_db_routing()
+        detail = await get_product_detail("whey")
+        assert detail.value["product_name"] == "primary"
+        page = await get_products_page(0, 10, fields="card")
+        assert [product["product_name"] for product in page.value] == ["primary"]
+        # Uncached reads still go to the replica
+        assert await run_in_read_session(read_name) == "replica"
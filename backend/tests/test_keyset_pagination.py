@@ -0,0 +1,129 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+from app.db.keyset import InvalidCursor, decode_cursor, encode_cursor
+from app.models.sqlalchemy import Product, User, Order
+from app.services.order_service import OrderService
+from app.services.product_service import Product_Service, PRODUCT_SORTS, product_page_cursor, map_product_to_response
+from app.routers import product_router
+
+ROWS = 23
+LIMIT = 5
+
+
+@pytest.fixture
+def catalog(sqlite_app_db):
+    """Products and orders with duplicate sort keys (prices and timestamps repeat)"""
+    SessionLocal = sqlite_app_db("keyset")
+    start = datetime(2025, 1, 1)
+    with SessionLocal() as db:
+        user = User(uuid=uuid.uuid4(), email="buyer@example.com", hashed_password="x", salt="x")
+        db.add(user)
+        for i in range(ROWS):
+            db.add(Product(
+                slug=f"p{i}", product_type="Protein", product_name=f"P{i}",
+                price=float(10 + i % 4), created_at=start + timedelta(hours=i // 3),
+            ))
+            db.add(Order(
+                user_id=user.uuid, shipping_name="A", shipping_phone="1", shipping_email="a@example.com",
+                shipping_address="x", status="pending", created_at=start + timedelta(hours=i // 3),
+            ))
+        db.commit()
+    with SessionLocal() as db:
+        yield db
+
+
+def walk_products(db, sort):
+    """All slugs, following X-Next-Cursor-style cursors page by page"""
+    slugs, cursor = [], None
+    while True:
+        page = [map_product_to_response(p).dict() for p in
+                Product_Service.get_products(db, limit=LIMIT, sort=sort, cursor=cursor)]
+        slugs += [p["slug"] for p in page]
+        cursor = product_page_cursor(page, LIMIT, sort)
+        if cursor is None:
+            return slugs
+
+
+class TestCursorEncoding:
+    """Test cursors are opaque, round-trip and are tied to their sort order"""
+
+    def test_round_trip(self):
+        order = PRODUCT_SORTS["newest"]
+        created = datetime(2025, 1, 2, 3, 4, 5, 678)
+        assert decode_cursor(encode_cursor(order, created, 42), order) == (created, 42)
+
+    def test_rejects_other_sort_and_garbage(self):
+        cursor = encode_cursor(PRODUCT_SORTS["price_asc"], 10.0, 1)
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, PRODUCT_SORTS["price_desc"])
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor", PRODUCT_SORTS["price_asc"])
+
+
+class TestProductKeyset:
+    """Test cursor pages walk every product exactly once, in the same order as offset pages"""
+
+    @pytest.mark.parametrize("sort", ["default", "newest", "price_asc", "price_desc"])
+    def test_cursor_walk_matches_offset_pages(self, catalog, sort):
+        offset_slugs = []
+        for page in range(ROWS // LIMIT + 1):
+            offset_slugs += [p.slug for p in Product_Service.get_products(catalog, page=page, limit=LIMIT, sort=sort)]
+
+        cursor_slugs = walk_products(catalog, sort)
+        assert cursor_slugs == offset_slugs
+        assert sorted(cursor_slugs) == sorted(f"p{i}" for i in range(ROWS))
+
+    def test_invalid_cursor_is_400(self, catalog):
+        with pytest.raises(HTTPException) as error:
+            Product_Service.get_products(catalog, cursor=encode_cursor(PRODUCT_SORTS["newest"], datetime.now(), 1))
+        assert error.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_not_modified_page_keeps_next_cursor(self, catalog, fake_redis):
+        async def read(if_none_match=None):
+            headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+            request = Request({"type": "http", "method": "GET", "path": "/products", "headers": headers,
+                               "query_string": b""})
+            response = Response()
+            result = await product_router.read_products(
+                request, response, page=0, limit=LIMIT, category=None, product_type=None, min_price=None,
+                max_price=None, search=None, manufacturer=None, certification=None, on_sale=None,
+                sort="newest", cursor=None, fields="card",
+            )
+            return result if isinstance(result, Response) else response
+
+        first = await read()
+        assert first.headers["X-Next-Cursor"]
+        not_modified = await read(first.headers["ETag"])
+        assert not_modified.status_code == 304
+        assert not_modified.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+
+class TestAdminOrdersKeyset:
+    """Test admin orders cursor pages (created_at desc) without OFFSET or COUNT"""
+
+    def test_cursor_walk_matches_offset_pages(self, catalog):
+        offset_ids = []
+        for page in range(1, ROWS // LIMIT + 2):
+            offset_ids += [o.id for o in OrderService.admin_get_all_orders(page=page, size=LIMIT).orders]
+
+        cursor_ids, cursor = [], None
+        while True:
+            response = OrderService.admin_get_all_orders(size=LIMIT, cursor=cursor)
+            cursor_ids += [o.id for o in response.orders]
+            if cursor is not None:
+                assert response.total is None
+            cursor = response.next_cursor
+            if cursor is None:
+                break
+
+        assert cursor_ids == offset_ids
+        assert len(set(cursor_ids)) == ROWS
+
+    def test_invalid_cursor_is_400(self, catalog):
+        with pytest.raises(HTTPException) as error:
+            OrderService.admin_get_all_orders(cursor=encode_cursor(PRODUCT_SORTS["price_asc"], 1.0, 1))
+        assert error.value.status_code == 400
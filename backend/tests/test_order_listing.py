@@ -0,0 +1,114 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app.models.sqlalchemy import User, Order, OrderItem, OrderStatusDelta
+from app.models.sqlalchemy.order import compact_order_status_deltas
+from app.services.order_service import OrderService
+
+
+@pytest.fixture
+def orders_db(sqlite_app_db, statement_log):
+    """Two users' orders (order i has i % 4 items) on a SQLite app.db, plus the statement log"""
+    SessionLocal = sqlite_app_db("orders")
+    buyer, other = uuid.uuid4(), uuid.uuid4()
+    start = datetime(2025, 1, 1)
+    with SessionLocal() as db:
+        db.add_all([
+            User(uuid=buyer, email="buyer@example.com", hashed_password="x", salt="x"),
+            User(uuid=other, email="other@example.com", hashed_password="x", salt="x"),
+        ])
+        for i in range(12):
+            order = Order(
+                user_id=buyer if i < 9 else other, shipping_name="A", shipping_phone="1",
+                shipping_email="a@example.com", shipping_address="x",
+                status="delivered" if i % 3 else "pending", created_at=start + timedelta(hours=i),
+            )
+            order.items = [
+                OrderItem(product_name="Whey", quantity=1, unit_price=1.0, total_price=1.0) for _ in range(i % 4)
+            ]
+            db.add(order)
+        db.commit()
+    return {"session": SessionLocal, "buyer": buyer, "statements": statement_log}
+
+
+def status_counts(db):
+    query = db.query(OrderStatusDelta.status, func.sum(OrderStatusDelta.delta)).group_by(OrderStatusDelta.status)
+    return dict(query.all())
+
+
+class TestOrderStatusCounts:
+    """Test per-status deltas follow inserts, status changes and deletes"""
+
+    def test_counters_follow_order_changes(self, orders_db):
+        with orders_db["session"]() as db:
+            assert status_counts(db) == {"pending": 4, "delivered": 8}
+
+            order = db.query(Order).filter(Order.status == "pending").first()
+            order.status = "cancelled"
+            db.commit()
+            assert status_counts(db) == {"pending": 3, "delivered": 8, "cancelled": 1}
+
+            db.delete(order)
+            db.commit()
+            assert status_counts(db) == {"pending": 3, "delivered": 8, "cancelled": 0}
+
+    def test_rolled_back_change_leaves_counters(self, orders_db):
+        with orders_db["session"]() as db:
+            db.query(Order).filter(Order.status == "pending").first().status = "shipped"
+            db.flush()
+            db.rollback()
+            assert status_counts(db) == {"pending": 4, "delivered": 8}
+
+    def test_writes_only_insert_deltas(self, orders_db):
+        statements = orders_db["statements"]
+        with orders_db["session"]() as db:
+            statements.clear()
+            db.query(Order).filter(Order.status == "pending").first().status = "shipped"
+            db.commit()
+        delta_sql = [sql for sql in statements if "order_status_deltas" in sql]
+        assert delta_sql and all(sql.startswith("INSERT") for sql in delta_sql)
+
+    def test_compaction_keeps_totals(self, orders_db):
+        with orders_db["session"]() as db:
+            db.query(Order).filter(Order.status == "pending").first().status = "cancelled"
+            db.commit()
+            assert compact_order_status_deltas(db.connection()) == 14
+            db.commit()
+            assert db.query(OrderStatusDelta).count() == 3
+            assert status_counts(db) == {"pending": 3, "delivered": 8, "cancelled": 1}
+
+
+class TestAdminOrderList:
+    """Test the admin list uses the status deltas and an items_count aggregate"""
+
+    def test_totals_and_items_count(self, orders_db):
+        response = OrderService.admin_get_all_orders(page=1, size=5)
+        assert response.total == 12
+        assert response.total_pages == 3
+        # Newest first: order i has i % 4 items
+        assert [o.items_count for o in response.orders] == [(i % 4) for i in range(11, 6, -1)]
+        assert response.orders[0].user_email == "other@example.com"
+
+        assert OrderService.admin_get_all_orders(status_filter="pending").total == 4
+
+    def test_no_count_over_orders_and_no_item_rows(self, orders_db):
+        orders_db["statements"].clear()
+        OrderService.admin_get_all_orders(page=2, size=5)
+        sql = "\n".join(orders_db["statements"])
+        assert "FROM order_status_deltas" in sql
+        assert "count(*)" not in sql.lower()
+        assert "order_items.product_name" not in sql
+
+
+class TestUserOrders:
+    """Test paginated order history"""
+
+    def test_pages_newest_first(self, orders_db):
+        buyer = orders_db["buyer"]
+        first = OrderService.get_user_orders(buyer, page=1, size=4)
+        last = OrderService.get_user_orders(buyer, page=3, size=4)
+
+        assert [o.items_count for o in first] == [0, 3, 2, 1]  # orders 8, 7, 6, 5
+        assert len(last) == 1
+        assert OrderService.count_user_orders(buyer) == 9
@@ -0,0 +1,136 @@
+import io
+import json
+import pytest
+from contextlib import nullcontext
+from unittest.mock import patch
+from sqlalchemy.exc import IntegrityError
+import app.cache
+import app.services.product_import as product_import
+from app.cache import invalidate_imported_products, product_slug_cache_key, product_missing_cache_key
+from app.models.sqlalchemy import Product, ProductSize
+from app.services.product_import import import_products, detect_format
+
+CSV_HEADER = "slug,product_type,product_name,price,stock,blurb,sizes,colors\n"
+
+
+@pytest.fixture
+def db(sqlite_app_db):
+    with sqlite_app_db("import")() as session:
+        yield session
+
+
+def run_csv(db, body: str, **kwargs):
+    return import_products(db, io.StringIO(CSV_HEADER + body), "csv", index=False, **kwargs)
+
+
+class TestProductImport:
+    """Test streaming CSV / JSONL import with upsert on slug"""
+
+    def test_csv_creates_products_sizes_and_colors(self, db):
+        report = run_csv(db, (
+            "whey,Protein,Whey,20.5,10,Fast protein,1kg:5;2kg:3,Vanilla=https://img/v.png;Chocolate\n"
+            "fish-oil,Vitamins,Fish Oil,9.9,,,,\n"
+        ))
+        assert (report.rows, report.created, report.updated, report.failed) == (2, 2, 0, 0)
+
+        whey = db.query(Product).filter(Product.slug == "whey").one()
+        assert {(s.size, s.stock_quantity) for s in whey.sizes} == {("1kg", 5), ("2kg", 3)}
+        assert [(c.color, c.image_url) for c in whey.colors] == [("Vanilla", "https://img/v.png"), ("Chocolate", None)]
+        fish_oil = db.query(Product).filter(Product.slug == "fish-oil").one()
+        assert (fish_oil.stock, fish_oil.blurb) == (0, None)
+
+    def test_reimport_updates_on_slug(self, db):
+        run_csv(db, "whey,Protein,Whey,20.5,10,,1kg:5,Vanilla\n")
+        report = run_csv(db, "whey,Protein,Whey Isolate,25,4,,1kg:1;5kg:2,Chocolate\n")
+        assert (report.created, report.updated) == (0, 1)
+
+        db.expire_all()
+        whey = db.query(Product).one()
+        assert (whey.product_name, whey.price, whey.stock) == ("Whey Isolate", 25.0, 4)
+        assert {(s.size, s.stock_quantity) for s in whey.sizes} == {("1kg", 1), ("5kg", 2)}
+        assert [c.color for c in whey.colors] == ["Chocolate"]
+        assert db.query(ProductSize).count() == 2
+
+    def test_invalid_rows_reported_and_skipped(self, db):
+        report = run_csv(db, (
+            "ok-1,Protein,Ok,10,1,,,\n"
+            "bad-price,Protein,Bad,-3,1,,,\n"
+            "bad-size,Protein,Bad,10,1,,1kg,\n"
+            "ok-2,Protein,Ok,10,1,,,\n"
+        ))
+        assert (report.created, report.failed) == (2, 2)
+        assert [(e["row"], e["slug"]) for e in report.errors] == [(3, "bad-price"), (4, "bad-size")]
+        assert "price" in report.errors[0]["error"]
+        assert {p.slug for p in db.query(Product)} == {"ok-1", "ok-2"}
+
+    def test_jsonl(self, db):
+        lines = [
+            json.dumps({"slug": "whey", "product_type": "Protein", "product_name": "Whey", "price": 20.0,
+                        "stock": 3, "sizes": [{"size": "1kg", "stock_quantity": 3}]}),
+            "",
+            "{not json",
+        ]
+        report = import_products(db, io.StringIO("\n".join(lines)), "jsonl", index=False)
+        assert (report.rows, report.created, report.failed) == (2, 1, 1)
+        assert report.errors[0]["row"] == 3
+        assert db.query(ProductSize).one().size == "1kg"
+
+    def test_last_row_of_a_slug_wins(self, db):
+        report = run_csv(db, "whey,Protein,Old,10,1,,,\nwhey,Protein,New,12,1,,,\n")
+        assert (report.created, report.superseded) == (1, 1)
+        assert db.query(Product).one().product_name == "New"
+
+    def test_rejected_batch_retried_row_by_row(self, db):
+        write = product_import._write_products
+
+        def reject_boom(session, products):
+            if any(p.slug == "boom" for p in products):
+                raise IntegrityError("INSERT", {}, Exception("boom violates a constraint"))
+            return write(session, products)
+
+        with patch.object(product_import, "_write_products", side_effect=reject_boom):
+            report = run_csv(db, "a,Protein,A,10,1,,,\nboom,Protein,B,10,1,,,\nc,Protein,C,10,1,,,\n")
+
+        assert (report.created, report.failed) == (2, 1)
+        assert report.errors == [{"row": 3, "slug": "boom", "error": "boom violates a constraint"}]
+        assert {p.slug for p in db.query(Product)} == {"a", "c"}
+
+    @patch.object(product_import, "index_refresh_paused", return_value=nullcontext())
+    @patch.object(product_import, "bulk_index_products")
+    def test_batches_indexed_in_bulk_without_refresh(self, bulk_index, refresh_paused, db):
+        bulk_index.side_effect = lambda products, **kwargs: {"success": len(products), "failed": 0, "errors": []}
+        progress = []
+        body = "".join(f"p{i},Protein,P{i},10,1,,,\n" for i in range(5))
+        report = import_products(
+            db, io.StringIO(CSV_HEADER + body), "csv", batch_size=2, on_progress=lambda r: progress.append(r.rows),
+        )
+
+        assert progress == [2, 4, 5]
+        assert [len(call.args[0]) for call in bulk_index.call_args_list] == [2, 2, 1]
+        assert all(call.kwargs["refresh"] is False for call in bulk_index.call_args_list)
+        assert refresh_paused.call_count == 1
+        assert report.indexed == 5
+        assert report.slugs == [f"p{i}" for i in range(5)]
+
+    def test_detect_format(self):
+        assert detect_format("catalog.CSV") == "csv"
+        assert detect_format("catalog.ndjson") == "jsonl"
+        assert detect_format("catalog.xlsx") is None
+
+
+class TestImportInvalidation:
+    """Test a bulk import invalidates caches once, not once per product"""
+
+    @pytest.mark.asyncio
+    async def test_one_namespace_bump(self, fake_redis):
+        slugs = [f"p{i}" for i in range(1200)]
+        fake_redis.store[product_slug_cache_key("p7")] = b"cached"
+        fake_redis.store[product_missing_cache_key("p8")] = b"missing"
+        with patch.object(app.cache.cache_warmer, "schedule") as schedule:
+            await invalidate_imported_products(slugs)
+
+        assert product_slug_cache_key("p7") not in fake_redis.store
+        assert product_missing_cache_key("p8") not in fake_redis.store
+        assert len([call for call in fake_redis.calls if call[0] == "incr"]) == 1
+        assert len(fake_redis.published) == 3  # 500-slug batches
+        assert schedule.call_count == 1
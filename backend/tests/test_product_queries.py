@@ -0,0 +1,139 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException
+from app.models.sqlalchemy import Product, ProductSize, Category
+from app.schemas.product_schemas import ProductCreate, ProductSizeBase, ProductColorBase
+from app.services.product_service import Product_Service, map_product_to_response, map_product_to_card
+
+PRODUCTS = 30
+
+
+@pytest.fixture
+def catalog(sqlite_app_db, statement_log):
+    """Products with a category and two sizes each, plus the statement log"""
+    db = sqlite_app_db("products")()
+    category = Category(name="Protein")
+    for i in range(PRODUCTS):
+        product = Product(slug=f"p{i}", product_type="Protein", product_name=f"P{i}", price=10.0 + i, stock=5,
+                          blurb="Short", description="Long " * 200, ingredients="Whey " * 100)
+        product.categories = [category]
+        product.sizes = [ProductSize(size="1kg", stock_quantity=5), ProductSize(size="2kg", stock_quantity=3)]
+        db.add(product)
+    db.commit()
+    db.expunge_all()
+    yield db, statement_log
+    db.close()
+
+
+def count_statements(statements, fn):
+    """Statements run by fn(), which also maps its result like the routes do"""
+    statements.clear()
+    fn()
+    return len(statements)
+
+
+class TestProductListStatements:
+    """Test list pages run a fixed number of statements whatever the page size"""
+
+    @pytest.mark.parametrize("limit", [1, 10, PRODUCTS])
+    def test_list_page(self, catalog, limit):
+        db, statements = catalog
+
+        def list_page():
+            products = [map_product_to_response(p) for p in Product_Service.get_products(db, limit=limit)]
+            assert len(products) == limit
+            assert all(len(p.sizes) == 2 and p.categories[0].name == "Protein" for p in products)
+            db.expunge_all()
+
+        # products + selectin categories + selectin sizes
+        assert count_statements(statements, list_page) == 3
+
+    def test_filtered_cursor_page(self, catalog):
+        db, statements = catalog
+        page = lambda: [map_product_to_response(p) for p in Product_Service.get_products(
+            db, limit=10, category="prot", sort="price_desc", search="P"
+        )]
+        assert count_statements(statements, page) == 3
+
+
+class TestProductCards:
+    """Test fields=card loads only the card columns in a single statement"""
+
+    def test_card_page(self, catalog):
+        db, statements = catalog
+        cards = []
+        page = lambda: cards.extend(map_product_to_card(p).dict() for p in Product_Service.get_products(
+            db, limit=PRODUCTS, sort="newest", fields="card"
+        ))
+        assert count_statements(statements, page) == 1
+        assert "products.description" not in statements[0]
+        assert "products.ingredients" not in statements[0]
+        assert len(cards) == PRODUCTS
+        assert set(cards[0]) == {
+            "id", "slug", "product_name", "price", "sale_price", "stock", "image_url", "blurb", "created_at",
+            "rating_avg", "rating_count",
+        }
+
+
+class TestProductDetailStatements:
+    """Test single product reads and writes don't lazy-load per relationship"""
+
+    def test_get_product(self, catalog):
+        db, statements = catalog
+        assert count_statements(statements, lambda: map_product_to_response(Product_Service.get_product(db, "p3"))) == 3
+
+    @patch("app.services.product_service.index_product")
+    def test_update_product(self, mock_index, catalog):
+        db, statements = catalog
+        update = lambda: Product_Service.update_product(db, "p3", {"price": 99.0})
+        # select + 2 selectin, UPDATE - the response is mapped without refreshing
+        assert count_statements(statements, update) == 4
+        assert mock_index.call_count == 1
+        assert Product_Service.update_product(db, "p3", {"stock": 7})["price"] == 99.0
+
+
+def new_product(slug, sizes, colors=0):
+    return ProductCreate(
+        slug=slug, product_type="Protein", product_name="New", price=1.0, stock=1,
+        sizes=[ProductSizeBase(size=f"{i}kg", stock_quantity=i) for i in range(sizes)],
+        colors=[ProductColorBase(color=f"Color {i}") for i in range(colors)],
+    )
+
+
+class TestProductCreate:
+    """Test a product with its children is created in one transaction, without SELECTs"""
+
+    @pytest.mark.parametrize("sizes", [1, 25])
+    @patch("app.services.product_service.index_product")
+    def test_statements(self, mock_index, catalog, sizes):
+        db, statements = catalog
+        created = []
+        create = lambda: created.append(Product_Service.create_product(db, new_product("new", sizes, colors=2)))
+        # product INSERT ... RETURNING id, created_at + one multi-row INSERT per child table
+        assert count_statements(statements, create) == 3
+        assert not [sql for sql in statements if sql.startswith("SELECT")]
+
+        product = created[0]
+        assert [(s["size"], s["stock_quantity"]) for s in product["sizes"]] == [(f"{i}kg", i) for i in range(sizes)]
+        assert product["created_at"] is not None and product["categories"] == []
+        assert mock_index.call_args.args[0].id == product["id"]
+
+    @patch("app.services.product_service.index_product")
+    def test_failed_child_insert_leaves_no_product(self, mock_index, catalog):
+        db, _ = catalog
+        duplicate_sizes = new_product("dup", 1)
+        duplicate_sizes.sizes.append(ProductSizeBase(size="0kg", stock_quantity=1))
+        with pytest.raises(IntegrityError):
+            Product_Service.create_product(db, duplicate_sizes)
+
+        assert db.query(Product).filter(Product.slug == "dup").count() == 0
+        assert mock_index.call_count == 0
+        assert Product_Service.create_product(db, new_product("dup", 2))["slug"] == "dup"
+
+    def test_slug_conflict(self, catalog):
+        db, _ = catalog
+        with pytest.raises(HTTPException) as error:
+            Product_Service.create_product(db, new_product("p1", 2))
+        assert error.value.status_code == 409
+        assert db.query(ProductSize).count() == PRODUCTS * 2
@@ -0,0 +1,123 @@
+import uuid
+import pytest
+from unittest.mock import patch
+from sqlalchemy import delete
+from app.models.sqlalchemy import User, Product, Review, Order, OrderItem
+from app.models.sqlalchemy.product import rating_histogram, recompute_product_ratings
+from app.schemas.review_schemas import ReviewCreate
+from app.search.product_sync import map_product_to_es_doc
+from app.services.review_service import ReviewService
+from app.services.product_service import map_product_to_card
+
+RATINGS = [5, 4, 4, 1]
+
+
+@pytest.fixture
+def reviews_db(sqlite_app_db, statement_log):
+    """Two products, one with a review per rating in RATINGS, plus buyers who received both products"""
+    db = sqlite_app_db("reviews")()
+    whey = Product(slug="whey", product_type="Protein", product_name="Whey", price=10.0)
+    creatine = Product(slug="creatine", product_type="Protein", product_name="Creatine", price=10.0)
+    buyers = [User(uuid=uuid.uuid4(), email=f"buyer{i}@example.com", hashed_password="x", salt="x") for i in range(6)]
+    db.add_all([whey, creatine, *buyers])
+    db.flush()
+    for buyer in buyers:
+        order = Order(user_id=buyer.uuid, shipping_name="A", shipping_phone="1", shipping_email="a@example.com",
+                      shipping_address="x", status="delivered")
+        order.items = [OrderItem(product_id=product.id, product_name=product.product_name, quantity=1,
+                                 unit_price=1.0, total_price=1.0) for product in (whey, creatine)]
+        db.add(order)
+    for buyer, rating in zip(buyers, RATINGS):
+        db.add(Review(product_id=whey.id, user_id=buyer.uuid, content="Ok", rating=rating))
+    db.commit()
+    yield {"db": db, "buyers": buyers, "statements": statement_log}
+    db.close()
+
+
+def aggregates(db, slug):
+    db.expire_all()
+    product = db.query(Product).filter(Product.slug == slug).one()
+    return round(product.rating_avg, 2), product.rating_count, rating_histogram(product)
+
+
+class TestRatingAggregates:
+    """Test the product's rating aggregates follow review inserts, updates and deletes"""
+
+    def test_inserts(self, reviews_db):
+        assert aggregates(reviews_db["db"], "whey") == (3.5, 4, {1: 1, 2: 0, 3: 0, 4: 2, 5: 1})
+        assert aggregates(reviews_db["db"], "creatine") == (0.0, 0, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0})
+
+    def test_update_and_delete(self, reviews_db):
+        db = reviews_db["db"]
+        reviews = db.query(Review).order_by(Review.id).all()
+        reviews[3].rating = 5
+        db.commit()
+        assert aggregates(db, "whey") == (4.5, 4, {1: 0, 2: 0, 3: 0, 4: 2, 5: 2})
+
+        creatine = db.query(Product).filter(Product.slug == "creatine").one()
+        reviews[0].product_id = creatine.id
+        db.delete(reviews[1])
+        db.commit()
+        assert aggregates(db, "whey") == (4.5, 2, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+        assert aggregates(db, "creatine") == (5.0, 1, {1: 0, 2: 0, 3: 0, 4: 0, 5: 1})
+
+        for review in db.query(Review).all():
+            db.delete(review)
+        db.commit()
+        assert aggregates(db, "whey") == (0.0, 0, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0})
+
+    def test_recompute_repairs_drift(self, reviews_db):
+        db = reviews_db["db"]
+        db.execute(delete(Review).where(Review.rating == 4))  # bulk delete - no mapper events
+        db.commit()
+        assert aggregates(db, "whey")[1] == 4
+
+        assert recompute_product_ratings(db.connection()) == 2
+        db.commit()
+        assert aggregates(db, "whey") == (3.0, 2, {1: 1, 2: 0, 3: 0, 4: 0, 5: 1})
+        assert aggregates(db, "creatine") == (0.0, 0, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0})
+
+
+@patch("app.services.review_service.index_product")
+class TestReviewService:
+    """Test review writes move the aggregates in their own commit and reads don't aggregate"""
+
+    def test_create_and_delete_review(self, mock_index, reviews_db):
+        db, buyer = reviews_db["db"], reviews_db["buyers"][4]
+        review = ReviewService.create_review(db, "whey", ReviewCreate(content="Great", rating=2), buyer.uuid)
+        assert aggregates(db, "whey") == (3.2, 5, {1: 1, 2: 1, 3: 0, 4: 2, 5: 1})
+        assert mock_index.call_args.args[0].rating_count == 5
+
+        assert ReviewService.delete_review(db, review.id, buyer.uuid) == "whey"
+        assert aggregates(db, "whey")[:2] == (3.5, 4)
+        assert mock_index.call_count == 2
+
+    def test_failed_write_leaves_aggregates(self, mock_index, reviews_db):
+        db, buyer = reviews_db["db"], reviews_db["buyers"][4]
+        with patch.object(db, "commit", side_effect=RuntimeError("connection lost")):
+            with pytest.raises(RuntimeError):
+                ReviewService.create_review(db, "whey", ReviewCreate(content="Great", rating=2), buyer.uuid)
+        db.rollback()
+        assert aggregates(db, "whey")[:2] == (3.5, 4)
+
+    def test_get_product_reviews(self, mock_index, reviews_db):
+        db, statements = reviews_db["db"], reviews_db["statements"]
+        db.expire_all()
+        statements.clear()
+        result = ReviewService.get_product_reviews(db, "whey")
+
+        assert (result.average_rating, result.total_reviews) == (3.5, 4)
+        assert result.rating_histogram == {1: 1, 2: 0, 3: 0, 4: 2, 5: 1}
+        assert len(result.reviews) == 4
+        assert not [sql for sql in statements if "avg(" in sql.lower()]
+
+
+class TestRatingOutputs:
+    """Test cards and search documents carry the aggregates"""
+
+    def test_card_and_es_doc(self, reviews_db):
+        whey = reviews_db["db"].query(Product).filter(Product.slug == "whey").one()
+        card = map_product_to_card(whey)
+        assert (card.rating_avg, card.rating_count) == (3.5, 4)
+        doc = map_product_to_es_doc(whey)
+        assert (doc["rating_avg"], doc["rating_count"]) == (3.5, 4)
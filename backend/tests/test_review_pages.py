@@ -0,0 +1,115 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+import app.cache
+from app.cache import review_summary_cache_key, review_first_page_cache_key, product_slug_cache_key
+from app.models.sqlalchemy import User, Product, Review
+from app.routers import product_router
+from app.schemas.review_schemas import ReviewListResponse, ReviewSummaryResponse
+from app.services.review_service import ReviewService
+
+REVIEWS = 25
+
+
+def make_request():
+    """Bare Starlette request for calling route functions directly"""
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+
+@pytest.fixture
+def reviews_db(sqlite_app_db, statement_log):
+    """REVIEWS reviews of "whey" (every three share a created_at) on a SQLite app.db, plus the statement log"""
+    SessionLocal = sqlite_app_db("reviews")
+    start = datetime(2025, 1, 1)
+    with SessionLocal() as db:
+        whey = Product(slug="whey", product_type="Protein", product_name="Whey", price=10.0)
+        db.add_all([whey, Product(slug="creatine", product_type="Protein", product_name="Creatine", price=10.0)])
+        db.flush()
+        for i in range(REVIEWS):
+            user = User(uuid=uuid.uuid4(), email=f"u{i}@example.com", hashed_password="x", salt="x")
+            db.add(user)
+            db.add(Review(product_id=whey.id, user_id=user.uuid, content=f"Review {i}", rating=i % 5 + 1,
+                          created_at=start + timedelta(hours=i // 3)))
+        db.commit()
+    return {"session": SessionLocal, "statements": statement_log}
+
+
+class TestReviewPages:
+    """Test keyset pages of a product's reviews"""
+
+    def test_cursor_pages_cover_every_review_once(self, reviews_db):
+        with reviews_db["session"]() as db:
+            seen, cursor, pages = [], None, 0
+            while True:
+                page = ReviewService.get_product_reviews(db, "whey", limit=10, cursor=cursor)
+                seen.extend((r.created_at, r.id) for r in page.reviews)
+                pages += 1
+                if not page.next_cursor:
+                    break
+                cursor = page.next_cursor
+
+        assert pages == 3
+        assert seen == sorted(seen, reverse=True)
+        assert len(set(seen)) == REVIEWS
+        assert (page.total_reviews, page.average_rating) == (REVIEWS, 3.0)
+
+    def test_empty_product_and_invalid_cursor(self, reviews_db):
+        with reviews_db["session"]() as db:
+            page = ReviewService.get_product_reviews(db, "creatine")
+            assert (page.reviews, page.next_cursor, page.total_reviews) == ([], None, 0)
+            with pytest.raises(HTTPException) as error:
+                ReviewService.get_product_reviews(db, "whey", cursor="not-a-cursor")
+            assert error.value.status_code == 400
+            with pytest.raises(HTTPException) as error:
+                ReviewService.get_review_summary(db, "no-such-slug")
+            assert error.value.status_code == 404
+
+    def test_summary_is_one_row_read(self, reviews_db):
+        statements = reviews_db["statements"]
+        with reviews_db["session"]() as db:
+            statements.clear()
+            summary = ReviewService.get_review_summary(db, "whey")
+        assert summary.rating_histogram == {1: 5, 2: 5, 3: 5, 4: 5, 5: 5}
+        assert len(statements) == 1
+        assert "reviews" not in statements[0] and "products.description" not in statements[0]
+
+
+class TestReviewCache:
+    """Test the summary and first review page are cached and dropped on review writes"""
+
+    @pytest.mark.asyncio
+    async def test_first_page_and_summary_cached(self, reviews_db, fake_redis):
+        statements = reviews_db["statements"]
+        first = await product_router.get_product_reviews("whey", make_request(), Response(), limit=10, cursor=None)
+        summary = await product_router.get_review_summary("whey", make_request(), Response())
+        assert review_first_page_cache_key("whey") in fake_redis.store
+        assert review_summary_cache_key("whey") in fake_redis.store
+
+        statements.clear()
+        app.cache.local_cache.clear()  # read back through Redis - UUIDs and datetimes survive the codec
+        cached = await product_router.get_product_reviews("whey", make_request(), Response(), limit=10, cursor=None)
+        assert ReviewListResponse(**cached) == ReviewListResponse(**first)
+        cached = await product_router.get_review_summary("whey", make_request(), Response())
+        assert ReviewSummaryResponse(**cached) == ReviewSummaryResponse(**summary)
+        assert statements == []
+
+        # Deeper pages and other sizes go to the database
+        page = await product_router.get_product_reviews("whey", make_request(), Response(),
+                                                        limit=10, cursor=first["next_cursor"])
+        assert page.reviews[0].id not in {r["id"] for r in first["reviews"]}
+        assert statements
+
+    @pytest.mark.asyncio
+    async def test_review_write_invalidates(self, reviews_db, fake_redis):
+        await product_router.get_product_reviews("whey", make_request(), Response(), limit=10, cursor=None)
+        await product_router.get_review_summary("whey", make_request(), Response())
+        fake_redis.store[product_slug_cache_key("whey")] = b"cached"
+
+        await app.cache.invalidate_review_cache("whey")
+
+        for key in (review_first_page_cache_key("whey"), review_summary_cache_key("whey"),
+                    product_slug_cache_key("whey")):
+            assert key not in fake_redis.store
+        assert fake_redis.published
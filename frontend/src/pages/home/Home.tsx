@@ -33,8 +33,8 @@ export default function Home() {
     const fetchProducts = async () => {
       try {
         const [featured, arrivals] = await Promise.all([
-          getProductList({ page: 0, limit: 12 }),
-          getProductList({ page: 0, limit: 8 }),
+          getProductList({ page: 0, limit: 12, fields: "card" }),
+          getProductList({ page: 0, limit: 8, fields: "card" }),
         ]);
         setFeaturedProducts(featured || []);
         setNewArrivals(arrivals || []);
@@ -58,6 +58,7 @@ export default function ProductPage() {
   
   // Review states
   const [reviews, setReviews] = useState<IReviewListResponse | null>(null);
+  const [loadingMoreReviews, setLoadingMoreReviews] = useState(false);
   const [reviewRating, setReviewRating] = useState<number>(5);
   const [reviewContent, setReviewContent] = useState<string>("");
   const [submittingReview, setSubmittingReview] = useState<boolean>(false);
@@ -126,6 +127,17 @@ export default function ProductPage() {
   }, [color, productInfo]);
 
   // Handle review submission
+  // Next keyset page of reviews, appended to the ones shown
+  const handleLoadMoreReviews = async () => {
+    if (!productInfo?.slug || !reviews?.next_cursor) return;
+    setLoadingMoreReviews(true);
+    const nextPage = await getProductReviews(productInfo.slug, reviews.next_cursor);
+    if (nextPage) {
+      setReviews({ ...nextPage, reviews: [...reviews.reviews, ...nextPage.reviews] });
+    }
+    setLoadingMoreReviews(false);
+  };
+
   const handleSubmitReview = async () => {
     if (!isLoggedIn) {
       setReviewError("Please login to submit a review");
@@ -620,7 +632,8 @@ export default function ProductPage() {
                     </Box>
                     
                     {reviews && reviews.reviews.length > 0 ? (
-                      reviews.reviews.map((review) => (
+                      <>
+                      {reviews.reviews.map((review) => (
                         <Box key={review.id} sx={{ py: 2, borderBottom: "1px solid #eee" }}>
                           <Box sx={{ display: "flex", gap: 2 }}>
                             <Avatar>
@@ -642,7 +655,15 @@ export default function ProductPage() {
                             </Box>
                           </Box>
                         </Box>
-                      ))
+                      ))}
+                      {reviews.next_cursor && (
+                        <Box sx={{ textAlign: "center", mt: 2 }}>
+                          <Button variant="outlined" onClick={handleLoadMoreReviews} disabled={loadingMoreReviews}>
+                            {loadingMoreReviews ? <CircularProgress size={24} /> : "Load more reviews"}
+                          </Button>
+                        </Box>
+                      )}
+                      </>
                     ) : (
                       <Typography color="text.secondary" sx={{ textAlign: "center", py: 4 }}>
                         No reviews yet. Be the first to review this product!
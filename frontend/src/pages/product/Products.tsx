@@ -82,7 +82,7 @@ export default function Products() {
   const fetchProducts = useCallback(async (filters: IProductFilters) => {
     setLoading(true);
     try {
-      const response = await getProductList(filters);
+      const response = await getProductList({ ...filters, fields: "card" });
       setProducts(response || []);
     } catch (error) {
       console.error("Error loading products:", error);
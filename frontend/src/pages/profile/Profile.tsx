@@ -20,6 +20,7 @@ import {
   TableContainer,
   TableHead,
   TableRow,
+  TablePagination,
   Divider,
 } from "@mui/material";
 import {
@@ -77,6 +78,9 @@ export default function Profile() {
   // Orders state
   const [orders, setOrders] = useState<IOrderListItem[]>([]);
   const [ordersLoading, setOrdersLoading] = useState(true);
+  const [ordersPage, setOrdersPage] = useState(0);
+  const [ordersPerPage, setOrdersPerPage] = useState(10);
+  const [ordersTotal, setOrdersTotal] = useState(0);
 
   // UI state
   const [loading, setLoading] = useState(false);
@@ -107,8 +111,9 @@ export default function Profile() {
       
       try {
         setOrdersLoading(true);
-        const data = await orderService.getMyOrders();
-        setOrders(data);
+        const data = await orderService.getMyOrdersPage(ordersPage + 1, ordersPerPage);
+        setOrders(data.orders);
+        setOrdersTotal(data.total);
       } catch (err) {
         console.error("Failed to fetch orders:", err);
       } finally {
@@ -117,7 +122,7 @@ export default function Profile() {
     };
 
     fetchOrders();
-  }, [isLoggedIn]);
+  }, [isLoggedIn, ordersPage, ordersPerPage]);
 
   const handleProfileSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -613,6 +618,18 @@ export default function Profile() {
                       ))}
                     </TableBody>
                   </Table>
+                  <TablePagination
+                    component="div"
+                    count={ordersTotal}
+                    page={ordersPage}
+                    onPageChange={(_, newPage) => setOrdersPage(newPage)}
+                    rowsPerPage={ordersPerPage}
+                    onRowsPerPageChange={(e) => {
+                      setOrdersPerPage(parseInt(e.target.value, 10));
+                      setOrdersPage(0);
+                    }}
+                    rowsPerPageOptions={[5, 10, 20]}
+                  />
                 </TableContainer>
               )}
             </Paper>
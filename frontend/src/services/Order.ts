@@ -55,12 +55,24 @@ export const createOrder = async (request: ICreateOrderRequest): Promise<IOrder>
   return response.data;
 };
 
-// Get user's orders
-export const getMyOrders = async (): Promise<IOrderListItem[]> => {
-  const response = await api.get("/orders");
-  return response.data;
+// Get one page of user's orders (newest first) with the total count (X-Total-Count header)
+export const getMyOrdersPage = async (
+  page: number = 1,
+  size: number = 20
+): Promise<{ orders: IOrderListItem[]; total: number }> => {
+  const response = await api.get(`/orders?page=${page}&size=${size}`);
+  return {
+    orders: response.data,
+    total: Number(response.headers["x-total-count"] ?? response.data.length),
+  };
 };
 
+// Get one page of user's orders without the total
+export const getMyOrders = async (
+  page: number = 1,
+  size: number = 20
+): Promise<IOrderListItem[]> => (await getMyOrdersPage(page, size)).orders;
+
 // Get order detail
 export const getOrderDetail = async (orderId: number): Promise<IOrder> => {
   const response = await api.get(`/orders/${orderId}`);
@@ -127,6 +139,7 @@ export const adminUpdateOrderStatus = async (orderId: number, status: string): P
 export const orderService = {
   createOrder,
   getMyOrders,
+  getMyOrdersPage,
   getOrderDetail,
   cancelOrder,
   adminGetOrders,
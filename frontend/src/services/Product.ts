@@ -28,6 +28,8 @@ export interface IProductFilters {
   manufacturer?: string;
   certification?: string;
   on_sale?: boolean;
+  // "card": only the fields ProductCard shows (smaller, faster list pages)
+  fields?: "full" | "card";
 }
 
 export const getProductList = async (filters: IProductFilters = {}) => {
@@ -44,6 +46,7 @@ export const getProductList = async (filters: IProductFilters = {}) => {
     if (filters.manufacturer) params.append("manufacturer", filters.manufacturer);
     if (filters.certification) params.append("certification", filters.certification);
     if (filters.on_sale) params.append("on_sale", "true");
+    if (filters.fields) params.append("fields", filters.fields);
 
     const response = await fetch(`${BACKEND_URL}/products?${params.toString()}`);
     
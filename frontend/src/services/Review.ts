@@ -15,10 +15,15 @@ export interface IReview {
   author: IReviewAuthor;
 }
 
-export interface IReviewListResponse {
-  reviews: IReview[];
+export interface IReviewSummary {
   average_rating: number;
   total_reviews: number;
+  rating_histogram: Record<number, number>;
+}
+
+export interface IReviewListResponse extends IReviewSummary {
+  reviews: IReview[];
+  next_cursor?: string | null;
 }
 
 export interface ICreateReview {
@@ -26,9 +31,11 @@ export interface ICreateReview {
   rating: number;
 }
 
-export const getProductReviews = async (productSlug: string): Promise<IReviewListResponse | null> => {
+// One page of reviews (newest first) with the rating summary - pass next_cursor for the next page
+export const getProductReviews = async (productSlug: string, cursor?: string): Promise<IReviewListResponse | null> => {
   try {
-    const response = await fetch(`${BACKEND_URL}/products/${productSlug}/reviews`);
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const response = await fetch(`${BACKEND_URL}/products/${productSlug}/reviews${query}`);
     
     if (response.ok) {
       return await response.json();
@@ -41,6 +48,21 @@ export const getProductReviews = async (productSlug: string): Promise<IReviewLis
   }
 };
 
+export const getReviewSummary = async (productSlug: string): Promise<IReviewSummary | null> => {
+  try {
+    const response = await fetch(`${BACKEND_URL}/products/${productSlug}/reviews/summary`);
+    
+    if (response.ok) {
+      return await response.json();
+    } else {
+      return null;
+    }
+  } catch (err) {
+    console.error("Error fetching review summary:", err);
+    return null;
+  }
+};
+
 export const createProductReview = async (
   productSlug: string,
   review: ICreateReview